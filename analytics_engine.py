@@ -0,0 +1,181 @@
+import numpy as np
+import pandas as pd
+from sales_ingest import load_sales_matrix, read_sales_header
+
+
+class SalesAggregator:
+    """Running sales aggregates that can be updated one month or one cell at a time.
+
+    Keeps the per-date totals behind sales_trends/monthly_sales, per calendar
+    month sums and counts behind monthly_seasonality, and per-SKU totals.
+    Adding a month column or correcting a cell only touches the aggregates it
+    affects, so a new month costs O(SKUs) instead of regrouping the whole
+    history. Results match analyze_data exactly.
+    """
+
+    def __init__(self, skus, names=None):
+        self.skus = pd.Index(skus)
+        self.names = names
+        self._sku_positions = {sku: i for i, sku in enumerate(self.skus)}
+        # date -> per-SKU quantity column, kept so corrections can be applied as deltas
+        self._columns = {}
+        self._date_totals = {}
+        self._month_sums = np.zeros(13, dtype=np.float64)
+        self._month_counts = np.zeros(13, dtype=np.int64)
+        self._sku_totals = np.zeros(len(self.skus), dtype=np.int64)
+        self._integer = True
+        self.version = 0
+
+    @classmethod
+    def from_matrix(cls, skus, dates, matrix, names=None, copy=True):
+        """Build the aggregates for a dense SKU x month matrix in one vectorized pass.
+
+        With copy=False the month columns are views into matrix (which may be
+        a read-only memory map); a column is copied the first time it is corrected.
+        """
+        aggregator = cls(skus, names)
+        # Own a column-major copy so each month is a contiguous column and corrections never touch the caller's array
+        matrix = np.array(matrix, order='F') if copy else np.asfortranarray(matrix)
+        aggregator._integer = matrix.dtype.kind in 'iu'
+        if not aggregator._integer:
+            aggregator._sku_totals = aggregator._sku_totals.astype(np.float64)
+        for j, date in enumerate(pd.DatetimeIndex(dates)):
+            aggregator._columns[date] = matrix[:, j]
+        aggregator._recompute()
+        return aggregator
+
+    @classmethod
+    def from_long(cls, sales_data):
+        """Build the aggregates from the long sales frame returned by load_and_preprocess."""
+        wide = sales_data.pivot(index='sku', columns='date_sale', values='quantity')
+        skus = sales_data['sku'].drop_duplicates()
+        wide = wide.reindex(skus)
+        matrix = wide.to_numpy()
+        if not sales_data['quantity'].isna().any() and sales_data['quantity'].dtype.kind in 'iu':
+            matrix = matrix.astype(sales_data['quantity'].dtype)
+        return cls.from_matrix(skus, wide.columns, matrix)
+
+    @classmethod
+    def from_sales_file(cls, path):
+        skus, names, dates, matrix = load_sales_matrix(path)
+        return cls.from_matrix(skus, dates, matrix, names)
+
+    def _recompute(self):
+        self._date_totals = {}
+        self._month_sums[:] = 0
+        self._month_counts[:] = 0
+        self._sku_totals[:] = 0
+        for date, column in self._columns.items():
+            self._add_column(date, column)
+
+    def _column_sum(self, column):
+        return column.sum() if self._integer else np.nansum(column)
+
+    def _add_column(self, date, column):
+        total = self._column_sum(column)
+        self._date_totals[date] = total
+        self._month_sums[date.month] += total
+        self._month_counts[date.month] += len(column) if self._integer else int(np.count_nonzero(~np.isnan(column)))
+        self._sku_totals += column if self._integer else np.nan_to_num(column)
+
+    def _drop_column(self, date):
+        column = self._columns.pop(date)
+        self._month_sums[date.month] -= self._date_totals.pop(date)
+        self._month_counts[date.month] -= len(column) if self._integer else int(np.count_nonzero(~np.isnan(column)))
+        self._sku_totals -= column if self._integer else np.nan_to_num(column)
+
+    def _promote_to_float(self):
+        self._integer = False
+        self._sku_totals = self._sku_totals.astype(np.float64)
+        self._columns = {date: column.astype(np.float64) for date, column in self._columns.items()}
+        self._date_totals = {date: float(total) for date, total in self._date_totals.items()}
+
+    def add_month(self, date, quantities):
+        """Add (or replace) the sales of one month.
+
+        quantities is aligned to self.skus, either as an array or as a Series
+        indexed by SKU (missing SKUs count as no data). Costs O(SKUs).
+        """
+        date = pd.Timestamp(date)
+        if isinstance(quantities, pd.Series):
+            quantities = quantities.reindex(self.skus)
+        column = np.asarray(quantities)
+        if len(column) != len(self.skus):
+            raise ValueError(f"Expected {len(self.skus)} quantities, got {len(column)}.")
+        if self._integer and column.dtype.kind not in 'iu':
+            if np.isnan(column).any():
+                self._promote_to_float()
+            else:
+                column = column.astype(np.int64)
+        if not self._integer:
+            column = column.astype(np.float64)
+        if date in self._columns:
+            self._drop_column(date)
+        self._columns[date] = column.copy()
+        self._add_column(date, self._columns[date])
+        self.version += 1
+
+    def update_cell(self, sku, date, quantity):
+        """Correct one SKU's quantity for one month in O(1)."""
+        date = pd.Timestamp(date)
+        if date not in self._columns:
+            raise KeyError(f"No sales recorded for {date:%m/%Y}.")
+        pos = self._sku_positions[sku]
+        column = self._columns[date]
+        if not column.flags.writeable:
+            column = self._columns[date] = column.copy()
+        if self._integer and (quantity is None or quantity != quantity or float(quantity) != int(quantity)):
+            self._promote_to_float()
+            column = self._columns[date]
+        new = np.nan if quantity is None else quantity
+        old = column[pos]
+        old_present, new_present = not (old != old), not (new != new)
+        delta = (new if new_present else 0) - (old if old_present else 0)
+        column[pos] = new
+        self._date_totals[date] += delta
+        self._month_sums[date.month] += delta
+        self._month_counts[date.month] += int(new_present) - int(old_present)
+        self._sku_totals[pos] += delta
+        self.version += 1
+
+    def refresh_from_file(self, path):
+        """Ingest month columns that were appended to the wide sales file since the last load.
+
+        Only the new columns are parsed; rows for SKUs that were not loaded
+        originally are ignored. Returns the list of dates added.
+        """
+        month_columns, dates = read_sales_header(path)
+        new = [(column, date) for column, date in zip(month_columns, dates) if date not in self._columns]
+        if not new:
+            return []
+        frame = pd.read_csv(path, usecols=['sku'] + [column for column, _ in new]).set_index('sku')
+        for column, date in new:
+            self.add_month(date, frame[column])
+        return [date for _, date in new]
+
+    def _dates(self):
+        return pd.DatetimeIndex(sorted(self._columns))
+
+    def _totals(self, dates):
+        dtype = np.int64 if self._integer else np.float64
+        return np.array([self._date_totals[date] for date in dates], dtype=dtype)
+
+    def sales_trends(self):
+        dates = self._dates()
+        return pd.DataFrame({'date_sale': dates, 'quantity': self._totals(dates)})
+
+    def monthly_sales(self):
+        dates = self._dates()
+        return pd.DataFrame({'date_sale': pd.Series(dates.strftime('%Y-%m')), 'quantity': self._totals(dates)})
+
+    def monthly_seasonality(self):
+        months = np.unique(self._dates().month)
+        return pd.DataFrame({'month': months, 'quantity': self._month_sums[months] / self._month_counts[months]})
+
+    def sku_totals(self):
+        return pd.Series(self._sku_totals, index=self.skus, name='quantity')
+
+    def analyze(self, product_data):
+        """Return the same (sales_trends, monthly_sales, monthly_seasonality, on_demand_vs_regular) as analyze_data."""
+        on_demand_vs_regular = product_data.groupby('on_demand')['name'].count().reset_index(name='count')
+        return self.sales_trends(), self.monthly_sales(), self.monthly_seasonality(), on_demand_vs_regular
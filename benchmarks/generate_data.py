@@ -0,0 +1,108 @@
+"""Synthetic data generator for the benchmark suite.
+
+Writes product_data.csv, mat_data.csv, sales_data.csv and inventory.csv in
+the same layout as the sample files, at any scale:
+
+    python benchmarks/generate_data.py --skus 100000 --months 60 --output bench_data
+
+Sales rows are written in chunks, so even 1M SKUs x 240 months never holds
+the full table in memory.
+"""
+import argparse
+import os
+import numpy as np
+import pandas as pd
+
+# Last month in the generated sales history (the sample data ends 10/2023)
+END_MONTH = '2023-10'
+
+# Sales rows generated and written per chunk
+SALES_CHUNK_ROWS = 50_000
+
+
+def sku_codes(n_skus):
+    return np.char.add('27-033-', np.char.zfill(np.arange(n_skus).astype(str), 7))
+
+
+def month_headers(n_months, end_month=END_MONTH):
+    months = pd.period_range(end=end_month, periods=n_months, freq='M')
+    return list(months.strftime('%m/%Y'))
+
+
+def make_materials(n_materials, rng):
+    raw_ids = np.char.add('M', np.char.zfill(np.arange(n_materials).astype(str), 5))
+    return pd.DataFrame({
+        'raw_id': raw_ids,
+        'name': np.char.add('Material ', np.arange(n_materials).astype(str)),
+        'cost_pp': rng.integers(5, 150, n_materials),
+        'stock': rng.integers(0, 1000, n_materials),
+    })
+
+
+def make_products(n_skus, materials, rng, on_demand_share=0.3):
+    on_demand = rng.random(n_skus) < on_demand_share
+    return pd.DataFrame({
+        'sku': sku_codes(n_skus),
+        'name': np.char.add('Product ', np.arange(n_skus).astype(str)),
+        'on_demand': np.where(on_demand, 'yes', 'no'),
+        # On-demand products are made to order and carry no stock
+        'stock': np.where(on_demand, 0, rng.integers(0, 500, n_skus)),
+        'price_pp': rng.integers(10, 400, n_skus),
+        'mat_id': materials['raw_id'].to_numpy()[rng.integers(0, len(materials), n_skus)],
+        'avg_lt': rng.integers(5, 60, n_skus),
+    })
+
+
+def write_sales(path, products, n_months, rng, chunk_rows=SALES_CHUNK_ROWS):
+    """Write the wide sales file chunk by chunk: one row per SKU, one column per month."""
+    headers = month_headers(n_months)
+    # Per-SKU base demand with a yearly seasonal swing
+    season = 1 + 0.3 * np.sin(2 * np.pi * pd.to_datetime(headers, format='%m/%Y').month.to_numpy() / 12)
+    with open(path, 'w', newline='') as file:
+        for start in range(0, len(products), chunk_rows):
+            chunk = products.iloc[start:start + chunk_rows]
+            base = rng.gamma(2.0, 40.0, len(chunk))
+            values = rng.poisson(np.outer(base, season))
+            frame = pd.DataFrame(values, columns=headers)
+            frame.insert(0, 'name', chunk['name'].to_numpy())
+            frame.insert(0, 'sku', chunk['sku'].to_numpy())
+            frame.to_csv(file, index=False, header=start == 0)
+
+
+def make_inventory(products, rng):
+    return pd.DataFrame({
+        'Item Name': products['sku'],
+        'Quantity': products['stock'],
+        'Reorder Level': rng.integers(0, 50, len(products)),
+    })
+
+
+def generate_dataset(output_dir, n_skus=10_000, n_months=12, n_materials=None, seed=0):
+    """Write the four CSV files for n_skus products and n_months of sales into output_dir."""
+    os.makedirs(output_dir, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    n_materials = n_materials or max(3, n_skus // 100)
+    materials = make_materials(n_materials, rng)
+    products = make_products(n_skus, materials, rng)
+    materials.to_csv(os.path.join(output_dir, 'mat_data.csv'), index=False)
+    products.to_csv(os.path.join(output_dir, 'product_data.csv'), index=False)
+    write_sales(os.path.join(output_dir, 'sales_data.csv'), products, n_months, rng)
+    make_inventory(products, rng).to_csv(os.path.join(output_dir, 'inventory.csv'), index=False)
+    return {"skus": n_skus, "months": n_months, "materials": n_materials, "seed": seed}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate synthetic product, material, sales and inventory CSV files.")
+    parser.add_argument('--skus', type=int, default=10_000)
+    parser.add_argument('--months', type=int, default=12)
+    parser.add_argument('--materials', type=int, default=None, help="default: one per 100 SKUs")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='bench_data')
+    args = parser.parse_args(argv)
+
+    spec = generate_dataset(args.output, args.skus, args.months, args.materials, args.seed)
+    print(f"Generated {spec['skus']} SKUs x {spec['months']} months ({spec['materials']} materials) in {args.output}.")
+
+
+if __name__ == "__main__":
+    main()
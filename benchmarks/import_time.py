@@ -0,0 +1,98 @@
+"""Measure module import times and guard against heavy imports creeping back in.
+
+Usage:
+    python benchmarks/import_time.py
+    python benchmarks/import_time.py --repeat 5 --max-ms 250
+
+Each module is imported in a fresh interpreter with -X importtime. The check
+fails (exit status 1) if a module pulls in one of its forbidden dependencies
+at import time, or if main takes longer than --max-ms to import; main's
+import time is what the user waits for before the login window appears.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY = ('pandas', 'numpy', 'matplotlib', 'seaborn')
+# Module -> top-level packages it must not import when it is imported
+IMPORT_CHECKS = {
+    # main must not reach plotting either: it imports pandas and numpy at module level
+    'main': HEAVY + ('plotting',),
+    'data_processing': HEAVY + ('tkinter',),
+    'plotting': ('matplotlib', 'seaborn', 'tkinter'),
+    'report_export': ('seaborn', 'tkinter'),
+    'compact_data': ('matplotlib', 'seaborn', 'tkinter'),
+    'forecasting': ('matplotlib', 'seaborn', 'tkinter'),
+    'statistics_service': ('matplotlib', 'seaborn', 'tkinter'),
+    'inventory_search': ('pandas', 'matplotlib', 'seaborn', 'tkinter'),
+    'sales_cube': ('matplotlib', 'seaborn', 'tkinter'),
+    'inventory_reconcile': ('matplotlib', 'seaborn', 'tkinter'),
+    'inventory_service': HEAVY + ('tkinter',),
+    'http_api': ('matplotlib', 'seaborn', 'tkinter'),
+}
+DEFAULT_REPEAT = 3
+# Import budget for main, i.e. for the time before the login window can open
+DEFAULT_MAX_MS = 300.0
+
+_PROBE = "import sys, json; import {module}; print(json.dumps(sorted({{m.split('.')[0] for m in sys.modules}})))"
+
+
+def import_once(module):
+    """Import module in a fresh interpreter; return (cumulative ms, top-level packages loaded)."""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', _PROBE.format(module=module)],
+                            cwd=REPO_DIR, capture_output=True, text=True, check=True)
+    # Lines look like "import time:  self [us] | cumulative | module"
+    cumulative_us = None
+    for line in result.stderr.splitlines():
+        parts = line.split('|')
+        if len(parts) == 3 and parts[2].strip() == module:
+            cumulative_us = int(parts[1])
+    loaded = json.loads(result.stdout.strip().splitlines()[-1])
+    return cumulative_us / 1000.0, loaded
+
+
+def check_module(module, forbidden, repeat):
+    timings = []
+    loaded = []
+    for _ in range(repeat):
+        ms, loaded = import_once(module)
+        timings.append(ms)
+    return {"module": module, "best_ms": round(min(timings), 1),
+            "forbidden_loaded": [name for name in forbidden if name in loaded]}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Guard module import times.")
+    parser.add_argument('--modules', nargs='+', default=list(IMPORT_CHECKS))
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT)
+    parser.add_argument('--max-ms', type=float, default=DEFAULT_MAX_MS, help="import budget for main")
+    parser.add_argument('--output', help="write the results as JSON")
+    args = parser.parse_args(argv)
+
+    results = [check_module(module, IMPORT_CHECKS.get(module, HEAVY), args.repeat) for module in args.modules]
+    failures = []
+    for result in results:
+        status = "ok"
+        if result["forbidden_loaded"]:
+            status = "imports " + ", ".join(result["forbidden_loaded"])
+            failures.append(result["module"])
+        elif result["module"] == 'main' and result["best_ms"] > args.max_ms:
+            status = f"over budget ({args.max_ms:.0f} ms)"
+            failures.append(result["module"])
+        print(f"{result['module']:<20} {result['best_ms']:8.1f} ms  {status}")
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump({"python": sys.version.split()[0], "results": results}, file, indent=2)
+    if failures:
+        print(f"FAILED: {', '.join(failures)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
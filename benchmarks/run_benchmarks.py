@@ -0,0 +1,275 @@
+"""Time and memory-profile every pipeline stage on synthetic data.
+
+Usage:
+    python benchmarks/run_benchmarks.py --scales 10000x12 100000x60
+    python benchmarks/run_benchmarks.py --baseline benchmarks/results/previous.json
+
+For each SKUsxMONTHS scale a dataset is generated (or reused with --data-dir)
+and load_and_preprocess, load_compact, analyze_data, analyze_stock_levels, create_figures,
+the add/update/remove inventory paths and the bulk reconcile are run --repeat times. Wall time
+comes from untraced runs; peak memory from one extra run under tracemalloc.
+Results are written as JSON; with --baseline, stages slower than
+--tolerance times the baseline are reported and the exit status is 1.
+"""
+import argparse
+import contextlib
+import gc
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+import matplotlib
+matplotlib.use('Agg')
+import numpy as np
+import pandas as pd
+import compact_data
+import data_cache
+from compact_data import load_compact
+from data_processing import load_and_preprocess, analyze_data, analyze_stock_levels
+from inventory_journal import InventoryJournal, atomic_write_csv
+from inventory_reconcile import plan_reconcile
+from inventory_service import (add_item_to_inventory, apply_changes, record_change, remove_item_from_inventory,
+                               update_inventory_item)
+from inventory_store import InventoryStore
+from plotting import create_figures
+from generate_data import generate_dataset
+
+DEFAULT_SCALES = ['10000x12']
+DEFAULT_REPEAT = 3
+# Inventory operations timed per add/update/remove stage
+DEFAULT_INVENTORY_OPS = 2000
+# A stage this many times slower than the baseline counts as a regression
+DEFAULT_TOLERANCE = 1.25
+
+
+def parse_scale(text):
+    skus, months = text.lower().split('x')
+    return int(skus), int(months)
+
+
+def measure(fn, repeat, setup=None):
+    """Run fn repeat times untraced and once under tracemalloc; return timings and peak memory."""
+    seconds = []
+    result = None
+    for _ in range(repeat):
+        state = setup() if setup else None
+        gc.collect()
+        start = time.perf_counter()
+        result = fn(state) if setup else fn()
+        seconds.append(time.perf_counter() - start)
+
+    state = setup() if setup else None
+    gc.collect()
+    tracemalloc.start()
+    fn(state) if setup else fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, {
+        "seconds": [round(s, 6) for s in seconds],
+        "best": round(min(seconds), 6),
+        "median": round(statistics.median(seconds), 6),
+        "peak_mb": round(peak / 2**20, 3),
+    }
+
+
+def clear_memory_caches():
+    data_cache.clear_cache()
+    compact_data.clear_cache()
+
+
+def clear_data_cache(data_dir):
+    clear_memory_caches()
+    shutil.rmtree(os.path.join(data_dir, data_cache.CACHE_DIR_NAME), ignore_errors=True)
+
+
+def benchmark_loading(data_dir, repeat):
+    stages = {}
+    # Cold: parse the CSV files (and write the binary cache)
+    _, stages['load_and_preprocess_cold'] = measure(
+        lambda _: load_and_preprocess(data_dir), repeat, setup=lambda: clear_data_cache(data_dir))
+    # Warm: read the binary cache written by the cold run
+    _, stages['load_and_preprocess_cached'] = measure(
+        lambda _: load_and_preprocess(data_dir), repeat, setup=clear_memory_caches)
+    # Compact model: build the shared sales matrix, then map the one already on disk
+    _, stages['load_compact_cold'] = measure(
+        lambda _: load_compact(data_dir), repeat, setup=lambda: clear_data_cache(data_dir))
+    _, stages['load_compact_mapped'] = measure(
+        lambda _: load_compact(data_dir), repeat, setup=clear_memory_caches)
+    return stages
+
+
+def benchmark_analysis(data_dir, repeat):
+    stages = {}
+    product_data, mat_data, sales_data = load_and_preprocess(data_dir)
+    analysis, stages['analyze_data'] = measure(lambda: analyze_data(product_data, mat_data, sales_data), repeat)
+    stock, stages['analyze_stock_levels'] = measure(lambda: analyze_stock_levels(product_data, mat_data), repeat)
+    frames = analysis + stock
+    # No data_version: every run builds the figures instead of hitting the figure cache
+    _, stages['create_figures'] = measure(lambda: create_figures(*frames), repeat)
+    _, stages['create_figures_month'] = measure(lambda: create_figures(*frames, selected_month='1'), repeat)
+
+    product_compact, _, sales = load_compact(data_dir)
+    _, stages['analyze_compact'] = measure(lambda: sales.analyze(product_compact), repeat)
+    return stages
+
+
+def benchmark_inventory(data_dir, repeat, n_ops):
+    """Time the GUI's add/update/remove paths: the inventory_service wrapper plus its journal record.
+
+    The journal lives in data_dir, so the benchmark never touches the app's own
+    inventory.csv or INVENTORY_DB, and the GUI module is never imported.
+    """
+    stages = {}
+    inventory_file = os.path.join(data_dir, 'inventory.csv')
+    snapshot = pd.read_csv(inventory_file)
+    names = [f"BENCH-{i:07d}" for i in range(n_ops)]
+    existing = snapshot['Item Name'].to_numpy()[:n_ops]
+    journal = None
+
+    def fresh_store():
+        # Each run starts from the generated snapshot with an empty journal; the
+        # previous run's background compaction must finish before its files go
+        nonlocal journal
+        if journal is not None:
+            journal.wait_for_compaction()
+        atomic_write_csv(snapshot, inventory_file)
+        for path in (inventory_file + '.journal', inventory_file + '.journal.compacting'):
+            if os.path.exists(path):
+                os.remove(path)
+        journal = InventoryJournal(inventory_file)
+        return InventoryStore.from_frame(snapshot)
+
+    def run_adds(store):
+        for i, name in enumerate(names):
+            store = add_item_to_inventory(store, name, i, 10)
+            record_change(journal, 'add', name, i, 10)
+        return store
+
+    def run_updates(store):
+        for i, name in enumerate(existing):
+            store = update_inventory_item(store, name, i)
+            record_change(journal, 'update', name, i)
+        return store
+
+    def run_removes(store):
+        for name in existing:
+            store = remove_item_from_inventory(store, name)
+            record_change(journal, 'remove', name)
+        return store
+
+    # The wrappers print one line per edit; keep that out of the terminal but inside the timing
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        for stage, fn, count in (('inventory_add', run_adds, len(names)),
+                                 ('inventory_update', run_updates, len(existing)),
+                                 ('inventory_remove', run_removes, len(existing))):
+            _, stages[stage] = measure(fn, repeat, setup=fresh_store)
+            stages[stage]["operations"] = count
+            stages[stage]["us_per_op"] = round(stages[stage]["best"] / max(count, 1) * 1e6, 3)
+
+        # Bulk path: reconcile the whole inventory with product_data.csv, then apply only the diff
+        product_file = os.path.join(data_dir, 'product_data.csv')
+        plan, stages['reconcile_plan'] = measure(
+            lambda store: plan_reconcile(store, product_file, mode='replace'), repeat, setup=fresh_store)
+        _, stages['reconcile_apply'] = measure(
+            lambda store: apply_changes(journal, store, plan.ops()), repeat, setup=fresh_store)
+        stages['reconcile_apply']["operations"] = len(plan)
+        journal.wait_for_compaction()
+    return stages
+
+
+def run_scale(n_skus, n_months, repeat, n_ops, data_dir=None, seed=0):
+    own_dir = data_dir is None
+    if own_dir:
+        data_dir = tempfile.mkdtemp(prefix=f"bench_{n_skus}x{n_months}_")
+    try:
+        start = time.perf_counter()
+        if own_dir:
+            spec = generate_dataset(data_dir, n_skus, n_months, seed=seed)
+        else:
+            spec = {"data_dir": os.path.abspath(data_dir)}
+        generate_seconds = round(time.perf_counter() - start, 3)
+
+        stages = {}
+        stages.update(benchmark_loading(data_dir, repeat))
+        stages.update(benchmark_analysis(data_dir, repeat))
+        stages.update(benchmark_inventory(data_dir, repeat, n_ops))
+        return {"scale": f"{n_skus}x{n_months}", "dataset": spec, "generate_seconds": generate_seconds, "stages": stages}
+    finally:
+        if own_dir:
+            shutil.rmtree(data_dir, ignore_errors=True)
+
+
+def environment():
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "matplotlib": matplotlib.__version__,
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Return (scale, stage, baseline best, current best) for every stage slower than tolerance x baseline."""
+    previous = {run["scale"]: run["stages"] for run in baseline["runs"]}
+    regressions = []
+    for run in results["runs"]:
+        for stage, current in run["stages"].items():
+            before = previous.get(run["scale"], {}).get(stage)
+            if before and current["best"] > before["best"] * tolerance:
+                regressions.append((run["scale"], stage, before["best"], current["best"]))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the data pipeline, plotting and inventory paths.")
+    parser.add_argument('--scales', nargs='+', default=DEFAULT_SCALES, help="SKUsxMONTHS, e.g. 10000x12 1000000x240")
+    parser.add_argument('--data-dir', default=None, help="benchmark existing CSV files instead of generating them")
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT)
+    parser.add_argument('--inventory-ops', type=int, default=DEFAULT_INVENTORY_OPS)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default=None, help="JSON results file (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument('--baseline', default=None, help="earlier results file to compare against")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE)
+    args = parser.parse_args(argv)
+
+    results = {"generated_at": time.strftime('%Y-%m-%dT%H:%M:%S'), "environment": environment(),
+               "repeat": args.repeat, "runs": []}
+    scales = [None] if args.data_dir else [parse_scale(scale) for scale in args.scales]
+    for scale in scales:
+        if scale is None:
+            run = run_scale(0, 0, args.repeat, args.inventory_ops, data_dir=args.data_dir)
+            run["scale"] = os.path.basename(os.path.abspath(args.data_dir))
+        else:
+            run = run_scale(*scale, args.repeat, args.inventory_ops, seed=args.seed)
+        results["runs"].append(run)
+        for stage, timing in run["stages"].items():
+            print(f"{run['scale']:>14}  {stage:<28} {timing['best'] * 1000:10.1f} ms  {timing['peak_mb']:9.1f} MB")
+
+    output = args.output or os.path.join(REPO_DIR, 'benchmarks', 'results', time.strftime('%Y%m%d-%H%M%S') + '.json')
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as file:
+        json.dump(results, file, indent=2)
+    print(f"Results written to {output}.")
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            regressions = compare(results, json.load(file), args.tolerance)
+        for scale, stage, before, after in regressions:
+            print(f"REGRESSION {scale} {stage}: {before * 1000:.1f} ms -> {after * 1000:.1f} ms")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,233 @@
+"""Compact data model shared between processes.
+
+The wide sales file is held as one dense SKU x month array instead of a long
+frame that repeats each SKU and name string once per month. The array is
+persisted as a .npy file in the .data_cache directory next to the source and
+opened with mmap_mode='r', so the GUI, report_export workers and the
+benchmarks all read the same pages of the OS page cache without copying
+them. Product and material frames are narrowed with categorical string
+columns and the smallest integer dtypes that hold their values.
+
+CompactSales.to_long() and CompactSales.analyze() give back the frames
+analyze_data and create_figures expect.
+"""
+import glob
+import hashlib
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+from analytics_engine import SalesAggregator
+import data_cache
+from data_cache import CACHE_DIR_NAME, read_columnar, read_csv_cached, source_signature, write_columnar
+from instrumentation import count, span, traced
+from sales_ingest import DEFAULT_MEMORY_LIMIT, load_sales_matrix
+
+# Bump when the matrix file layout changes
+MATRIX_FORMAT_VERSION = 1
+
+# String columns with at most this share of distinct values become categoricals
+CATEGORY_MAX_RATIO = 0.5
+
+# Sales models already opened in this process, keyed by absolute path
+_open_models = {}
+
+
+class CompactSales:
+    """SKU x month sales held as one narrow-dtype (usually int32) array.
+
+    skus and names are stored once per SKU; matrix[i, j] is the quantity of
+    skus[i] in dates[j]. The matrix is column-major, so each month is a
+    contiguous column, and is typically a read-only memory map.
+    """
+
+    def __init__(self, skus, names, dates, matrix):
+        self.skus = pd.Index(skus)
+        self.names = pd.Index(names)
+        self.dates = pd.DatetimeIndex(dates)
+        self.matrix = matrix
+
+    def __len__(self):
+        return len(self.skus)
+
+    @property
+    def nbytes(self):
+        """Bytes held by the matrix plus the per-SKU id strings."""
+        return int(self.matrix.nbytes + self.skus.memory_usage(deep=True) + self.names.memory_usage(deep=True))
+
+    def to_long(self):
+        """The long (sku, name, date_sale, quantity) frame load_and_preprocess returns.
+
+        Rows are in the same month-major order; sku and name are categoricals
+        whose codes point back at the per-SKU strings, so no string is repeated.
+        """
+        n, m = self.matrix.shape
+        rows = np.tile(np.arange(n, dtype=np.int32), m)
+        return pd.DataFrame({
+            'sku': _categorical(self.skus, rows),
+            'name': _categorical(self.names, rows),
+            'date_sale': self.dates.repeat(n),
+            'quantity': np.asarray(self.matrix).ravel(order='F'),
+        }, copy=False)
+
+    def aggregator(self):
+        """SalesAggregator over the shared matrix (columns are views, not copies)."""
+        return SalesAggregator.from_matrix(self.skus, self.dates, self.matrix, self.names, copy=False)
+
+    def analyze(self, product_data):
+        """Return the same (sales_trends, monthly_sales, monthly_seasonality, on_demand_vs_regular) as analyze_data."""
+        return self.aggregator().analyze(product_data)
+
+
+def _categorical(values, rows):
+    codes, categories = pd.factorize(values)
+    return pd.Categorical.from_codes(codes.astype(np.int32)[rows], categories=categories)
+
+
+def narrow_dtype(matrix):
+    """int32 for integer matrices whose values fit, otherwise the matrix's own dtype."""
+    if matrix.dtype.kind not in 'iu':
+        return matrix.dtype
+    info = np.iinfo(np.int32)
+    if matrix.size == 0 or (info.min <= matrix.min() and matrix.max() <= info.max):
+        return np.dtype(np.int32)
+    return matrix.dtype
+
+
+def compact_frame(df, max_category_ratio=CATEGORY_MAX_RATIO):
+    """Return df with repetitive string columns as categoricals and integer columns downcast."""
+    columns = {}
+    for name in df.columns:
+        series = df[name]
+        if series.dtype == object or isinstance(series.dtype, pd.StringDtype):
+            if len(series) and series.nunique(dropna=True) <= max_category_ratio * len(series):
+                series = series.astype('category')
+        elif series.dtype.kind in 'iu':
+            series = pd.to_numeric(series, downcast='integer')
+        columns[name] = series
+    return pd.DataFrame(columns, index=df.index)
+
+
+def widen_frame(df):
+    """Undo compact_frame on a (small) result frame: categoricals back to their values' dtype, integers to int64.
+
+    compute_analytics applies this to what it returns, so callers get the
+    dtypes of the read_csv path whether or not the data was loaded compact.
+    """
+    columns = {}
+    for name in df.columns:
+        series = df[name]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            series = series.astype(series.dtype.categories.dtype)
+        elif series.dtype.kind in 'iu':
+            series = series.astype(np.int64)
+        columns[name] = series
+    return pd.DataFrame(columns, index=df.index)
+
+
+def matrix_paths(path, signature):
+    """(matrix file, SKU id file, month file) for this version of a sales file.
+
+    The matrix file name carries the source mtime and size, so a file that is
+    mapped by another process is never rewritten in place.
+    """
+    abs_path = signature["path"]
+    digest = hashlib.sha1(abs_path.encode()).hexdigest()[:12]
+    directory = os.path.join(os.path.dirname(abs_path), CACHE_DIR_NAME)
+    prefix = f"{os.path.basename(abs_path)}.matrix.{digest}"
+    version = f"v{MATRIX_FORMAT_VERSION}-{signature['mtime_ns']}-{signature['size']}"
+    return (os.path.join(directory, f"{prefix}.{version}.npy"), os.path.join(directory, f"{prefix}.ids.npz"),
+            os.path.join(directory, f"{prefix}.dates.npz"))
+
+
+def _write_matrix(matrix, target):
+    directory = os.path.dirname(target)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix='.' + os.path.basename(target) + '.', suffix='.tmp', dir=directory)
+    os.close(fd)
+    try:
+        out = np.lib.format.open_memmap(tmp_path, mode='w+', dtype=narrow_dtype(matrix),
+                                        shape=matrix.shape, fortran_order=True)
+        out[...] = matrix
+        out.flush()
+        del out
+        os.replace(tmp_path, target)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    # Older versions of this file are no longer reachable; processes that still map them keep their pages
+    prefix = target.rsplit('.v', 1)[0]
+    for stale in glob.glob(glob.escape(prefix) + '.v*.npy'):
+        if stale != target:
+            try:
+                os.remove(stale)
+            except OSError:
+                pass
+
+
+def _open_matrix(target, n_skus, n_dates):
+    try:
+        matrix = np.load(target, mmap_mode='r', allow_pickle=False)
+    except (OSError, ValueError):
+        return None
+    return matrix if matrix.shape == (n_skus, n_dates) else None
+
+
+def _build(path, signature, memory_limit):
+    skus, names, dates, matrix = load_sales_matrix(path, memory_limit)
+    if not data_cache.CACHE_ENABLED:
+        return CompactSales(skus, names, dates, np.asfortranarray(matrix, dtype=narrow_dtype(matrix)))
+    matrix_file, ids_file, dates_file = matrix_paths(path, signature)
+    try:
+        # Matrix first: a current id file implies its matrix is complete
+        _write_matrix(matrix, matrix_file)
+        ids = pd.DataFrame({'sku': pd.Series(skus, dtype=object), 'name': pd.Series(names, dtype=object)})
+        write_columnar(ids, ids_file, signature)
+        write_columnar(pd.DataFrame({'date_sale': dates}), dates_file, signature)
+    except OSError as e:
+        print(f"Could not write sales matrix {matrix_file}: {e}")
+        return CompactSales(skus, names, dates, np.asfortranarray(matrix, dtype=narrow_dtype(matrix)))
+    return CompactSales(skus, names, dates, _open_matrix(matrix_file, len(skus), len(dates)))
+
+
+@traced('compact.load_sales')
+def load_compact_sales(path, memory_limit=DEFAULT_MEMORY_LIMIT):
+    """Open the shared sales matrix of path, building it on the first call after the file changes."""
+    signature = source_signature(path)
+    cached = _open_models.get(signature["path"])
+    if cached is not None and cached[0] == signature:
+        count('compact.memory_hit')
+        return cached[1]
+
+    matrix_file, ids_file, dates_file = matrix_paths(path, signature)
+    model = None
+    if data_cache.CACHE_ENABLED:
+        with span('compact.map', source=os.path.basename(path)):
+            ids = read_columnar(ids_file, signature)
+            dates = read_columnar(dates_file, signature)
+            if ids is not None and dates is not None:
+                matrix = _open_matrix(matrix_file, len(ids), len(dates))
+                if matrix is not None:
+                    model = CompactSales(ids['sku'], ids['name'], dates['date_sale'], matrix)
+    if model is None:
+        count('compact.miss')
+        model = _build(path, signature, memory_limit)
+    else:
+        count('compact.disk_hit')
+    _open_models[signature["path"]] = (signature, model)
+    return model
+
+
+def clear_cache():
+    """Forget the models opened in this process (the files on disk are kept)."""
+    _open_models.clear()
+
+
+@traced()
+def load_compact(data_dir='.'):
+    """(product_data, mat_data, CompactSales) with narrowed dtypes; the compact counterpart of load_and_preprocess."""
+    product_data = compact_frame(read_csv_cached(os.path.join(data_dir, 'product_data.csv')))
+    mat_data = compact_frame(read_csv_cached(os.path.join(data_dir, 'mat_data.csv')))
+    sales = load_compact_sales(os.path.join(data_dir, 'sales_data.csv'))
+    return product_data, mat_data, sales
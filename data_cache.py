@@ -0,0 +1,127 @@
+import hashlib
+import json
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+from instrumentation import count, span
+
+# Bump when the on-disk layout or a cached loader's output changes
+CACHE_FORMAT_VERSION = 1
+CACHE_DIR_NAME = '.data_cache'
+
+# Set to False to always parse the source CSVs
+CACHE_ENABLED = True
+
+# Frames already loaded in this process, keyed by (kind, absolute path)
+_memory_cache = {}
+
+
+def source_signature(path):
+    """Identify a source file version by absolute path, mtime and size."""
+    stat = os.stat(path)
+    return {"path": os.path.abspath(path), "mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+
+
+def cache_path(path, kind):
+    abs_path = os.path.abspath(path)
+    digest = hashlib.sha1(abs_path.encode()).hexdigest()[:12]
+    name = f"{os.path.basename(abs_path)}.{kind}.{digest}.npz"
+    return os.path.join(os.path.dirname(abs_path), CACHE_DIR_NAME, name)
+
+
+# Function to write a DataFrame as one uncompressed NumPy array per column
+def write_columnar(df, path, signature):
+    arrays = {}
+    columns = []
+    for i, name in enumerate(df.columns):
+        series = df[name]
+        key = f"c{i}"
+        if series.dtype == object or isinstance(series.dtype, pd.StringDtype):
+            # Strings are stored as fixed-width unicode plus a null mask, so no pickling is needed
+            nulls = series.isna().to_numpy()
+            arrays[key] = series.where(~nulls, '').astype(str).to_numpy(dtype=str)
+            arrays[key + "_null"] = nulls
+            columns.append({"name": str(name), "kind": "str", "dtype": str(series.dtype)})
+        else:
+            arrays[key] = series.to_numpy()
+            columns.append({"name": str(name), "kind": "native", "dtype": str(series.dtype)})
+    meta = {"version": CACHE_FORMAT_VERSION, "source": signature, "columns": columns}
+    arrays["__meta__"] = np.array(json.dumps(meta))
+
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix='.' + os.path.basename(path) + '.', suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as file:
+            np.savez(file, **arrays)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def read_columnar(path, signature):
+    """Load a cached frame, or return None if it is missing or stale."""
+    try:
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data["__meta__"]))
+            if meta.get("version") != CACHE_FORMAT_VERSION or meta.get("source") != signature:
+                return None
+            columns = {}
+            for i, column in enumerate(meta["columns"]):
+                values = data[f"c{i}"]
+                if column["kind"] == "str":
+                    values = values.astype(object)
+                    values[data[f"c{i}_null"]] = np.nan
+                    if column["dtype"] != 'object':
+                        values = pd.Series(values, dtype=column["dtype"])
+                    columns[column["name"]] = values
+                else:
+                    columns[column["name"]] = pd.Series(values, dtype=column["dtype"])
+    except (OSError, ValueError, KeyError):
+        return None
+    return pd.DataFrame(columns)
+
+
+def cached_frame(path, kind, loader):
+    """Return loader(path), served from the binary cache while path is unchanged.
+
+    The cache entry is keyed by source path, mtime and size and lives in a
+    .data_cache directory next to the source file. A copy is returned so
+    callers may modify the frame freely.
+    """
+    if not CACHE_ENABLED:
+        return loader(path)
+    signature = source_signature(path)
+    key = (kind, signature["path"])
+    cached = _memory_cache.get(key)
+    if cached is not None and cached[0] == signature:
+        count('data_cache.memory_hit')
+        return cached[1].copy()
+
+    target = cache_path(path, kind)
+    with span('data_cache.read', kind=kind, source=os.path.basename(path)):
+        df = read_columnar(target, signature)
+    if df is None:
+        count('data_cache.miss')
+        with span('csv.parse', kind=kind, source=os.path.basename(path)):
+            df = loader(path)
+        try:
+            write_columnar(df, target, signature)
+        except OSError as e:
+            print(f"Could not write data cache {target}: {e}")
+    else:
+        count('data_cache.disk_hit')
+    _memory_cache[key] = (signature, df)
+    return df.copy()
+
+
+def read_csv_cached(path):
+    """pd.read_csv(path) through the shared cache."""
+    return cached_frame(path, 'csv', pd.read_csv)
+
+
+def clear_cache():
+    _memory_cache.clear()
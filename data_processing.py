@@ -1,5 +1,9 @@
-import pandas as pd
 import hashlib
+import os
+from instrumentation import span, traced
+
+# pandas and the loaders built on it are imported by the functions that need them,
+# so importing this module for the login check stays cheap
 
 # User credentials (simulating a database)
 users = {
@@ -14,29 +18,38 @@ def verify_password(stored_password, provided_password):
     """Verify a stored password against one provided by user."""
     return stored_password == hashlib.sha256(provided_password.encode()).hexdigest()
 
-# Function to load and preprocess data
-def load_and_preprocess():
-    product_data = pd.read_csv('product_data.csv')
-    mat_data = pd.read_csv('mat_data.csv')
-    sales_data = pd.read_csv('sales_data.csv')
+# Function to read the wide sales file and reshape it to long format
+def read_sales_long(path, memory_limit=None):
+    # Reshaping sales data to a long format for easier analysis. The file is read in
+    # row chunks into a dense SKU x month array and each month header is parsed once,
+    # which gives the same frame as melt + to_datetime without their intermediate copies.
+    from sales_ingest import DEFAULT_MEMORY_LIMIT, read_sales_long_streaming
+    return read_sales_long_streaming(path, memory_limit or DEFAULT_MEMORY_LIMIT)
 
-    # Reshaping sales data to a long format for easier analysis
-    sales_data_long = sales_data.melt(id_vars=['sku', 'name'], 
-                                      var_name='date_sale', 
-                                      value_name='quantity')
-    sales_data_long['date_sale'] = pd.to_datetime(sales_data_long['date_sale'], format='%m/%Y')
+# Function to load and preprocess data
+@traced()
+def load_and_preprocess(data_dir='.'):
+    from data_cache import cached_frame, read_csv_cached
+    # Parsed frames are served from the binary cache until the CSVs change
+    product_data = read_csv_cached(os.path.join(data_dir, 'product_data.csv'))
+    mat_data = read_csv_cached(os.path.join(data_dir, 'mat_data.csv'))
+    sales_data_long = cached_frame(os.path.join(data_dir, 'sales_data.csv'), 'sales_long', read_sales_long)
 
     return product_data, mat_data, sales_data_long
 
 # Function for data analysis
+@traced()
 def analyze_data(product_data, mat_data, sales_data):
-    # Extracting month from the date for seasonality analysis
-    sales_data['month'] = sales_data['date_sale'].dt.month
+    # Extracting month from the date for seasonality analysis (without modifying sales_data)
+    month = sales_data['date_sale'].dt.month.rename('month')
 
     # Sales analysis
-    sales_trends = sales_data.groupby('date_sale')['quantity'].sum().reset_index()
-    monthly_sales = sales_data.groupby(sales_data['date_sale'].dt.strftime('%Y-%m'))['quantity'].sum().reset_index(name='quantity')
-    monthly_seasonality = sales_data.groupby('month')['quantity'].mean().reset_index(name='quantity')
+    with span('analyze_data.sales_trends'):
+        sales_trends = sales_data.groupby('date_sale')['quantity'].sum().reset_index()
+    with span('analyze_data.monthly_sales'):
+        monthly_sales = sales_data.groupby(sales_data['date_sale'].dt.strftime('%Y-%m'))['quantity'].sum().reset_index(name='quantity')
+    with span('analyze_data.monthly_seasonality'):
+        monthly_seasonality = sales_data.groupby(month)['quantity'].mean().reset_index(name='quantity')
 
     # Comparison of on demand vs regular products in terms of sales
     on_demand_vs_regular = product_data.groupby('on_demand')['name'].count().reset_index(name='count')
@@ -44,6 +57,7 @@ def analyze_data(product_data, mat_data, sales_data):
     return sales_trends, monthly_sales, monthly_seasonality, on_demand_vs_regular
 
 # Function to analyze inventory stock levels
+@traced()
 def analyze_stock_levels(product_data, mat_data):
     # Exclude on-demand products
     non_on_demand_products = product_data[product_data['on_demand'] == 'no']
@@ -54,6 +68,27 @@ def analyze_stock_levels(product_data, mat_data):
 
     return product_stock, material_stock
 
+# Function to run the whole load + analysis pipeline
+@traced()
+def compute_analytics(data_dir='.', compact=False):
+    """Return the six frames create_gui and create_figures take.
+
+    With compact=True the sales are aggregated straight from the shared
+    memory-mapped matrix of compact_data instead of the long frame.
+    """
+    if compact:
+        from compact_data import load_compact, widen_frame
+        product_data, mat_data, sales = load_compact(data_dir)
+        sales_trends, monthly_sales, monthly_seasonality, on_demand_vs_regular = sales.analyze(product_data)
+        product_stock, material_stock = analyze_stock_levels(product_data, mat_data)
+        # The narrowed categorical/int16 columns stay inside; callers get the read_csv dtypes
+        on_demand_vs_regular, product_stock, material_stock = map(widen_frame, (on_demand_vs_regular, product_stock, material_stock))
+    else:
+        product_data, mat_data, sales_data = load_and_preprocess(data_dir)
+        sales_trends, monthly_sales, monthly_seasonality, on_demand_vs_regular = analyze_data(product_data, mat_data, sales_data)
+        product_stock, material_stock = analyze_stock_levels(product_data, mat_data)
+    return sales_trends, monthly_sales, monthly_seasonality, on_demand_vs_regular, product_stock, material_stock
+
 def display_basic_statistics(data):
     statistics = data.describe()
     return statistics
\ No newline at end of file
@@ -0,0 +1,172 @@
+"""Per-SKU demand forecasts fitted for every SKU at once.
+
+Usage:
+    python forecasting.py --horizon 6 --output forecast.csv
+"""
+import argparse
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from data_cache import source_signature
+from sales_ingest import load_sales_matrix
+from instrumentation import traced
+
+DEFAULT_HORIZON = 6
+# Monthly seasonality is only fitted once the history covers this many months
+MIN_MONTHS_FOR_SEASONALITY = 24
+# Two-sided normal quantile used for the lower/upper bounds (95%)
+INTERVAL_Z = 1.96
+# Number of fitted forecasts kept by forecast_cached
+FORECAST_CACHE_SIZE = 8
+
+
+def design_matrix(dates, origin, seasonal_months=None):
+    """Regressors for each date: intercept, trend in years since origin, and one dummy per seasonal month."""
+    dates = pd.DatetimeIndex(dates)
+    t = (dates.year - origin.year) + (dates.month - origin.month) / 12.0
+    columns = [np.ones(len(dates)), np.asarray(t, dtype=np.float64)]
+    for month in seasonal_months or ():
+        columns.append((dates.month == month).astype(np.float64))
+    return np.column_stack(columns)
+
+
+class Forecast:
+    """Forecasts for every SKU: mean, standard error and bounds as SKU x horizon arrays."""
+
+    def __init__(self, skus, dates, mean, stderr, sigma):
+        self.skus = pd.Index(skus)
+        self.dates = pd.DatetimeIndex(dates)
+        self.mean = mean
+        self.stderr = stderr
+        self.sigma = sigma
+        # Demand cannot be negative
+        self.lower = np.maximum(mean - INTERVAL_Z * stderr, 0)
+        self.upper = np.maximum(mean + INTERVAL_Z * stderr, 0)
+
+    def for_sku(self, sku):
+        """Forecast frame (date_sale, forecast, lower, upper, stderr) of one SKU."""
+        i = self.skus.get_loc(sku)
+        return pd.DataFrame({'date_sale': self.dates, 'forecast': np.maximum(self.mean[i], 0),
+                             'lower': self.lower[i], 'upper': self.upper[i], 'stderr': self.stderr[i]})
+
+    def to_frame(self):
+        """Long frame with one row per SKU and forecast month."""
+        n, h = self.mean.shape
+        return pd.DataFrame({
+            'sku': self.skus.repeat(h),
+            'date_sale': np.tile(self.dates, n),
+            'forecast': np.maximum(self.mean, 0).ravel(),
+            'lower': self.lower.ravel(),
+            'upper': self.upper.ravel(),
+            'stderr': self.stderr.ravel(),
+        })
+
+    def totals(self):
+        """Forecast of total demand per month across all SKUs."""
+        return pd.Series(np.maximum(self.mean, 0).sum(axis=0), index=self.dates, name='forecast')
+
+
+class SalesForecaster:
+    """Trend + monthly seasonality regression fitted to all SKUs with one least-squares solve.
+
+    Every SKU shares the same regressors (the month calendar), so the fit is
+    a single np.linalg.lstsq with one right-hand side per SKU. Missing cells
+    are filled with the SKU's mean before fitting.
+    """
+
+    def __init__(self, skus, dates, matrix):
+        self.skus = pd.Index(skus)
+        self.dates = pd.DatetimeIndex(dates)
+        matrix = np.asarray(matrix, dtype=np.float64)
+        missing = np.isnan(matrix)
+        if missing.any():
+            counts = (~missing).sum(axis=1)
+            sums = np.where(missing, 0, matrix).sum(axis=1)
+            row_means = np.divide(sums, counts, out=np.zeros(len(matrix)), where=counts > 0)
+            matrix = np.where(missing, row_means[:, None], matrix)
+        self.matrix = matrix
+        self.coef = None
+
+    @classmethod
+    def from_long(cls, sales_data):
+        """Build from the long (sku, date_sale, quantity) frame returned by load_and_preprocess."""
+        wide = sales_data.pivot(index='sku', columns='date_sale', values='quantity')
+        wide = wide.reindex(sales_data['sku'].drop_duplicates())
+        return cls(wide.index, wide.columns, wide.to_numpy(dtype=np.float64))
+
+    @classmethod
+    def from_sales_file(cls, path):
+        skus, _, dates, matrix = load_sales_matrix(path)
+        return cls(skus, dates, matrix)
+
+    @traced('forecast.fit')
+    def fit(self):
+        n_months = len(self.dates)
+        months = np.unique(self.dates.month)
+        # One dummy per month except the first, which the intercept absorbs
+        seasonal = months[1:].tolist() if n_months >= MIN_MONTHS_FOR_SEASONALITY else []
+        self.origin = self.dates[0] if n_months else pd.Timestamp('1970-01-01')
+        self.seasonal_months = seasonal
+        X = design_matrix(self.dates, self.origin, seasonal)
+        coef, _, rank, _ = np.linalg.lstsq(X, self.matrix.T, rcond=None)
+        self.coef = coef.T
+        residuals = self.matrix - self.coef @ X.T
+        dof = max(n_months - rank, 1)
+        self.sigma = np.sqrt((residuals ** 2).sum(axis=1) / dof)
+        self._xtx_inv = np.linalg.pinv(X.T @ X)
+        return self
+
+    @traced('forecast.predict')
+    def forecast(self, horizon=DEFAULT_HORIZON):
+        """Forecast the next `horizon` months for every SKU."""
+        if self.coef is None:
+            self.fit()
+        last = self.dates[-1] if len(self.dates) else self.origin
+        future = pd.date_range(last + pd.offsets.MonthBegin(1), periods=horizon, freq='MS')
+        Xf = design_matrix(future, self.origin, self.seasonal_months)
+        mean = self.coef @ Xf.T
+        # Parameter uncertainty is shared by all SKUs because they share the design matrix
+        leverage = np.einsum('ij,jk,ik->i', Xf, self._xtx_inv, Xf)
+        stderr = self.sigma[:, None] * np.sqrt(1 + leverage)[None, :]
+        return Forecast(self.skus, future, mean, stderr, self.sigma)
+
+
+# Fitted forecasts keyed by (data version, horizon)
+_forecast_cache = OrderedDict()
+
+
+def forecast_cached(data_version, build_forecaster, horizon=DEFAULT_HORIZON):
+    """Return the forecast for data_version, fitting build_forecaster() only on a cache miss."""
+    key = (data_version, horizon)
+    forecast = _forecast_cache.get(key)
+    if forecast is None:
+        forecast = build_forecaster().fit().forecast(horizon)
+        _forecast_cache[key] = forecast
+        while len(_forecast_cache) > FORECAST_CACHE_SIZE:
+            _forecast_cache.popitem(last=False)
+    else:
+        _forecast_cache.move_to_end(key)
+    return forecast
+
+
+def forecast_sales_file(path='sales_data.csv', horizon=DEFAULT_HORIZON):
+    """Forecast every SKU of a wide sales file, refitting only when the file changes."""
+    signature = source_signature(path)
+    version = (signature['path'], signature['mtime_ns'], signature['size'])
+    return forecast_cached(version, lambda: SalesForecaster.from_sales_file(path), horizon)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Forecast monthly demand for every SKU.")
+    parser.add_argument('--sales', default='sales_data.csv')
+    parser.add_argument('--horizon', type=int, default=DEFAULT_HORIZON)
+    parser.add_argument('--output', default='forecast.csv')
+    args = parser.parse_args(argv)
+
+    forecast = forecast_sales_file(args.sales, args.horizon)
+    forecast.to_frame().to_csv(args.output, index=False)
+    print(f"Wrote {args.horizon}-month forecasts for {len(forecast.skus)} SKUs to {args.output}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,445 @@
+"""Local HTTP API serving the inventory, the analytics frames and the charts.
+
+Usage:
+    python http_api.py --host 127.0.0.1 --port 8765
+
+Endpoints:
+    GET    /inventory                   every item
+    GET    /inventory/<item>            one item
+    POST   /inventory                   {"item_name": ..., "quantity": n, "reorder_level": n}
+    PUT    /inventory/<item>            {"quantity": n}
+    DELETE /inventory/<item>
+    GET    /analytics/sales             analyze_data frames
+    GET    /analytics/stock             analyze_stock_levels frames
+    GET    /figures/<kind>.png?month=N  one create_figures chart (month 1-12 or All)
+
+Runs on asyncio with no dependencies beyond the app's own. Edits go through
+the same add/update/remove helpers and journal as the GUI, applied one at a
+time by a single writer task, so clients never race each other. The GUI may
+run alongside: the journal's lock file orders appends across processes, and
+compaction rebuilds inventory.csv from the journal files rather than from
+either process's copy, so neither side's edits are lost. pandas and
+matplotlib work runs on a thread pool, and encoded responses are cached until
+the inventory or source CSVs change.
+"""
+import argparse
+import asyncio
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from urllib.parse import parse_qs, unquote, urlsplit
+from data_cache import source_signature
+from inventory_service import (add_item_to_inventory, open_inventory_backend, record_change, remove_item_from_inventory,
+                               update_inventory_item)
+from instrumentation import count
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+# Threads running pandas and matplotlib work for requests
+DEFAULT_WORKERS = 4
+# Pending connections the listening socket accepts before clients are refused
+LISTEN_BACKLOG = 1024
+MAX_BODY_BYTES = 1024 * 1024
+MAX_HEADERS = 100
+SOURCE_FILES = ('product_data.csv', 'mat_data.csv', 'sales_data.csv')
+
+REASONS = {200: 'OK', 201: 'Created', 204: 'No Content', 400: 'Bad Request', 404: 'Not Found',
+           405: 'Method Not Allowed', 409: 'Conflict', 413: 'Payload Too Large', 500: 'Internal Server Error'}
+
+
+class HttpError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class Response:
+    def __init__(self, status=200, body=b'', content_type='application/json'):
+        self.status = status
+        self.body = body
+        self.content_type = content_type
+
+    @classmethod
+    def json(cls, value, status=200):
+        return cls(status, json.dumps(value).encode())
+
+    def encode(self, keep_alive):
+        head = [f"HTTP/1.1 {self.status} {REASONS.get(self.status, '')}",
+                f"Content-Length: {len(self.body)}",
+                f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+        if self.body:
+            head.append(f"Content-Type: {self.content_type}")
+        return ('\r\n'.join(head) + '\r\n\r\n').encode('latin-1') + self.body
+
+
+class ResponseCache:
+    """Built responses keyed by request, each tagged with the data version it was built from.
+
+    A lookup with a newer version rebuilds the entry. Concurrent requests for
+    the same key share one in-flight build, so a burst of identical requests
+    costs a single pandas/matplotlib run.
+    """
+
+    def __init__(self):
+        self._entries = {}
+
+    async def get(self, key, version, build):
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == version:
+            count('http.cache_hit')
+            return await asyncio.shield(entry[1])
+        count('http.cache_miss')
+        future = asyncio.ensure_future(build())
+        self._entries[key] = (version, future)
+
+        def forget_failure(done):
+            # Failed builds are retried by the next request
+            if not done.cancelled() and done.exception() is not None and self._entries.get(key, (None, None))[1] is done:
+                del self._entries[key]
+
+        future.add_done_callback(forget_failure)
+        return await asyncio.shield(future)
+
+    def invalidate(self, prefix):
+        """Drop every entry whose key starts with prefix."""
+        for key in [key for key in self._entries if key[0] == prefix]:
+            del self._entries[key]
+
+
+def _frames_json(names, frames):
+    return ('{' + ', '.join(f'{json.dumps(name)}: {frame.to_json(orient="records", date_format="iso")}'
+                            for name, frame in zip(names, frames)) + '}').encode()
+
+
+def _inventory_json(names, quantity, reorder):
+    return json.dumps([{"item_name": name, "quantity": int(q), "reorder_level": int(r)}
+                       for name, q, r in zip(names.tolist(), quantity.tolist(), reorder.tolist())]).encode()
+
+
+def _render_png(kind, frames, month):
+    from plotting import build_figure
+    # A fresh figure per request: savefig draws the figure, so one Figure must not be rendered on two threads at once
+    fig = build_figure(kind, *frames, selected_month=month)
+    buffer = BytesIO()
+    fig.savefig(buffer, format='png', bbox_inches='tight')
+    return buffer.getvalue()
+
+
+def _int_field(body, name):
+    value = body.get(name)
+    if isinstance(value, bool) or not isinstance(value, int) or value < 0:
+        raise HttpError(400, f"'{name}' must be a non-negative integer.")
+    return value
+
+
+class InventoryApi:
+    """Request handling and state of the HTTP server; start() binds it to a port."""
+
+    def __init__(self, data_dir='.', workers=DEFAULT_WORKERS):
+        self.data_dir = data_dir
+        # The inventory lives next to the CSVs it is served with
+        self.journal = open_inventory_backend(os.path.join(data_dir, 'inventory.csv'))
+        self.store = None
+        self.version = 0
+        self.server = None
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='http-api')
+        self._cache = ResponseCache()
+        self._writes = None
+        self._writer_task = None
+        self._writing = False
+        self._files_signature = None
+
+    # Lifecycle
+
+    async def start(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        """Load the inventory, start the writer task and listen; returns the bound (host, port)."""
+        self._writes = asyncio.Queue()
+        await self._reload()
+        self._writer_task = asyncio.create_task(self._writer())
+        self.server = await asyncio.start_server(self._handle_connection, host, port, backlog=LISTEN_BACKLOG)
+        return self.server.sockets[0].getsockname()[:2]
+
+    async def close(self):
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        if self._writer_task is not None:
+            self._writer_task.cancel()
+        if self.journal.record_count:
+            # Fold the journal back into inventory.csv, as the GUI does when it closes
+            await self._run(self.journal.compact)
+        await self._run(self.journal.wait_for_compaction)
+        self._executor.shutdown(wait=True)
+
+    def _run(self, fn, *args):
+        return asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    # Inventory state
+
+    def _inventory_files(self):
+        journal = self.journal
+        paths = [journal.inventory_file, journal.path, journal.path + '-wal', getattr(journal, 'compacting_path', None)]
+        return [path for path in paths if path]
+
+    def _current_files_signature(self):
+        signature = []
+        for path in self._inventory_files():
+            try:
+                stat = os.stat(path)
+                signature.append((stat.st_mtime_ns, stat.st_size))
+            except FileNotFoundError:
+                signature.append(None)
+        return tuple(signature)
+
+    async def _reload(self):
+        from inventory_store import InventoryStore
+        frame = await self._run(self.journal.load)
+        self.store = InventoryStore.from_frame(frame)
+        self._data_changed()
+
+    def _data_changed(self):
+        self.version += 1
+        self._files_signature = self._current_files_signature()
+        self._cache.invalidate('inventory')
+
+    async def _sync_inventory(self):
+        # Pick up edits made by another process (e.g. the GUI) since our last write
+        if not self._writing and self._writes.empty() and self._current_files_signature() != self._files_signature:
+            await self._submit('reload')
+
+    # Single writer
+
+    async def _submit(self, op, *args):
+        future = asyncio.get_running_loop().create_future()
+        await self._writes.put((op, args, future))
+        return await future
+
+    async def _writer(self):
+        while True:
+            op, args, future = await self._writes.get()
+            self._writing = True
+            try:
+                result = await self._apply(op, *args)
+            except Exception as e:
+                if not future.cancelled():
+                    future.set_exception(e)
+            else:
+                if not future.cancelled():
+                    future.set_result(result)
+            finally:
+                self._writing = False
+
+    async def _apply(self, op, item_name=None, quantity=None, reorder_level=None):
+        # The journal write runs on the pool first; the O(1) store edit on the loop follows
+        # only once it succeeded, so a failed write never leaves an unsaved edit being served
+        if op == 'reload':
+            await self._reload()
+            return None
+        exists = item_name in self.store
+        if op == 'add':
+            if exists:
+                raise HttpError(409, f"Item '{item_name}' already exists in inventory.")
+            await self._run(record_change, self.journal, 'add', item_name, quantity, reorder_level)
+            self.store = add_item_to_inventory(self.store, item_name, quantity, reorder_level)
+        elif not exists:
+            raise HttpError(404, f"Item '{item_name}' not found in inventory.")
+        elif op == 'update':
+            await self._run(record_change, self.journal, 'update', item_name, quantity)
+            self.store = update_inventory_item(self.store, item_name, quantity)
+        elif op == 'remove':
+            await self._run(record_change, self.journal, 'remove', item_name)
+            self.store = remove_item_from_inventory(self.store, item_name)
+        self._data_changed()
+        return self.store.get(item_name)
+
+    # Analytics
+
+    def _source_version(self):
+        return tuple((s['mtime_ns'], s['size']) for s in
+                     (source_signature(os.path.join(self.data_dir, name)) for name in SOURCE_FILES))
+
+    async def _analytics(self):
+        from data_processing import compute_analytics
+        return await self._cache.get(('analytics', 'frames'), self._source_version(),
+                                     lambda: self._run(compute_analytics, self.data_dir, True))
+
+    # Endpoints
+
+    async def get_inventory(self):
+        await self._sync_inventory()
+        # Copies of the live columns, taken on the loop so the writer cannot change them mid-encode
+        names, quantity, reorder = self.store.live_arrays()
+        body = await self._cache.get(('inventory', 'all'), self.version,
+                                     lambda: self._run(_inventory_json, names, quantity, reorder))
+        return Response(200, body)
+
+    async def get_item(self, item_name):
+        await self._sync_inventory()
+        row = self.store.get(item_name)
+        if row is None:
+            raise HttpError(404, f"Item '{item_name}' not found in inventory.")
+        return Response.json({"item_name": item_name, "quantity": row[0], "reorder_level": row[1]})
+
+    async def add_item(self, body):
+        item_name = body.get('item_name')
+        if not isinstance(item_name, str) or not item_name.strip():
+            raise HttpError(400, "'item_name' must be a non-empty string.")
+        item_name = item_name.strip()
+        quantity, reorder_level = _int_field(body, 'quantity'), _int_field(body, 'reorder_level')
+        await self._submit('add', item_name, quantity, reorder_level)
+        return Response.json({"item_name": item_name, "quantity": quantity, "reorder_level": reorder_level}, 201)
+
+    async def update_item(self, item_name, body):
+        quantity = _int_field(body, 'quantity')
+        row = await self._submit('update', item_name, quantity)
+        return Response.json({"item_name": item_name, "quantity": row[0], "reorder_level": row[1]})
+
+    async def remove_item(self, item_name):
+        await self._submit('remove', item_name)
+        return Response(204)
+
+    async def get_sales_analytics(self):
+        version = self._source_version()
+        frames = await self._analytics()
+        body = await self._cache.get(('analytics', 'sales'), version, lambda: self._run(
+            _frames_json, ['sales_trends', 'monthly_sales', 'monthly_seasonality', 'on_demand_vs_regular'], frames[:4]))
+        return Response(200, body)
+
+    async def get_stock_analytics(self):
+        version = self._source_version()
+        frames = await self._analytics()
+        body = await self._cache.get(('analytics', 'stock'), version, lambda: self._run(
+            _frames_json, ['product_stock', 'material_stock'], frames[4:]))
+        return Response(200, body)
+
+    async def get_figure(self, kind, query):
+        from plotting import FIGURE_KINDS
+        if kind not in FIGURE_KINDS:
+            raise HttpError(404, f"Unknown figure: {kind}")
+        month = query.get('month', ['All'])[0]
+        if month != 'All' and not (month.isdigit() and 1 <= int(month) <= 12):
+            raise HttpError(400, "'month' must be All or 1-12.")
+        month = None if month == 'All' else str(int(month))
+        version = self._source_version()
+        frames = await self._analytics()
+        body = await self._cache.get(('figures', kind, month), version,
+                                     lambda: self._run(_render_png, kind, frames, month))
+        return Response(200, body, 'image/png')
+
+    # HTTP
+
+    async def dispatch(self, method, path, query, body):
+        parts = [unquote(part) for part in path.strip('/').split('/')]
+        if parts[0] == 'inventory' and len(parts) == 1:
+            if method == 'GET':
+                return await self.get_inventory()
+            if method == 'POST':
+                return await self.add_item(body)
+        elif parts[0] == 'inventory' and len(parts) == 2:
+            if method == 'GET':
+                return await self.get_item(parts[1])
+            if method == 'PUT':
+                return await self.update_item(parts[1], body)
+            if method == 'DELETE':
+                return await self.remove_item(parts[1])
+        elif parts == ['analytics', 'sales'] and method == 'GET':
+            return await self.get_sales_analytics()
+        elif parts == ['analytics', 'stock'] and method == 'GET':
+            return await self.get_stock_analytics()
+        elif parts[0] == 'figures' and len(parts) == 2 and parts[1].endswith('.png') and method == 'GET':
+            return await self.get_figure(parts[1][:-len('.png')], query)
+        else:
+            raise HttpError(404, f"No such endpoint: {path}")
+        raise HttpError(405, f"{method} is not supported on {path}")
+
+    async def _read_request(self, reader):
+        """Return (method, path, query, body, keep_alive), or None once the client has closed."""
+        line = await reader.readline()
+        if not line.strip():
+            return None
+        try:
+            method, target, version = line.decode('latin-1').split()
+        except ValueError:
+            raise HttpError(400, "Malformed request line.")
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            if len(headers) >= MAX_HEADERS:
+                raise HttpError(400, "Too many headers.")
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        try:
+            length = int(headers.get('content-length', 0) or 0)
+        except ValueError:
+            length = -1
+        if length < 0:
+            raise HttpError(400, "Content-Length must be a non-negative integer.")
+        if length > MAX_BODY_BYTES:
+            raise HttpError(413, "Request body too large.")
+        body = {}
+        if length:
+            try:
+                body = json.loads(await reader.readexactly(length))
+            except ValueError:
+                raise HttpError(400, "Request body must be JSON.")
+            if not isinstance(body, dict):
+                raise HttpError(400, "Request body must be a JSON object.")
+        connection = headers.get('connection', '').lower()
+        keep_alive = connection != 'close' if version == 'HTTP/1.1' else connection == 'keep-alive'
+        url = urlsplit(target)
+        return method.upper(), url.path, parse_qs(url.query), body, keep_alive
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                keep_alive = False
+                try:
+                    request = await self._read_request(reader)
+                    if request is None:
+                        break
+                    method, path, query, body, keep_alive = request
+                    response = await self.dispatch(method, path, query, body)
+                except HttpError as e:
+                    response = Response.json({"error": str(e)}, e.status)
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    break
+                except Exception as e:
+                    response = Response.json({"error": str(e)}, 500)
+                writer.write(response.encode(keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, data_dir='.', workers=DEFAULT_WORKERS):
+    api = InventoryApi(data_dir, workers)
+    bound_host, bound_port = await api.start(host, port)
+    print(f"Serving inventory API on http://{bound_host}:{bound_port}")
+    try:
+        await api.server.serve_forever()
+    finally:
+        await api.close()
+
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description="Serve inventory and analytics over HTTP.")
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--data-dir', default='.', help="directory with the CSV files and inventory.csv")
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS)
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port, args.data_dir, args.workers))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,219 @@
+"""Lightweight timing spans, counters and opt-in cProfile capture.
+
+Disabled by default: span() then returns a shared no-op object and traced
+functions call straight through, so the cost is one flag check. Enable with
+environment variables before starting the app:
+
+    INVENTORY_TRACE=trace.jsonl        write one JSON line per finished span
+    INVENTORY_PROFILE=analyze_data,*   cProfile these span names ('*' for all)
+    INVENTORY_PROFILE_DIR=profiles     where the .prof files go
+
+or call configure() directly. operation() spans (Tk callbacks, background
+tasks) are always timed so the GUI can show the last operation's duration.
+"""
+import atexit
+import cProfile
+import functools
+import json
+import os
+import threading
+import time
+
+DEFAULT_PROFILE_DIR = 'profiles'
+
+_lock = threading.Lock()
+_local = threading.local()
+
+# True when spans do anything at all (tracing or profiling configured)
+_active = False
+_trace_file = None
+_profile_names = frozenset()
+_profile_dir = DEFAULT_PROFILE_DIR
+_counters = {}
+# (name, milliseconds) of the most recently finished operation() span
+_last_operation = None
+
+
+def configure(trace_file=None, profile=None, profile_dir=None):
+    """Turn instrumentation on.
+
+    trace_file: path of the JSON-lines trace (appended to), or None.
+    profile: iterable of span names to capture with cProfile, or '*' for every span.
+    """
+    global _active, _trace_file, _profile_names, _profile_dir
+    with _lock:
+        if _trace_file is not None:
+            _trace_file.close()
+            _trace_file = None
+        if trace_file:
+            _trace_file = open(trace_file, 'a', buffering=1)
+        if isinstance(profile, str):
+            profile = [name.strip() for name in profile.split(',') if name.strip()]
+        _profile_names = frozenset(profile or ())
+        if profile_dir:
+            _profile_dir = profile_dir
+        _active = _trace_file is not None or bool(_profile_names)
+
+
+def disable():
+    """Write the counters to the trace and turn instrumentation off."""
+    global _active, _trace_file, _profile_names
+    flush_counters()
+    with _lock:
+        if _trace_file is not None:
+            _trace_file.close()
+        _active, _trace_file, _profile_names = False, None, frozenset()
+
+
+def is_enabled():
+    return _active
+
+
+def _emit(record):
+    with _lock:
+        if _trace_file is not None:
+            _trace_file.write(json.dumps(record, default=str) + '\n')
+
+
+def _stack():
+    stack = getattr(_local, 'stack', None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+
+def _wants_profile(name):
+    return ('*' in _profile_names or name in _profile_names) and not getattr(_local, 'profiling', False)
+
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set(self, **fields):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ('name', 'fields', 'operation', 'parent', 'started_at', 'start', 'profiler')
+
+    def __init__(self, name, fields, operation=False):
+        self.name = name
+        self.fields = fields
+        self.operation = operation
+        self.profiler = None
+
+    def set(self, **fields):
+        """Attach extra fields (row counts, cache hits, ...) to the trace record."""
+        self.fields.update(fields)
+
+    def __enter__(self):
+        stack = _stack()
+        self.parent = stack[-1].name if stack else None
+        stack.append(self)
+        if _active and _wants_profile(self.name):
+            _local.profiling = True
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+        self.started_at = time.time()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        global _last_operation
+        ms = (time.perf_counter() - self.start) * 1000
+        _stack().pop()
+        if self.profiler is not None:
+            self.profiler.disable()
+            _local.profiling = False
+            self._dump_profile()
+        if self.operation:
+            _last_operation = (self.name, ms)
+        if _active:
+            record = {"name": self.name, "start": round(self.started_at, 6), "ms": round(ms, 3),
+                      "parent": self.parent, "thread": threading.current_thread().name}
+            if exc_type is not None:
+                record["error"] = exc_type.__name__
+            record.update(self.fields)
+            _emit(record)
+        return False
+
+    def _dump_profile(self):
+        os.makedirs(_profile_dir, exist_ok=True)
+        safe_name = ''.join(c if c.isalnum() or c in '-_.' else '_' for c in self.name)
+        path = os.path.join(_profile_dir, f"{safe_name}-{time.strftime('%Y%m%d-%H%M%S')}-{int(self.start * 1000) % 1000:03d}.prof")
+        self.profiler.dump_stats(path)
+        _emit({"name": self.name, "profile": path})
+
+
+def span(name, **fields):
+    """Context manager timing a block; a shared no-op when instrumentation is disabled."""
+    if not _active:
+        return _NULL_SPAN
+    return _Span(name, fields)
+
+
+def operation(name, **fields):
+    """Like span(), but always timed so last_operation() can report it."""
+    return _Span(name, fields, operation=True)
+
+
+def traced(name=None):
+    """Decorator wrapping each call in a span named name (default: the function's qualified name)."""
+    def decorate(fn):
+        span_name = name or fn.__qualname__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _active:
+                return fn(*args, **kwargs)
+            with _Span(span_name, {}):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def tk_callback(name, fn):
+    """Wrap a Tk command so each invocation is recorded as an operation."""
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        with _Span(name, {}, operation=True):
+            return fn(*args, **kwargs)
+    return wrapper
+
+
+def count(name, n=1):
+    """Add n to a named counter (no-op when disabled)."""
+    if not _active:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + n
+
+
+def counters():
+    with _lock:
+        return dict(_counters)
+
+
+def flush_counters():
+    """Append the current counter values to the trace."""
+    if _active and _counters:
+        _emit({"name": "counters", "start": round(time.time(), 6), "counters": counters()})
+
+
+def last_operation():
+    """(name, milliseconds) of the most recent operation, or None."""
+    return _last_operation
+
+
+if os.environ.get('INVENTORY_TRACE') or os.environ.get('INVENTORY_PROFILE'):
+    configure(os.environ.get('INVENTORY_TRACE'), os.environ.get('INVENTORY_PROFILE'),
+              os.environ.get('INVENTORY_PROFILE_DIR'))
+
+atexit.register(flush_counters)
@@ -0,0 +1,331 @@
+import json
+import os
+import tempfile
+import threading
+import time
+
+INVENTORY_COLUMNS = ["Item Name", "Quantity", "Reorder Level"]
+
+# Number of journal records after which a background compaction is started
+COMPACT_THRESHOLD = 1000
+# Seconds between attempts to take a lock file that another process holds (Windows only)
+LOCK_RETRY_INTERVAL = 0.05
+
+def _file_mode(path):
+    try:
+        return os.stat(path).st_mode & 0o7777
+    except FileNotFoundError:
+        umask = os.umask(0)
+        os.umask(umask)
+        return 0o666 & ~umask
+
+def _write_temp_csv(df, path):
+    # df in a durable temporary file next to path, ready to be renamed over it
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix='.' + os.path.basename(path) + '.', suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(fd, 'w', newline='') as file:
+            df.to_csv(file, index=False)
+            file.flush()
+            os.fsync(file.fileno())
+        # mkstemp creates the file 0600; give it the permissions the file had (or would get from open())
+        os.chmod(tmp_path, _file_mode(path))
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return tmp_path
+
+# Function to write a DataFrame to CSV atomically (temp file + rename)
+def atomic_write_csv(df, path):
+    """Write df to path so that readers only ever see the old or the new file."""
+    tmp_path = _write_temp_csv(df, path)
+    try:
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+class FileLock:
+    """Exclusive lock on a lock file, held against other processes as well as other threads.
+
+    Uses flock on POSIX and msvcrt.locking on Windows. Every acquire opens
+    the file anew, so two FileLock objects for the same path exclude each
+    other even within one process.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+
+    def acquire(self, blocking=True):
+        """Take the lock; with blocking=False return False instead of waiting for another holder."""
+        file = open(self.path, 'a+b')
+        try:
+            if os.name == 'nt':
+                import msvcrt
+                file.seek(0)
+                while True:
+                    try:
+                        msvcrt.locking(file.fileno(), msvcrt.LK_NBLCK, 1)
+                        break
+                    except OSError:
+                        if not blocking:
+                            raise
+                        time.sleep(LOCK_RETRY_INTERVAL)
+            else:
+                import fcntl
+                fcntl.flock(file.fileno(), fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+        except OSError:
+            file.close()
+            if blocking:
+                raise
+            return False
+        self._file = file
+        return True
+
+    def release(self):
+        file, self._file = self._file, None
+        if os.name == 'nt':
+            import msvcrt
+            file.seek(0)
+            msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
+        # Closing the file drops a flock
+        file.close()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+
+class InventoryJournal:
+    """Append-only write-ahead log of inventory edits next to a CSV snapshot.
+
+    Every add/update/remove is appended as one JSON line. Loading replays
+    the snapshot plus the log, and compaction folds the log back into a new
+    snapshot. Only edits that actually changed the inventory are journaled,
+    which makes replaying a log onto a snapshot that already contains it a
+    no-op, so a crash between writing the snapshot and dropping the log is
+    harmless.
+
+    Several processes (the GUI, the HTTP API, inventory_reconcile.py) can
+    share one inventory. Appends, loads and the swap of snapshot and log
+    happen under a lock file, and only one process compacts at a time. A
+    compaction rebuilds the snapshot from the files rather than from the
+    caller's in-memory copy, so edits another process journaled are never
+    overwritten.
+    """
+
+    def __init__(self, inventory_file='inventory.csv', compact_threshold=COMPACT_THRESHOLD):
+        self.inventory_file = inventory_file
+        self.path = inventory_file + '.journal'
+        # Journal rotated away while a background compaction is running
+        self.compacting_path = inventory_file + '.journal.compacting'
+        # Held for appends, loads and the snapshot swap, and for a whole compaction, respectively
+        self.lock_path = inventory_file + '.journal.lock'
+        self.compaction_lock_path = inventory_file + '.journal.compact.lock'
+        self.compact_threshold = compact_threshold
+        with FileLock(self.lock_path):
+            self._repair(self.path)
+            self.record_count = self._count_records(self.path)
+        self._lock = threading.Lock()
+        self._compaction = None
+
+    @staticmethod
+    def _repair(path):
+        # Drop a torn final line left by a crash mid-append so new records start on a fresh line
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            return
+        with open(path, 'rb+') as file:
+            data = file.read()
+            if not data.endswith(b'\n'):
+                file.truncate(data.rfind(b'\n') + 1)
+
+    @staticmethod
+    def _count_records(path):
+        if not os.path.exists(path):
+            return 0
+        with open(path, 'rb') as file:
+            return sum(1 for _ in file)
+
+    @staticmethod
+    def _format_record(op, item_name, quantity=None, reorder_level=None):
+        record = {"op": op, "item": item_name}
+        if quantity is not None:
+            record["qty"] = int(quantity)
+        if reorder_level is not None:
+            record["reorder"] = int(reorder_level)
+        return json.dumps(record) + '\n'
+
+    def _write(self, text, count):
+        with self._lock, FileLock(self.lock_path):
+            with open(self.path, 'a', encoding='utf-8') as file:
+                file.write(text)
+                file.flush()
+                os.fsync(file.fileno())
+            self.record_count += count
+
+    def append(self, op, item_name, quantity=None, reorder_level=None):
+        """Durably append one 'add', 'update' or 'remove' record."""
+        self._write(self._format_record(op, item_name, quantity, reorder_level), 1)
+
+    def append_many(self, ops):
+        """Append a batch of (op, item_name[, quantity[, reorder_level]]) records with a single fsync."""
+        if ops:
+            self._write(''.join(self._format_record(*op) for op in ops), len(ops))
+
+    @property
+    def needs_compaction(self):
+        return self.record_count >= self.compact_threshold
+
+    @staticmethod
+    def _read_records(path):
+        if not os.path.exists(path):
+            return
+        with open(path, encoding='utf-8') as file:
+            for line in file:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    # A torn line from a crash mid-append; everything around it is intact
+                    continue
+
+    def replay(self, df, paths=None):
+        """Return df with the edits journaled in paths (default: both journals) applied, in order.
+
+        Only the records are replayed one by one; the rows they do not touch
+        are carried over with array operations.
+        """
+        paths = [path for path in (paths or (self.compacting_path, self.path)) if os.path.exists(path)]
+        records = [record for path in paths for record in self._read_records(path)]
+        if not records:
+            return df
+        import numpy as np
+        import pandas as pd
+        df = df[INVENTORY_COLUMNS].drop_duplicates(subset='Item Name', keep='first').reset_index(drop=True)
+        touched = list(dict.fromkeys(record["item"] for record in records))
+        rows = pd.Index(df['Item Name']).get_indexer(touched)
+        quantity = df['Quantity'].to_numpy(copy=True)
+        reorder = df['Reorder Level'].to_numpy(copy=True)
+        # [quantity, reorder level] of every touched item, or None once removed
+        items = {name: ([quantity[row], reorder[row]] if row >= 0 else None) for name, row in zip(touched, rows)}
+        # Items (re-)added by the journal go to the end, in the order of their last add
+        added = {}
+        for record in records:
+            op, item_name = record["op"], record["item"]
+            if op == 'add':
+                if items[item_name] is None:
+                    items[item_name] = [record["qty"], record["reorder"]]
+                    added[item_name] = True
+            elif op == 'update':
+                if items[item_name] is not None:
+                    items[item_name][0] = record["qty"]
+            elif op == 'remove':
+                items[item_name] = None
+                added.pop(item_name, None)
+
+        keep = np.ones(len(df), dtype=bool)
+        for name, row in zip(touched, rows):
+            if row >= 0:
+                keep[row] = items[name] is not None and name not in added
+                if keep[row]:
+                    quantity[row], reorder[row] = items[name]
+        kept = pd.DataFrame({'Item Name': df['Item Name'].to_numpy()[keep], 'Quantity': quantity[keep],
+                             'Reorder Level': reorder[keep]}, columns=INVENTORY_COLUMNS)
+        if not added:
+            return kept
+        new = pd.DataFrame([[name] + items[name] for name in added], columns=INVENTORY_COLUMNS)
+        return pd.concat([kept, new], ignore_index=True) if len(kept) else new
+
+    def _read_snapshot(self):
+        # pandas is imported on first load so creating a journal stays cheap at startup
+        import pandas as pd
+        try:
+            return pd.read_csv(self.inventory_file)
+        except FileNotFoundError:
+            return pd.DataFrame(columns=INVENTORY_COLUMNS)
+
+    def load(self):
+        """Read the snapshot and replay the journal on top of it."""
+        with self._lock, FileLock(self.lock_path):
+            return self.replay(self._read_snapshot())
+
+    def _swap_snapshot(self, tmp_path, journals):
+        # Under the lock, so that a load sees either the old snapshot with its journals or the new one
+        with self._lock, FileLock(self.lock_path):
+            os.replace(tmp_path, self.inventory_file)
+            for path in journals:
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def compact(self):
+        """Fold the journal into a new snapshot and drop it (blocking).
+
+        Waits for a compaction running in this or another process. The
+        snapshot is rebuilt from the files, so it includes edits journaled by
+        other processes.
+        """
+        self.wait_for_compaction()
+        with FileLock(self.compaction_lock_path):
+            tmp_path = _write_temp_csv(self.load(), self.inventory_file)
+            try:
+                self._swap_snapshot(tmp_path, (self.compacting_path, self.path))
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+            self.record_count = 0
+
+    def maybe_compact(self):
+        """Start a background compaction once the journal grows past the threshold.
+
+        The current journal is rotated aside under the lock so that edits made
+        while the snapshot is written go to a fresh journal and are not lost.
+        Nothing happens while another process is compacting.
+        """
+        if not self.needs_compaction:
+            return None
+        if self._compaction is not None and self._compaction.is_alive():
+            return self._compaction
+        compaction_lock = FileLock(self.compaction_lock_path)
+        if not compaction_lock.acquire(blocking=False):
+            return None
+        try:
+            with self._lock, FileLock(self.lock_path):
+                if os.path.exists(self.compacting_path):
+                    # A previous compaction did not finish; keep its records in order
+                    if os.path.exists(self.path):
+                        with open(self.path, encoding='utf-8') as src, open(self.compacting_path, 'a', encoding='utf-8') as dst:
+                            dst.write(src.read())
+                        os.remove(self.path)
+                elif os.path.exists(self.path):
+                    os.replace(self.path, self.compacting_path)
+                self.record_count = 0
+        except BaseException:
+            compaction_lock.release()
+            raise
+
+        def run():
+            # Only compactions replace the snapshot, and this one holds the compaction lock
+            try:
+                tmp_path = _write_temp_csv(self.replay(self._read_snapshot(), [self.compacting_path]),
+                                           self.inventory_file)
+                try:
+                    self._swap_snapshot(tmp_path, (self.compacting_path,))
+                finally:
+                    if os.path.exists(tmp_path):
+                        os.remove(tmp_path)
+            finally:
+                compaction_lock.release()
+
+        self._compaction = threading.Thread(target=run, name='inventory-compaction', daemon=True)
+        self._compaction.start()
+        return self._compaction
+
+    def wait_for_compaction(self):
+        if self._compaction is not None:
+            self._compaction.join()
+            self._compaction = None
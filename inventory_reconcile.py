@@ -0,0 +1,244 @@
+"""Bulk import and reconcile of inventory against an incoming CSV.
+
+The incoming file is either in inventory format (Item Name, Quantity and
+optionally Reorder Level) or product_data.csv (sku, stock). One vectorized
+pass validates every row, hash-joins the file against the inventory on
+Item Name and splits it into inserts, quantity updates, unchanged rows and,
+in 'replace' mode, deletes of the items the file no longer lists.
+Reorder levels of existing items are always kept; the file's Reorder Level
+(or default_reorder_level) only applies to new items. Applying a plan goes
+through InventoryStore.apply_many and the journal, so only the changed
+rows are written.
+
+Usage:
+    python inventory_reconcile.py stock_count.csv --dry-run
+    python inventory_reconcile.py product_data.csv --mode replace --errors errors.csv
+"""
+import argparse
+import itertools
+import numpy as np
+import pandas as pd
+from inventory_journal import INVENTORY_COLUMNS, atomic_write_csv
+from instrumentation import span, traced
+
+# 'replace' makes the inventory match the file; 'merge' only adds and updates the items it lists
+RECONCILE_MODES = ('replace', 'merge')
+# product_data.csv columns accepted in place of the inventory ones
+PRODUCT_COLUMNS = {'sku': 'Item Name', 'stock': 'Quantity'}
+ERROR_COLUMNS = ['line', 'Item Name', 'error']
+# Changes of each kind listed by ReconcilePlan.describe()
+DESCRIBE_LIMIT = 5
+# The GUI's report of rejected rows sits next to the inventory file, e.g. inventory.csv.import_errors.csv
+ERROR_REPORT_SUFFIX = '.import_errors.csv'
+
+
+def error_report_path(inventory_file):
+    """Where the GUI writes the rejected rows of an import or reset of inventory_file."""
+    return inventory_file + ERROR_REPORT_SUFFIX
+
+
+def read_incoming(source):
+    """Incoming rows from a CSV path or DataFrame, with the columns renamed to the inventory ones."""
+    if isinstance(source, pd.DataFrame):
+        df = source
+    else:
+        # Names stay text (no NaN for blanks); a number column with bad values comes back as text for validation
+        df = pd.read_csv(source, dtype={'Item Name': str, 'sku': str}, keep_default_na=False, low_memory=False)
+    if 'Item Name' not in df.columns and 'sku' in df.columns:
+        df = df.rename(columns=PRODUCT_COLUMNS)
+    missing = [column for column in INVENTORY_COLUMNS[:2] if column not in df.columns]
+    if missing:
+        raise ValueError(f"Incoming file has no {' or '.join(missing)} column "
+                         f"(expected {', '.join(INVENTORY_COLUMNS)} or sku, stock).")
+    return df[[column for column in INVENTORY_COLUMNS if column in df.columns]]
+
+
+def _integer_column(values):
+    # (values as int64, mask of the values that are not integers, mask of the negative ones)
+    numbers = pd.to_numeric(values, errors='coerce').to_numpy(dtype=np.float64, copy=True)
+    invalid = ~np.isfinite(numbers) | (numbers != np.floor(numbers))
+    numbers[invalid] = 0
+    return numbers.astype(np.int64), invalid, numbers < 0
+
+
+@traced('reconcile.validate')
+def validate_incoming(df, default_reorder_level=0):
+    """Split incoming rows into (valid rows, error report).
+
+    Valid rows have a stripped Item Name and int64 Quantity and Reorder Level.
+    The error report has one row per rejected line: its line number in the
+    CSV (the header is line 1), the Item Name and every problem found.
+    """
+    names = np.array([str(name).strip() for name in df['Item Name'].tolist()], dtype=object)
+    names[df['Item Name'].isna().to_numpy()] = ''
+    quantity, bad_quantity, negative_quantity = _integer_column(df['Quantity'])
+    reorder = np.full(len(df), default_reorder_level, dtype=np.int64)
+    bad_reorder = negative_reorder = np.zeros(len(df), dtype=bool)
+    if 'Reorder Level' in df.columns:
+        # A blank reorder level means the default
+        given = ~(df['Reorder Level'].isna() | (df['Reorder Level'] == '')).to_numpy()
+        values, bad_reorder, negative_reorder = _integer_column(df['Reorder Level'])
+        reorder[given] = values[given]
+        bad_reorder, negative_reorder = bad_reorder & given, negative_reorder & given
+    empty = names == ''
+    duplicate = pd.Series(names).duplicated(keep='first').to_numpy() & ~empty
+    checks = [
+        (empty, "Item name cannot be empty."),
+        (bad_quantity, "Quantity must be an integer."),
+        (negative_quantity, "Quantity must be non-negative."),
+        (bad_reorder, "Reorder level must be an integer."),
+        (negative_reorder, "Reorder level must be non-negative."),
+        (duplicate, "Duplicate Item Name; the first row with this name is used."),
+    ]
+    rejected = np.zeros(len(df), dtype=bool)
+    for mask, _ in checks:
+        rejected |= mask
+
+    # Messages are only assembled for the rejected rows
+    rows = np.flatnonzero(rejected)
+    messages = [' '.join(message for mask, message in checks if mask[row]) for row in rows.tolist()]
+    errors = pd.DataFrame({'line': rows + 2, 'Item Name': names[rows], 'error': messages}, columns=ERROR_COLUMNS)
+    keep = ~rejected
+    valid = pd.DataFrame({'Item Name': names[keep], 'Quantity': quantity[keep], 'Reorder Level': reorder[keep]},
+                         columns=INVENTORY_COLUMNS)
+    return valid, errors
+
+
+class ReconcilePlan:
+    """The changes that reconcile an inventory with an incoming file.
+
+    inserts has the inventory columns; updates has Item Name, Quantity (new)
+    and Previous Quantity; deletes has Item Name and Quantity (current).
+    unchanged counts the listed items whose quantity already matches, and
+    errors is the row-level report of validate_incoming.
+    """
+
+    def __init__(self, inserts, updates, deletes, unchanged, errors, mode):
+        self.inserts = inserts
+        self.updates = updates
+        self.deletes = deletes
+        self.unchanged = unchanged
+        self.errors = errors
+        self.mode = mode
+
+    def __len__(self):
+        return len(self.inserts) + len(self.updates) + len(self.deletes)
+
+    def summary(self):
+        return {"inserts": len(self.inserts), "updates": len(self.updates), "deletes": len(self.deletes),
+                "unchanged": self.unchanged, "errors": len(self.errors)}
+
+    def describe(self, limit=DESCRIBE_LIMIT):
+        """Dry-run diff: counts per kind of change plus the first few of each."""
+        counts = self.summary()
+        lines = [f"{counts['inserts']} to add, {counts['updates']} to update, {counts['deletes']} to remove, "
+                 f"{counts['unchanged']} unchanged, {counts['errors']} rejected rows."]
+        sections = [
+            ("Add", self.inserts, lambda row: f"{row[0]} (Qty: {row[1]}, Reorder Level: {row[2]})"),
+            ("Update", self.updates, lambda row: f"{row[0]} (Qty: {row[2]} -> {row[1]})"),
+            ("Remove", self.deletes, lambda row: f"{row[0]} (Qty: {row[1]})"),
+            ("Rejected", self.errors, lambda row: f"line {row[0]}: {row[1]!r}: {row[2]}"),
+        ]
+        for title, frame, format_row in sections:
+            if len(frame):
+                lines.append(f"{title}:")
+                lines.extend(f"  {format_row(row)}" for row in frame.head(limit).itertuples(index=False))
+                if len(frame) > limit:
+                    lines.append(f"  ... and {len(frame) - limit} more")
+        return '\n'.join(lines)
+
+    def ops(self):
+        """The plan as (op, item_name[, quantity[, reorder_level]]) ops for apply_many and the journal."""
+        deletes = zip(itertools.repeat('remove'), self.deletes['Item Name'].tolist())
+        updates = zip(itertools.repeat('update'), self.updates['Item Name'].tolist(), self.updates['Quantity'].tolist())
+        inserts = zip(itertools.repeat('add'), self.inserts['Item Name'].tolist(), self.inserts['Quantity'].tolist(),
+                      self.inserts['Reorder Level'].tolist())
+        return list(itertools.chain(deletes, updates, inserts))
+
+    def write_error_report(self, path):
+        atomic_write_csv(self.errors, path)
+
+
+@traced('reconcile.plan')
+def plan_reconcile(inventory, incoming, mode='replace', default_reorder_level=0):
+    """Compare inventory (InventoryStore or DataFrame) with incoming (CSV path or DataFrame).
+
+    Nothing is changed; apply the returned plan with apply_plan (or pass
+    plan.ops() to main.apply_inventory_changes).
+    """
+    if mode not in RECONCILE_MODES:
+        raise ValueError(f"Unknown reconcile mode: {mode}")
+    incoming = read_incoming(incoming)
+    valid, errors = validate_incoming(incoming, default_reorder_level)
+    if isinstance(inventory, pd.DataFrame):
+        current = inventory.drop_duplicates(subset='Item Name', keep='first')
+    else:
+        current = inventory.to_frame()
+
+    with span('reconcile.join', rows=len(valid)):
+        # Hash join on Item Name: position of each incoming item in the inventory, -1 if new
+        current_names = pd.Index(current['Item Name'])
+        pos = current_names.get_indexer(valid['Item Name'])
+        new = pos < 0
+        inserts = valid[new].reset_index(drop=True)
+
+        matched = valid[~new]
+        previous = current['Quantity'].to_numpy(dtype=np.int64)[pos[~new]]
+        changed = matched['Quantity'].to_numpy() != previous
+        updates = pd.DataFrame({'Item Name': matched['Item Name'].to_numpy()[changed],
+                                'Quantity': matched['Quantity'].to_numpy()[changed],
+                                'Previous Quantity': previous[changed]})
+        unchanged = int((~changed).sum())
+
+        if mode == 'replace':
+            # Items named by a rejected row are kept; the file meant to list them
+            gone = np.ones(len(current), dtype=bool)
+            gone[pos[~new]] = False
+            rejected = current_names.get_indexer(errors['Item Name'])
+            gone[rejected[rejected >= 0]] = False
+            deletes = pd.DataFrame({'Item Name': current['Item Name'].to_numpy()[gone],
+                                    'Quantity': current['Quantity'].to_numpy()[gone]})
+        else:
+            deletes = pd.DataFrame({'Item Name': pd.Series([], dtype=object), 'Quantity': pd.Series([], dtype=np.int64)})
+    return ReconcilePlan(inserts, updates, deletes, unchanged, errors, mode)
+
+
+def apply_plan(store, journal, plan):
+    """Apply plan to store and journal the ops that took effect; returns them."""
+    applied = store.apply_many(plan.ops())
+    journal.append_many(applied)
+    return applied
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Reconcile the inventory with a stock count or product file.")
+    parser.add_argument('incoming', help="CSV with Item Name, Quantity[, Reorder Level] or sku, stock columns")
+    parser.add_argument('--inventory', default='inventory.csv')
+    parser.add_argument('--db', help="SQLite inventory database to edit instead of the CSV (default: $INVENTORY_DB, as in main.py)")
+    parser.add_argument('--mode', choices=RECONCILE_MODES, default='merge',
+                        help="replace also removes the items the file does not list")
+    parser.add_argument('--default-reorder-level', type=int, default=0, help="reorder level of new items")
+    parser.add_argument('--dry-run', action='store_true', help="only print the changes")
+    parser.add_argument('--errors', help="write the rejected rows to this CSV")
+    args = parser.parse_args(argv)
+
+    from inventory_service import open_inventory_backend
+    from inventory_store import InventoryStore
+    journal = open_inventory_backend(args.inventory, args.db)
+    store = InventoryStore.from_frame(journal.load())
+    plan = plan_reconcile(store, args.incoming, args.mode, args.default_reorder_level)
+    print(plan.describe())
+    if args.errors and len(plan.errors):
+        plan.write_error_report(args.errors)
+        print(f"Rejected rows written to {args.errors}.")
+    if args.dry_run or not len(plan):
+        return 0
+    applied = apply_plan(store, journal, plan)
+    if journal.needs_compaction:
+        journal.compact()
+    print(f"{len(applied)} inventory changes applied.")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
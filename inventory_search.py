@@ -0,0 +1,274 @@
+from bisect import bisect_left, insort
+import numpy as np
+from instrumentation import count, traced
+
+# Substring queries are answered from trigram postings; shorter queries match by prefix
+NGRAM = 3
+# Incremental entries (additions plus removed keys) beyond this share of the base index trigger a rebuild
+REBUILD_FRACTION = 0.125
+# Keys turned into trigrams at a time while building the postings
+POSTING_CHUNK_ROWS = 65536
+# Candidate sets at most this large are verified directly instead of intersecting further postings
+VERIFY_CANDIDATES = 64
+# Upper bound for prefix ranges; 0xff never occurs in UTF-8
+_PREFIX_END = b'\xff'
+
+
+def normalize(text):
+    """Search key of a name: lower case, UTF-8 encoded (substring matches on bytes equal those on text)."""
+    return str(text).strip().lower().encode('utf-8')
+
+
+def _ngram_codes(key):
+    return {int.from_bytes(key[i:i + NGRAM], 'big') for i in range(len(key) - NGRAM + 1)}
+
+
+class InventorySearchIndex:
+    """Type-ahead search over Item Name and product name, kept up to date from InventoryStore events.
+
+    Every item contributes one search key for its Item Name and, if the Item
+    Name is a product SKU, one for the product name. Keys live in a sorted
+    NumPy byte-string array, where a prefix query is two binary searches, and
+    in trigram postings, where a substring query intersects the postings of
+    its trigrams (smallest first) and verifies the remaining candidates.
+    Both are built with NumPy in one pass. Later adds go to a small sorted
+    overflow list and overflow postings, removals are tombstoned, and the
+    base arrays are rebuilt once those exceed REBUILD_FRACTION of the index.
+
+    Listeners registered with subscribe() are called as listener(index)
+    after every change that can alter query results or row positions.
+    """
+
+    def __init__(self, store=None, product_names=None):
+        # SKU -> product name, e.g. from product_data.csv
+        # (name == name is False for NaN, i.e. SKUs without a name)
+        self.product_names = {sku: str(name) for sku, name in dict(product_names or {}).items()
+                              if name is not None and name == name}
+        self.store = None
+        self._listeners = []
+        self._reset(0)
+        if store is not None:
+            self.set_store(store)
+
+    def _reset(self, capacity):
+        # The keys of one item have consecutive ids: its Item Name, then its product name
+        self._keys = []            # key id -> normalized key (bytes)
+        self._owner = []           # key id -> Item Name
+        self._first_id = {}        # Item Name -> id of its first key
+        capacity = max(capacity, 16)
+        # key id -> alive flag, store row position of its item and (at first ids) the item's key count
+        self._alive = np.zeros(capacity, dtype=bool)
+        self._positions = np.zeros(capacity, dtype=np.int64)
+        self._key_counts = np.zeros(capacity, dtype=np.int8)
+        self._base_size = 0
+        self._sorted_keys = np.array([], dtype='S1')
+        self._sorted_ids = np.array([], dtype=np.int64)
+        self._gram_codes = np.array([], dtype=np.int32)
+        self._gram_starts = np.array([0], dtype=np.int64)
+        self._gram_ids = np.array([], dtype=np.int64)
+        self._extra_sorted = []    # (key, key id) of keys added since the last rebuild
+        self._extra_grams = {}     # trigram code -> key ids added since the last rebuild
+        self._dead = 0
+
+    def set_store(self, store):
+        """Index a (possibly different) store and follow its changes."""
+        if self.store is not None:
+            self.store.unsubscribe(self._on_store_change)
+        self.store = store
+        store.subscribe(self._on_store_change)
+        self.rebuild()
+
+    def close(self):
+        if self.store is not None:
+            self.store.unsubscribe(self._on_store_change)
+            self.store = None
+
+    def subscribe(self, listener):
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def _notify(self):
+        for listener in list(self._listeners):
+            listener(self)
+
+    @traced('search.rebuild')
+    def rebuild(self):
+        """Rebuild the sorted key array and trigram postings from the whole store in one pass."""
+        positions = self.store.live_positions()
+        names = self.store.live_arrays()[0]
+        products = np.array([self.product_names.get(name) for name in names.tolist()], dtype=object)
+        has_product = products != None  # noqa: E711 (element-wise comparison)
+        counts = 1 + has_product.astype(np.int8)
+        first_ids = np.zeros(len(names), dtype=np.int64)
+        np.cumsum(counts[:-1], out=first_ids[1:])
+        n_keys = int(counts.sum())
+        self._reset(2 * n_keys)
+
+        texts = np.empty(n_keys, dtype=object)
+        texts[first_ids] = names
+        texts[first_ids[has_product] + 1] = products[has_product]
+        self._keys = [text.strip().lower().encode('utf-8') for text in map(str, texts.tolist())]
+        self._owner = np.repeat(names, counts).tolist()
+        self._first_id = dict(zip(names.tolist(), first_ids.tolist()))
+        self._key_counts[first_ids] = counts
+        self._alive[:n_keys] = True
+        self._positions[:n_keys] = np.repeat(positions, counts)
+        self._base_size = n_keys
+        if n_keys:
+            keys = np.array(self._keys, dtype=bytes)
+            # Equal keys may come out in any order, so the faster stable sort is as good as any
+            order = np.argsort(keys, kind='stable')
+            self._sorted_keys, self._sorted_ids = keys[order], order
+            self._build_postings(keys)
+        count('search.rebuilds')
+        self._notify()
+
+    def _build_postings(self, keys):
+        width = keys.dtype.itemsize
+        if width < NGRAM:
+            return
+        parts = []
+        # Bounded chunks of rows keep the byte matrix small for long names
+        for start in range(0, len(keys), POSTING_CHUNK_ROWS):
+            chunk = keys[start:start + POSTING_CHUNK_ROWS]
+            chars = chunk.view(np.uint8).reshape(len(chunk), width).astype(np.int64)
+            codes = chars[:, :width - 2] << 16 | chars[:, 1:width - 1] << 8 | chars[:, 2:]
+            valid = np.arange(width - 2)[None, :] + NGRAM <= np.char.str_len(chunk)[:, None]
+            # (trigram code, key id) packed into one int64 so that a single plain sort groups the postings
+            parts.append((codes << 32 | np.arange(start, start + len(chunk))[:, None])[valid])
+        pairs = np.concatenate(parts)
+        pairs.sort()
+        # Sorted pairs give each posting with ascending ids; drop trigrams repeated within a key
+        pairs = pairs[np.concatenate([[True], pairs[1:] != pairs[:-1]])]
+        codes, ids = (pairs >> 32).astype(np.int32), pairs & 0xFFFFFFFF
+        starts = np.flatnonzero(np.concatenate([[True], codes[1:] != codes[:-1]]))
+        self._gram_codes = codes[starts]
+        self._gram_starts = np.append(starts, len(codes))
+        self._gram_ids = ids
+
+    def _grow(self):
+        capacity = 2 * len(self._alive)
+        for attr in ('_alive', '_positions', '_key_counts'):
+            old = getattr(self, attr)
+            setattr(self, attr, np.concatenate([old, np.zeros(capacity - len(old), dtype=old.dtype)]))
+
+    def _add_item(self, item_name, pos):
+        keys = [normalize(item_name)]
+        product_name = self.product_names.get(item_name)
+        if product_name is not None:
+            keys.append(normalize(product_name))
+        first_id = len(self._keys)
+        while first_id + len(keys) > len(self._alive):
+            self._grow()
+        self._first_id[item_name] = first_id
+        self._key_counts[first_id] = len(keys)
+        for key_id, key in enumerate(keys, start=first_id):
+            self._keys.append(key)
+            self._owner.append(item_name)
+            self._alive[key_id] = True
+            self._positions[key_id] = pos
+            insort(self._extra_sorted, (key, key_id))
+            for code in _ngram_codes(key):
+                self._extra_grams.setdefault(code, []).append(key_id)
+
+    def _remove_item(self, item_name):
+        first_id = self._first_id.pop(item_name, None)
+        if first_id is not None:
+            n = int(self._key_counts[first_id])
+            self._alive[first_id:first_id + n] = False
+            self._dead += n
+
+    def _on_store_change(self, event, item_name, pos):
+        if event == 'add':
+            self._add_item(item_name, pos)
+        elif event == 'remove':
+            self._remove_item(item_name)
+        elif event == 'batch':
+            if len(item_name) > REBUILD_FRACTION * max(self._base_size, 1):
+                self.rebuild()
+                return
+            for name in dict.fromkeys(op[1] for op in item_name):
+                indexed, present = name in self._first_id, name in self.store
+                if indexed and not present:
+                    self._remove_item(name)
+                elif present and not indexed:
+                    self._add_item(name, self.store.position_of(name))
+                elif present:
+                    # A remove and re-add within the batch gives the item a new row
+                    first_id = self._first_id[name]
+                    n = int(self._key_counts[first_id])
+                    self._positions[first_id:first_id + n] = self.store.position_of(name)
+        elif event == 'reindex':
+            # The store compacted its rows, which moves every position
+            self.rebuild()
+            return
+        else:
+            # Quantity updates change neither names nor positions
+            return
+        if len(self._extra_sorted) + self._dead > REBUILD_FRACTION * max(self._base_size, 1):
+            self.rebuild()
+            return
+        self._notify()
+
+    def __len__(self):
+        return len(self._first_id)
+
+    def _posting(self, code):
+        i = np.searchsorted(self._gram_codes, code)
+        if i < len(self._gram_codes) and self._gram_codes[i] == code:
+            base = self._gram_ids[self._gram_starts[i]:self._gram_starts[i + 1]]
+        else:
+            base = self._gram_ids[:0]
+        extra = self._extra_grams.get(code)
+        # Overflow ids are newer than every base id, so the concatenation stays sorted
+        return np.concatenate([base, extra]) if extra else base
+
+    def _prefix_ids(self, key):
+        lo = np.searchsorted(self._sorted_keys, key, side='left')
+        hi = np.searchsorted(self._sorted_keys, key + _PREFIX_END, side='left')
+        ids = self._sorted_ids[lo:hi]
+        i = bisect_left(self._extra_sorted, (key,))
+        extra = []
+        while i < len(self._extra_sorted) and self._extra_sorted[i][0].startswith(key):
+            extra.append(self._extra_sorted[i][1])
+            i += 1
+        return np.concatenate([ids, extra]).astype(np.int64) if extra else ids
+
+    def _substring_ids(self, key):
+        postings = sorted((self._posting(code) for code in _ngram_codes(key)), key=len)
+        candidates = postings[0]
+        for posting in postings[1:]:
+            if len(candidates) <= VERIFY_CANDIDATES:
+                break
+            # Sorted postings: each candidate is one binary search into the larger posting
+            found = np.searchsorted(posting, candidates).clip(max=max(len(posting) - 1, 0))
+            candidates = candidates[posting[found] == candidates] if len(posting) else posting
+        if len(key) == NGRAM:
+            return candidates
+        # Trigrams can all occur without the query occurring as a whole
+        return np.array([key_id for key_id in candidates.tolist() if key in self._keys[key_id]], dtype=np.int64)
+
+    def _matching_ids(self, text):
+        key = normalize(text)
+        ids = self._prefix_ids(key) if len(key) < NGRAM else self._substring_ids(key)
+        return ids[self._alive[ids]]
+
+    def search(self, text):
+        """Item Names whose name or product name contains text (prefix match for texts shorter than 3 bytes)."""
+        if not normalize(text):
+            return list(self._first_id)
+        return list(dict.fromkeys(self._owner[key_id] for key_id in self._matching_ids(text).tolist()))
+
+    def prefix_search(self, text):
+        """Item Names whose name or product name starts with text."""
+        ids = self._prefix_ids(normalize(text))
+        return list(dict.fromkeys(self._owner[key_id] for key_id in ids[self._alive[ids]].tolist()))
+
+    def matching_positions(self, text):
+        """Store row positions of the items matching text, in display order."""
+        if not normalize(text):
+            return self.store.live_positions()
+        return np.unique(self._positions[self._matching_ids(text)])
@@ -0,0 +1,63 @@
+"""Inventory persistence and edit helpers shared by the GUI, the HTTP API and the command-line tools.
+
+Nothing here imports tkinter, so headless processes can edit the inventory
+the same way the GUI does. main.py wraps these with its own journal.
+"""
+import os
+from inventory_journal import InventoryJournal
+
+
+def open_inventory_backend(inventory_file='inventory.csv', db_path=None):
+    """The store for inventory edits: the SQLite database at db_path (or INVENTORY_DB) if set, else the CSV journal."""
+    db_path = db_path or os.environ.get('INVENTORY_DB')
+    if db_path:
+        from sqlite_backend import SQLiteBackend
+        return SQLiteBackend(db_path, inventory_file)
+    return InventoryJournal(inventory_file)
+
+def as_store(df):
+    # Older callers pass an inventory DataFrame; index it once
+    from inventory_store import InventoryStore
+    if isinstance(df, InventoryStore):
+        return df
+    return InventoryStore.from_frame(df)
+
+def add_item_to_inventory(df, item_name, quantity, reorder_level):
+    df = as_store(df)
+    if df.add(item_name, quantity, reorder_level):
+        print(f"Item '{item_name}' added to inventory.")
+    else:
+        print(f"Item '{item_name}' already exists in inventory.")
+    return df
+
+def update_inventory_item(df, item_name, new_quantity):
+    df = as_store(df)
+    if df.update(item_name, new_quantity):
+        print(f"Item '{item_name}' updated in inventory.")
+    else:
+        print(f"Item '{item_name}' not found in inventory.")
+    return df
+
+def remove_item_from_inventory(df, item_name):
+    df = as_store(df)
+    if df.remove(item_name):
+        print(f"Item '{item_name}' removed from inventory.")
+    else:
+        print(f"Item '{item_name}' not found in inventory.")
+    return df
+
+def record_change(journal, op, item_name, quantity=None, reorder_level=None):
+    # Persist a single edit as one journal record instead of rewriting inventory.csv
+    journal.append(op, item_name, quantity, reorder_level)
+    if journal.needs_compaction:
+        journal.maybe_compact()
+
+def apply_changes(journal, df, ops):
+    # Apply many add/update/remove ops in one batch and journal the ones that took effect
+    df = as_store(df)
+    applied = df.apply_many(ops)
+    journal.append_many(applied)
+    if journal.needs_compaction:
+        journal.maybe_compact()
+    print(f"{len(applied)} of {len(ops)} inventory changes applied.")
+    return df
@@ -0,0 +1,247 @@
+import numpy as np
+import pandas as pd
+from inventory_journal import INVENTORY_COLUMNS
+
+
+class InventoryStore:
+    """In-memory inventory keyed by Item Name.
+
+    Rows live in preallocated NumPy columns that grow by doubling, a dict maps
+    each Item Name to its row, and removed rows are only tombstoned until more
+    than half of the storage is dead. Single edits are O(1) and row order is
+    insertion order, matching the DataFrame the GUI used before.
+
+    Listeners registered with subscribe() are called as
+    listener(event, item_name, pos) after every change, where event is 'add',
+    'update' or 'remove' for single edits, 'batch' (item_name is the list of
+    applied ops) after apply_many, and 'reindex' when row positions moved
+    (after the 'batch' event if apply_many compacted the rows).
+    """
+
+    def __init__(self, capacity=16):
+        capacity = max(int(capacity), 1)
+        self._names = np.empty(capacity, dtype=object)
+        self._quantity = np.zeros(capacity, dtype=np.int64)
+        self._reorder = np.zeros(capacity, dtype=np.int64)
+        self._alive = np.zeros(capacity, dtype=bool)
+        self._size = 0
+        self._index = {}
+        self._listeners = []
+        self._live_positions = None
+        self._batching = False
+        self._reindexed = False
+
+    @classmethod
+    def from_frame(cls, df):
+        """Build a store from an inventory DataFrame (duplicate names keep the first row)."""
+        df = df.drop_duplicates(subset='Item Name', keep='first')
+        store = cls(capacity=len(df) * 2)
+        n = len(df)
+        store._names[:n] = df['Item Name'].to_numpy(dtype=object)
+        store._quantity[:n] = df['Quantity'].to_numpy(dtype=np.int64)
+        store._reorder[:n] = df['Reorder Level'].to_numpy(dtype=np.int64)
+        store._alive[:n] = True
+        store._size = n
+        store._index = dict(zip(store._names[:n], range(n)))
+        return store
+
+    def to_frame(self):
+        """Return the live rows as an inventory DataFrame."""
+        live = self._alive[:self._size]
+        return pd.DataFrame({
+            "Item Name": self._names[:self._size][live],
+            "Quantity": self._quantity[:self._size][live],
+            "Reorder Level": self._reorder[:self._size][live],
+        }, columns=INVENTORY_COLUMNS)
+
+    def subscribe(self, listener):
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def _notify(self, event, item_name=None, pos=None):
+        if event in ('add', 'remove', 'reindex', 'batch'):
+            self._live_positions = None
+        if self._batching:
+            # Listeners get one 'batch' event instead, followed by 'reindex' if rows moved
+            self._reindexed = self._reindexed or event == 'reindex'
+            return
+        for listener in list(self._listeners):
+            listener(event, item_name, pos)
+
+    def live_positions(self):
+        """Row positions of the live items in display order (cached until rows are added or removed)."""
+        if self._live_positions is None:
+            self._live_positions = np.flatnonzero(self._alive[:self._size])
+        return self._live_positions
+
+    def live_arrays(self):
+        """(names, quantities, reorder levels) of the live rows as NumPy arrays, in display order."""
+        positions = self.live_positions()
+        return self._names[positions], self._quantity[positions], self._reorder[positions]
+
+    def position_of(self, item_name):
+        return self._index.get(item_name)
+
+    def row_at(self, pos):
+        """Return (item_name, quantity, reorder_level) stored at row position pos."""
+        return self._names[pos], int(self._quantity[pos]), int(self._reorder[pos])
+
+    def __len__(self):
+        return len(self._index)
+
+    def __contains__(self, item_name):
+        return item_name in self._index
+
+    def get(self, item_name):
+        """Return (quantity, reorder_level) for item_name, or None if absent."""
+        pos = self._index.get(item_name)
+        if pos is None:
+            return None
+        return int(self._quantity[pos]), int(self._reorder[pos])
+
+    def _reserve(self, extra):
+        needed = self._size + extra
+        capacity = len(self._names)
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        for attr in ('_names', '_quantity', '_reorder', '_alive'):
+            old = getattr(self, attr)
+            new = np.zeros(capacity, dtype=old.dtype) if old.dtype != object else np.empty(capacity, dtype=object)
+            new[:self._size] = old[:self._size]
+            setattr(self, attr, new)
+
+    def _maybe_compact(self):
+        # Drop tombstones once they make up more than half of the used rows
+        if self._size < 64 or len(self._index) * 2 >= self._size:
+            return
+        live = np.flatnonzero(self._alive[:self._size])
+        n = len(live)
+        for attr in ('_names', '_quantity', '_reorder'):
+            column = getattr(self, attr)
+            column[:n] = column[live]
+        self._alive[:n] = True
+        self._alive[n:self._size] = False
+        self._names[n:self._size] = None
+        self._size = n
+        self._index = dict(zip(self._names[:n], range(n)))
+        self._notify('reindex')
+
+    def add(self, item_name, quantity, reorder_level):
+        """Append a new item; returns False if it already exists."""
+        if item_name in self._index:
+            return False
+        self._reserve(1)
+        pos = self._size
+        self._names[pos] = item_name
+        self._quantity[pos] = quantity
+        self._reorder[pos] = reorder_level
+        self._alive[pos] = True
+        self._size += 1
+        self._index[item_name] = pos
+        self._notify('add', item_name, pos)
+        return True
+
+    def update(self, item_name, quantity):
+        """Set the quantity of an existing item; returns False if it is absent."""
+        pos = self._index.get(item_name)
+        if pos is None:
+            return False
+        self._quantity[pos] = quantity
+        self._notify('update', item_name, pos)
+        return True
+
+    def remove(self, item_name):
+        """Tombstone an item; returns False if it is absent."""
+        pos = self._index.pop(item_name, None)
+        if pos is None:
+            return False
+        self._alive[pos] = False
+        self._names[pos] = None
+        self._notify('remove', item_name, pos)
+        self._maybe_compact()
+        return True
+
+    def apply_many(self, ops):
+        """Apply a batch of mutations and return the ones that took effect, in order.
+
+        Each op is ('add', name, quantity, reorder_level), ('update', name,
+        quantity) or ('remove', name). The batch is split into rounds in which
+        every name occurs at most once (the n-th op on a name goes in round n),
+        so ops within a round commute and are applied with array assignments.
+        Results are the same as applying the ops one at a time.
+        """
+        if len(ops) == 0:
+            return []
+        batch = pd.DataFrame([tuple(op) + (None,) * (4 - len(op)) for op in ops],
+                             columns=['op', 'name', 'qty', 'reorder'])
+        rounds = batch.groupby('name', sort=False).cumcount().to_numpy()
+        effective = np.zeros(len(batch), dtype=bool)
+        self._batching = True
+        self._reindexed = False
+        try:
+            for r in range(rounds.max() + 1):
+                rows = np.flatnonzero(rounds == r)
+                effective[rows] = self._apply_round(batch.iloc[rows])
+            if rounds.max() > 0:
+                self._restore_add_order(batch, effective)
+        finally:
+            self._batching = False
+        applied = [tuple(ops[i]) for i in np.flatnonzero(effective)]
+        if applied:
+            self._notify('batch', applied)
+        if self._reindexed:
+            self._reindexed = False
+            self._notify('reindex')
+        return applied
+
+    def _restore_add_order(self, batch, effective):
+        # Rounds append rows out of op order; put surviving new rows back in the
+        # order their (last) add happened. They always sit after pre-existing rows.
+        adds = batch[effective & (batch['op'] == 'add').to_numpy()]
+        last_add = adds.drop_duplicates(subset='name', keep='last')
+        last_add = last_add[last_add['name'].isin(self._index.keys())]
+        if len(last_add) < 2:
+            return
+        names = last_add['name'].to_numpy(dtype=object)
+        pos = np.fromiter((self._index[name] for name in names), dtype=np.int64, count=len(names))
+        target = np.sort(pos)
+        for attr in ('_names', '_quantity', '_reorder'):
+            column = getattr(self, attr)
+            column[target] = column[pos]
+        self._index.update(zip(names, target.tolist()))
+
+    def _apply_round(self, batch):
+        names = batch['name'].to_numpy(dtype=object)
+        op = batch['op'].to_numpy(dtype=object)
+        pos = np.fromiter((self._index.get(name, -1) for name in names), dtype=np.int64, count=len(names))
+        exists = pos >= 0
+
+        updates = (op == 'update') & exists
+        self._quantity[pos[updates]] = batch['qty'].to_numpy()[updates].astype(np.int64)
+
+        removes = (op == 'remove') & exists
+        self._alive[pos[removes]] = False
+        self._names[pos[removes]] = None
+        for name in names[removes]:
+            del self._index[name]
+
+        adds = (op == 'add') & ~exists
+        n_add = int(adds.sum())
+        if n_add:
+            self._reserve(n_add)
+            start, stop = self._size, self._size + n_add
+            self._names[start:stop] = names[adds]
+            self._quantity[start:stop] = batch['qty'].to_numpy()[adds].astype(np.int64)
+            self._reorder[start:stop] = batch['reorder'].to_numpy()[adds].astype(np.int64)
+            self._alive[start:stop] = True
+            self._index.update(zip(names[adds], range(start, stop)))
+            self._size = stop
+
+        if removes.any():
+            self._maybe_compact()
+        return updates | removes | adds
@@ -0,0 +1,276 @@
+import tkinter as tk
+from tkinter import Scrollbar
+
+
+# Function to format one inventory row for display
+def format_inventory_row(item_name, quantity, reorder_level):
+    return f"{item_name} - Qty: {quantity} - Reorder Level: {reorder_level}"
+
+
+class VirtualInventoryList(tk.Frame):
+    """Listbox that only materializes the rows currently in view.
+
+    The Listbox holds at most `height` entries; the scrollbar moves an offset
+    into the store's live rows instead of scrolling Tk items. The view
+    subscribes to the InventoryStore, so an update re-renders just that row
+    and adds/removes re-render only the viewport. Selection is mapped back to
+    the store by row position rather than by parsing the display string.
+    """
+
+    def __init__(self, master, store=None, height=20, width=60, **kwargs):
+        super().__init__(master, **kwargs)
+        self.height = height
+        self.offset = 0
+        self.store = None
+        # Row positions shown in the listbox, and the reverse map position -> listbox line
+        self._visible_positions = []
+        self._visible_lines = {}
+
+        self.listbox = tk.Listbox(self, height=height, width=width, exportselection=False)
+        self.scrollbar = Scrollbar(self, orient='vertical', command=self._on_scrollbar)
+        self.listbox.pack(side='left', fill='both', expand=True)
+        self.scrollbar.pack(side='right', fill='y')
+
+        self.listbox.bind('<MouseWheel>', self._on_mousewheel)
+        self.listbox.bind('<Button-4>', lambda e: self.scroll_by(-3))
+        self.listbox.bind('<Button-5>', lambda e: self.scroll_by(3))
+        self.listbox.bind('<Up>', lambda e: self._on_arrow(-1))
+        self.listbox.bind('<Down>', lambda e: self._on_arrow(1))
+
+        if store is not None:
+            self.set_store(store)
+
+    def bind_select(self, callback):
+        self.listbox.bind('<<ListboxSelect>>', callback)
+
+    def set_store(self, store):
+        """Show a (possibly different) store and follow its changes."""
+        if self.store is not None:
+            self.store.unsubscribe(self._on_store_change)
+        self.store = store
+        self.offset = 0
+        store.subscribe(self._on_store_change)
+        self.render()
+
+    def destroy(self):
+        if self.store is not None:
+            self.store.unsubscribe(self._on_store_change)
+        super().destroy()
+
+    def row_positions(self):
+        """Row positions of the items this view lists, in display order."""
+        return self.store.live_positions()
+
+    def total(self):
+        return len(self.row_positions())
+
+    def render(self):
+        """Redraw the viewport: at most `height` Listbox entries are touched."""
+        positions = self.row_positions()
+        total = len(positions)
+        self.offset = max(0, min(self.offset, total - self.height))
+        visible = positions[self.offset:self.offset + self.height].tolist()
+        self.listbox.delete(0, tk.END)
+        for pos in visible:
+            self.listbox.insert(tk.END, format_inventory_row(*self.store.row_at(pos)))
+        self._visible_positions = visible
+        self._visible_lines = {pos: line for line, pos in enumerate(visible)}
+        if total:
+            self.scrollbar.set(self.offset / total, min(1.0, (self.offset + self.height) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def render_row(self, pos):
+        """Redraw a single row if it is currently visible."""
+        line = self._visible_lines.get(pos)
+        if line is None:
+            return
+        selected = line in self.listbox.curselection()
+        self.listbox.delete(line)
+        self.listbox.insert(line, format_inventory_row(*self.store.row_at(pos)))
+        if selected:
+            self.listbox.selection_set(line)
+
+    def _on_store_change(self, event, item_name, pos):
+        if event == 'update':
+            self.render_row(pos)
+        else:
+            self.render()
+
+    def scroll_to(self, offset):
+        self.offset = int(offset)
+        self.render()
+
+    def scroll_by(self, rows):
+        self.scroll_to(self.offset + rows)
+        return 'break'
+
+    def _on_scrollbar(self, action, value, unit=None):
+        if action == 'moveto':
+            self.scroll_to(float(value) * self.total())
+        elif action == 'scroll':
+            step = self.height if unit == 'pages' else 1
+            self.scroll_by(int(value) * step)
+
+    def _on_mousewheel(self, event):
+        return self.scroll_by(-3 if event.delta > 0 else 3)
+
+    def _on_arrow(self, direction):
+        # Keep keyboard navigation working past the edges of the viewport
+        selection = self.listbox.curselection()
+        line = selection[0] if selection else 0
+        if 0 <= line + direction < len(self._visible_positions):
+            return None
+        self.scroll_by(direction)
+        self.listbox.selection_clear(0, tk.END)
+        self.listbox.selection_set(line)
+        self.listbox.event_generate('<<ListboxSelect>>')
+        return 'break'
+
+    def selected_item(self):
+        """Return (item_name, quantity, reorder_level) for the selected row, or None."""
+        selection = self.listbox.curselection()
+        if not selection or selection[0] >= len(self._visible_positions):
+            return None
+        return self.store.row_at(self._visible_positions[selection[0]])
+
+
+
+class SearchableInventoryList(VirtualInventoryList):
+    """VirtualInventoryList that lists only the items matching a search query.
+
+    Matches come from an InventorySearchIndex over the same store, so a
+    keystroke costs one index lookup plus a viewport render. While a query is
+    active, adds and removes are redrawn once the index has caught up with
+    them (the index notifies after the store); with an empty query the view
+    behaves exactly like VirtualInventoryList.
+    """
+
+    def __init__(self, master, store=None, index=None, **kwargs):
+        self.index = None
+        self.query = ''
+        # Matching row positions for the current query, until the query or the index changes
+        self._matches = None
+        super().__init__(master, store=store, **kwargs)
+        if index is not None:
+            self.set_index(index)
+
+    def set_index(self, index):
+        if self.index is not None:
+            self.index.unsubscribe(self._on_index_change)
+        self.index = index
+        self._matches = None
+        index.subscribe(self._on_index_change)
+        if self.store is not None:
+            if index.store is not self.store:
+                index.set_store(self.store)
+            self.render()
+
+    def set_store(self, store, index=None):
+        """Show a (possibly different) store; the index is re-pointed at it too.
+
+        An index already built over store (e.g. in the background) replaces
+        the current one without a rebuild; closing the old one is up to the caller.
+        """
+        self._matches = None
+        if index is not None:
+            if self.index is not None:
+                self.index.unsubscribe(self._on_index_change)
+            self.index = index
+            index.subscribe(self._on_index_change)
+        if self.index is not None and self.index.store is not store:
+            self.index.set_store(store)
+        super().set_store(store)
+
+    def destroy(self):
+        if self.index is not None:
+            self.index.unsubscribe(self._on_index_change)
+        super().destroy()
+
+    def _filtering(self):
+        return self.index is not None and self.index.store is self.store and bool(self.query.strip())
+
+    def set_query(self, text):
+        """Filter the list to the items whose name or product name contains text."""
+        self.query = text
+        self.offset = 0
+        self._matches = None
+        if self.store is not None:
+            self.render()
+
+    def row_positions(self):
+        if not self._filtering():
+            return super().row_positions()
+        if self._matches is None:
+            self._matches = self.index.matching_positions(self.query)
+        return self._matches
+
+    def _on_store_change(self, event, item_name, pos):
+        if event != 'update' and self._filtering():
+            return
+        super()._on_store_change(event, item_name, pos)
+
+    def _on_index_change(self, index):
+        self._matches = None
+        if self._filtering():
+            self.render()
+
+
+# Most urgent alerts listed in the alert panel; the header always shows the full count
+ALERT_PANEL_LIMIT = 100
+
+
+class ReorderAlertPanel(tk.Frame):
+    """Live list of the items at or near their reorder level, most urgent first.
+
+    Follows a ReorderAlerts index; bursts of changes (e.g. a batch import)
+    are coalesced into one redraw when Tk is next idle.
+    """
+
+    def __init__(self, master, alerts, limit=ALERT_PANEL_LIMIT, height=8, width=60, **kwargs):
+        super().__init__(master, **kwargs)
+        self.alerts = alerts
+        self.limit = limit
+        self._pending = None
+
+        self.header = tk.Label(self, anchor='w')
+        self.header.pack(fill='x')
+        self.listbox = tk.Listbox(self, height=height, width=width, fg='#b00020', exportselection=False)
+        self.listbox.pack(fill='both', expand=True)
+
+        alerts.subscribe(self._on_alerts_change)
+        self.render()
+
+    def set_alerts(self, alerts):
+        """Follow a different ReorderAlerts index, e.g. one built in the background for a new store."""
+        self.alerts.unsubscribe(self._on_alerts_change)
+        self.alerts = alerts
+        alerts.subscribe(self._on_alerts_change)
+        self.render()
+
+    def destroy(self):
+        self.alerts.unsubscribe(self._on_alerts_change)
+        if self._pending is not None:
+            self.after_cancel(self._pending)
+        super().destroy()
+
+    def _on_alerts_change(self, alerts):
+        if self._pending is None:
+            self._pending = self.after_idle(self.render)
+
+    def render(self):
+        self._pending = None
+        below = len(self.alerts.below_reorder_level())
+        near = len(self.alerts) - below
+        text = f"Reorder alerts: {below} at or below reorder level"
+        if self.alerts.margin > 0:
+            text += f", {near} within {self.alerts.margin}"
+        self.header.config(text=text)
+        self.listbox.delete(0, tk.END)
+        store = self.alerts.store
+        for slack, item_name in self.alerts.most_urgent(self.limit):
+            quantity, reorder_level = store.get(item_name)
+            status = f"short by {-slack}" if slack < 0 else ("at level" if slack == 0 else f"{slack} above")
+            self.listbox.insert(tk.END, f"{format_inventory_row(item_name, quantity, reorder_level)} ({status})")
+        if len(self.alerts) > self.limit:
+            self.listbox.insert(tk.END, f"... and {len(self.alerts) - self.limit} more")
@@ -1,11 +1,20 @@
-import pandas as pd
 import csv
 import os
+import atexit
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import tkinter as tk
-from tkinter import Listbox, Toplevel, messagebox, Scrollbar, Canvas, Frame
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from data_processing import load_and_preprocess, analyze_data, analyze_stock_levels, verify_password, users
-from plotting import create_figures
+from tkinter import Listbox, Toplevel, messagebox, Scrollbar, Canvas, Frame, ttk
+from data_processing import verify_password, users
+from inventory_journal import InventoryJournal
+from inventory_service import (add_item_to_inventory, apply_changes, as_store, open_inventory_backend, record_change,
+                               remove_item_from_inventory, update_inventory_item)
+from inventory_view import ReorderAlertPanel, SearchableInventoryList, VirtualInventoryList, format_inventory_row
+from task_runner import TaskExecutor
+from instrumentation import last_operation, operation, span, tk_callback, traced
+# pandas, matplotlib, seaborn and the modules built on them are imported where they are
+# first used (mostly on the analytics preload thread), so the login window opens without
+# waiting for them. benchmarks/import_time.py guards this.
 
 # GUI Color Scheme and Fonts
 BACKGROUND_COLOR = "#f5f5f5"
@@ -14,20 +23,132 @@ TEXT_COLOR = "#ffffff"
 FONT = ("Arial", 12)
 LARGE_FONT = ("Arial", 14, "bold")
 
+# Write-ahead journal for inventory edits; inventory.csv is only rewritten on compaction.
+# With INVENTORY_DB set, edits go to that SQLite database as single-row statements instead.
+# Opened by get_inventory_journal() on first use, so importing main touches no files.
+inventory_journal = None
+inventory_journal_lock = threading.Lock()
+
+# Runs file I/O, pandas and figure work off the Tk thread; created with the main window
+task_executor = None
+
+# Items at or near their reorder level, shown in the inventory panel
+REORDER_ALERT_MARGIN = 5
+reorder_alerts = None
+reorder_alert_panel = None
+
+# Set while a confirmed import or reset is applied in the background
+reconcile_running = False
+
+# Analytics loaded in the background from process start; the login handler waits on it
+analytics_future = None
+
+def preload_analytics(data_dir='.', journal=None):
+    from data_processing import compute_analytics
+    from compact_data import load_compact
+    from material_requirements import compute_material_requirements_matrix
+    from plotting import data_fingerprint, figure_factories
+    from sales_cube import SalesCube
+    if journal is None:
+        journal = get_inventory_journal()
+    if not isinstance(journal, InventoryJournal) and journal.has_catalog():
+        # The catalog was imported into the database; let SQL compute the aggregates
+        analytics = journal.compute_analytics()
+        # The sales come back as a dense matrix, read month by month; no long frame is built
+        product_data, mat_data = journal.products(), journal.materials()
+        skus, dates, matrix = journal.sales_matrix()
+        material_requirements = compute_material_requirements_matrix(product_data, mat_data, skus, dates, matrix)
+        sales_cube = SalesCube(product_data, skus, dates, matrix)
+    else:
+        analytics = compute_analytics(data_dir, compact=True)
+        # The memory-mapped sales matrix opened by compute_analytics; no long frame is built
+        product_data, mat_data, sales = load_compact(data_dir)
+        material_requirements = compute_material_requirements_matrix(product_data, mat_data, sales.skus,
+                                                                     sales.dates, sales.matrix)
+        sales_cube = SalesCube.from_compact(product_data, sales)
+    # Warm the figure cache with the default (all months) figures
+    for kind, factory in figure_factories(*analytics, data_version=data_fingerprint(*analytics),
+                                          material_requirements=material_requirements):
+        factory()
+    return analytics + (material_requirements, sales_cube)
+
+def start_analytics_preload(data_dir='.'):
+    """Start loading and analysing the data on a worker thread; returns the future of create_gui's arguments."""
+    global analytics_future
+    if analytics_future is None:
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='analytics-preload')
+        analytics_future = executor.submit(preload_analytics, data_dir)
+        executor.shutdown(wait=False)
+    return analytics_future
+
+def run_in_background(fn, *args, on_done=None, on_error=None, key=None, description=None):
+    description = description or getattr(fn, '__name__', 'task')
+
+    def timed(*call_args):
+        with operation(description):
+            return fn(*call_args)
+
+    # Without a main window (and so no executor) the job simply runs inline
+    if task_executor is None:
+        try:
+            result = timed(*args)
+        except Exception as e:
+            if on_error is None:
+                raise
+            on_error(e)
+            return None
+        if on_done is not None:
+            on_done(result)
+        return None
+    return task_executor.submit(timed, *args, on_done=on_done, on_error=on_error, key=key, description=description)
+
 def display_basic_statistics(data):
     statistics = data.describe()
     return statistics
 
+# Visualization window reused by "Update Plots" while it is open
+visualization_window = None
+
+def _figure_slot_spec(entry):
+    # Accepts a Figure or a (kind, factory) pair from plotting.figure_factories
+    if isinstance(entry, tuple):
+        import matplotlib
+        from plotting import FIGURE_SIZES
+        kind, factory = entry
+        width, height = FIGURE_SIZES[kind]
+        dpi = matplotlib.rcParams['figure.dpi']
+        return factory, int(width * dpi), int(height * dpi)
+    width, height = entry.get_size_inches() * entry.dpi
+    return (lambda: entry), int(width), int(height)
+
 # Function to create a window for visualizations with scroll functionality
 def create_visualization_window(figures):
+    """Show figures in a scrollable window, building and drawing each one only once it scrolls into view.
+
+    If the window is already open its contents are swapped in place: slots
+    that get a new figure (e.g. for a new month filter) show it on a new
+    canvas, the others are left as they are.
+    """
+    global visualization_window
+    specs = [_figure_slot_spec(entry) for entry in figures]
+
+    if visualization_window is not None and visualization_window['window'].winfo_exists():
+        state = visualization_window
+        for slot, (factory, _, _) in zip(state['slots'], specs):
+            slot['factory'] = factory
+            if slot['requested']:
+                _render_figure_slot(slot)
+        state['window'].lift()
+        state['check_visible']()
+        return state['window']
+
     window = Toplevel()
     window.title("Visualizations")
 
     # Create a canvas with a scrollbar
     canvas = Canvas(window)
     scrollbar = Scrollbar(window, orient='vertical', command=canvas.yview)
-    canvas.configure(yscrollcommand=scrollbar.set)
-    
+
     # Placing the scrollbar in the window
     scrollbar.pack(side='right', fill='y')
     canvas.pack(side='left', fill='both', expand=True)
@@ -35,15 +156,36 @@ def create_visualization_window(figures):
     # Create a frame inside the canvas which will be scrolled with the scrollbar
     scrollable_frame = Frame(canvas)
 
-    # Clear old figures before drawing new ones
-    for widget in scrollable_frame.winfo_children():
-        widget.destroy()
-
-    for fig in figures:
-        figure_canvas = FigureCanvasTkAgg(fig, master=scrollable_frame)
-        figure_canvas_widget = figure_canvas.get_tk_widget()
-        figure_canvas_widget.pack(fill='both', expand=True)
-        figure_canvas.draw()
+    # One fixed-size placeholder per figure; nothing is built or drawn yet
+    slots = []
+    for factory, width, height in specs:
+        frame = Frame(scrollable_frame, width=width, height=height)
+        frame.pack_propagate(False)
+        frame.pack(fill='x', expand=True)
+        slots.append({'frame': frame, 'factory': factory, 'figure': None, 'canvas': None, 'requested': False})
+
+    pending = {'check': None}
+
+    def check_visible():
+        pending['check'] = None
+        top = canvas.canvasy(0)
+        bottom = top + canvas.winfo_height()
+        for slot in slots:
+            if not slot['requested']:
+                y = slot['frame'].winfo_y()
+                if y < bottom and y + slot['frame'].winfo_reqheight() > top:
+                    _render_figure_slot(slot)
+
+    def schedule_check(*args):
+        if pending['check'] is None:
+            pending['check'] = window.after_idle(check_visible)
+
+    def on_yscroll(first, last):
+        scrollbar.set(first, last)
+        schedule_check()
+
+    canvas.configure(yscrollcommand=on_yscroll)
+    canvas.bind("<Configure>", schedule_check)
 
     # Add the scrollable frame to a window in the canvas
     canvas.create_window((0, 0), window=scrollable_frame, anchor='nw')
@@ -51,12 +193,43 @@ def create_visualization_window(figures):
     # Bind the scrollable frame to the scroll region
     scrollable_frame.bind(
         "<Configure>",
-        lambda e: canvas.configure(scrollregion=canvas.bbox("all"))
+        lambda e: (canvas.configure(scrollregion=canvas.bbox("all")), schedule_check())
     )
 
+    def close():
+        global visualization_window
+        visualization_window = None
+        window.destroy()
+
     # Back button to close the visualization window
-    back_button = tk.Button(scrollable_frame, text="Back", command=window.destroy)
+    back_button = tk.Button(scrollable_frame, text="Back", command=close)
     back_button.pack()
+    window.protocol("WM_DELETE_WINDOW", close)
+
+    visualization_window = {'window': window, 'slots': slots, 'check_visible': schedule_check}
+    return window
+
+def _render_figure_slot(slot):
+    # Build the figure in the background; a newer request for the same slot supersedes this one
+    slot['requested'] = True
+    run_in_background(slot['factory'], on_done=lambda fig: _show_figure(slot, fig),
+                      on_error=lambda e: messagebox.showerror("Plot Error", str(e)),
+                      key=('figure', id(slot['frame'])), description="Building figure")
+
+def _show_figure(slot, fig):
+    if not slot['frame'].winfo_exists():
+        return
+    if fig is slot['figure']:
+        # Cached figures never change (e.g. a month-independent chart on a new month filter)
+        return
+    if slot['canvas'] is not None:
+        slot['canvas'].get_tk_widget().destroy()
+    from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+    figure_canvas = FigureCanvasTkAgg(fig, master=slot['frame'])
+    figure_canvas.get_tk_widget().pack(fill='both', expand=True)
+    with span('figure.draw'):
+        figure_canvas.draw()
+    slot['figure'], slot['canvas'] = fig, figure_canvas
 
 # Function to create the main GUI window
 
@@ -72,14 +245,37 @@ def login(user_entry, pass_entry, sales_trends, monthly_sales, monthly_seasonali
 
 
 def create_login_window():
+    start_analytics_preload()
+
     def on_login():
         username = user_entry.get()
         password = pass_entry.get()
         if username in users and verify_password(users[username], password):
-            login_window.destroy()  # Close the login window
-            create_gui(sales_trends, monthly_sales, monthly_seasonality, on_demand_vs_regular, product_stock, material_stock)
+            login_button.config(state='disabled')
+            wait_for_analytics()
         else:
             messagebox.showerror("Login Failed", "Invalid username or password.")
+
+    def wait_for_analytics():
+        global analytics_future
+        analytics = start_analytics_preload()
+        # Usually done by the time credentials are typed; otherwise keep the window responsive
+        if not analytics.done():
+            status_label.config(text="Loading data...")
+            login_window.after(50, wait_for_analytics)
+            return
+        try:
+            frames = analytics.result()
+        except Exception as e:
+            # Start a fresh load on the next click
+            analytics_future = None
+            status_label.config(text="")
+            login_button.config(state='normal')
+            messagebox.showerror("Load Error", f"Could not load data: {e}")
+            return
+        login_window.destroy()  # Close the login window
+        create_gui(*frames)
+
     login_window = tk.Tk()
     login_window.title("Login")
     login_window.configure(bg=BACKGROUND_COLOR)  # Set the background color for the login window
@@ -103,6 +299,8 @@ def create_login_window():
     # Login Button
     login_button = tk.Button(login_window, text="Login", command=on_login, bg=BUTTON_COLOR, fg=TEXT_COLOR, font=LARGE_FONT)
     login_button.pack(pady=20)
+    status_label = tk.Label(login_window, text="", bg=BACKGROUND_COLOR, font=FONT)
+    status_label.pack(pady=(0, 10))
 
     login_window.mainloop()
 
@@ -124,98 +322,205 @@ def initialize_inventory():
     else:
         print("Inventory CSV file already exists.")
 
+def get_inventory_journal():
+    # Open the inventory backend on first use; only then is there anything to compact at exit
+    global inventory_journal
+    with inventory_journal_lock:
+        if inventory_journal is None:
+            inventory_journal = open_inventory_backend('inventory.csv')
+            atexit.register(compact_inventory_on_exit)
+        return inventory_journal
+
 def load_inventory_data():
     global inventory_data
     inventory_file = 'inventory.csv'
-    try:
-        return pd.read_csv(inventory_file)
-    except FileNotFoundError:
+    journal = get_inventory_journal()
+    if isinstance(journal, InventoryJournal) and not os.path.exists(inventory_file):
         print("Inventory file not found. Creating an empty DataFrame.")
-        return pd.DataFrame(columns=["Item Name", "Quantity", "Reorder Level"])
+    # Snapshot plus any edits journaled since the last compaction
+    return journal.load()
 
+@traced()
 def save_inventory_data(df):
-    global inventory_data
-    inventory_file = 'inventory.csv'
-    df.to_csv(inventory_file, index=False)
+    # Every edit of df is already journaled. Folding the journal, rather than writing df,
+    # keeps edits other processes (e.g. the HTTP API) journaled meanwhile.
+    get_inventory_journal().compact()
     print("Inventory data saved successfully.")
 
-def add_item_to_inventory(df, item_name, quantity, reorder_level):
-    if item_name not in df['Item Name'].values:
-        new_row = pd.DataFrame([[item_name, quantity, reorder_level]], columns=['Item Name', 'Quantity', 'Reorder Level'])
-        df = pd.concat([df, new_row], ignore_index=True)
-        print(f"Item '{item_name}' added to inventory.")
-    else:
-        print(f"Item '{item_name}' already exists in inventory.")
-    return df
+@traced()
+def record_inventory_change(df, op, item_name, quantity=None, reorder_level=None):
+    record_change(get_inventory_journal(), op, item_name, quantity, reorder_level)
 
-def update_inventory_item(df, item_name, new_quantity):
-    if item_name in df['Item Name'].values:
-        df.loc[df['Item Name'] == item_name, 'Quantity'] = new_quantity
-        print(f"Item '{item_name}' updated in inventory.")
-    else:
-        print(f"Item '{item_name}' not found in inventory.")
-    return df
+def compact_inventory_on_exit():
+    if 'inventory_data' in globals() and inventory_journal.record_count:
+        save_inventory_data(inventory_data)
+    inventory_journal.wait_for_compaction()
 
-def remove_item_from_inventory(df, item_name):
-    if item_name in df['Item Name'].values:
-        df = df[df['Item Name'] != item_name]
-        print(f"Item '{item_name}' removed from inventory.")
-    else:
-        print(f"Item '{item_name}' not found in inventory.")
-    return df
+def apply_inventory_changes(df, ops):
+    return apply_changes(get_inventory_journal(), df, ops)
 
 def refresh_inventory_display(inventory_listbox, inventory_data):
+    if isinstance(inventory_listbox, VirtualInventoryList):
+        # The virtual list follows store changes itself; only a new store needs wiring up
+        if inventory_listbox.store is not inventory_data:
+            inventory_listbox.set_store(as_store(inventory_data))
+            if reorder_alerts is not None:
+                reorder_alerts.set_store(inventory_listbox.store)
+        else:
+            inventory_listbox.render()
+        return
     inventory_listbox.delete(0, tk.END)  # Clear the current list
-    for index, row in inventory_data.iterrows():
-        inventory_listbox.insert(tk.END, f"{row['Item Name']} - Qty: {row['Quantity']} - Reorder Level: {row['Reorder Level']}")
+    for item_name, quantity, reorder_level in as_store(inventory_data).to_frame().itertuples(index=False):
+        inventory_listbox.insert(tk.END, format_inventory_row(item_name, quantity, reorder_level))
         
-def reset_inventory_from_product_data(inventory_listbox):
-    global inventory_data
-    confirmation = messagebox.askyesno("Reset Inventory Confirmation", "Are you sure you want to reset the inventory?")
-    if confirmation:
-        try:
-            # Load product data
-            product_data = pd.read_csv('product_data.csv')
-
-            # Transform product data to match inventory format
-            reset_inventory = pd.DataFrame({
-                "Item Name": product_data['sku'],
-                "Quantity": product_data['stock'],
-                "Reorder Level": 0  # Setting reorder level to 0 for all items
-            })
-            # Save the transformed data to Inventory CSV
-            save_inventory_data(reset_inventory)
-
-            # Update the inventory data variable
-            inventory_data = reset_inventory.copy()
-
-            # Refresh display
-            refresh_inventory_display(inventory_listbox, inventory_data)  # This line is updated
-
-            messagebox.showinfo("Reset Successful", "Inventory has been reset with product data.")
-
-        except Exception as e:
-            messagebox.showerror("Reset Error", str(e))
+def reconcile_inventory(inventory_listbox, incoming, mode, title, description):
+    """Compare the inventory with incoming (CSV path or DataFrame) in the background, show the diff and apply it if confirmed.
+
+    Both the comparison and the apply work on a snapshot of the store. Edits
+    made while the comparison runs trigger a new comparison, so a confirmed
+    plan never overwrites them; while the plan is applied, edits are refused.
+    """
+    from inventory_search import InventorySearchIndex
+    from inventory_store import InventoryStore
+    from reorder_alerts import ReorderAlerts
+    base = as_store(inventory_data)
+    snapshot = base.to_frame()
+    changed = []
+    def on_store_change(event, item_name, pos):
+        if not changed:
+            changed.append(event)
+    base.subscribe(on_store_change)
+
+    def plan(current):
+        from inventory_reconcile import plan_reconcile
+        return plan_reconcile(current, incoming() if callable(incoming) else incoming, mode=mode)
+
+    def apply(plan):
+        # The planned store, its search index and its alerts are built here and swapped in on the Tk thread
+        store = apply_inventory_changes(InventoryStore.from_frame(snapshot), plan.ops())
+        index = InventorySearchIndex(store, product_names=inventory_listbox.index.product_names)
+        return store, index, ReorderAlerts(store, margin=REORDER_ALERT_MARGIN)
+
+    def finish():
+        global reconcile_running
+        reconcile_running = False
+        base.unsubscribe(on_store_change)
+
+    def on_planned(plan):
+        global reconcile_running
+        if changed:
+            finish()
+            reconcile_inventory(inventory_listbox, incoming, mode, title, description)
+            return
+        from inventory_reconcile import error_report_path
+        summary = plan.describe()
+        if len(plan.errors):
+            # Rejected rows of the last import or reset, next to the inventory file
+            report = error_report_path(get_inventory_journal().inventory_file)
+            plan.write_error_report(report)
+            summary += f"\n\nRejected rows were written to {report}."
+        if not len(plan):
+            finish()
+            messagebox.showinfo(title, "The inventory already matches.\n\n" + summary)
+            return
+        if not messagebox.askyesno(f"{title} Confirmation", summary + "\n\nApply these changes?"):
+            finish()
+            return
+        reconcile_running = True
+        run_in_background(apply, plan, on_done=lambda built: on_applied(plan, *built), on_error=on_error,
+                          key='reconcile_inventory_apply', description=f"Applying {len(plan)} inventory changes")
+
+    def on_applied(plan, store, index, alerts):
+        finish()
+        install_inventory(inventory_listbox, store, index, alerts)
+        messagebox.showinfo(f"{title} Successful", f"{len(plan)} inventory changes applied.")
+
+    def on_error(e):
+        finish()
+        messagebox.showerror(f"{title} Error", str(e))
+
+    run_in_background(plan, snapshot, on_done=on_planned, on_error=on_error,
+                      key='reconcile_inventory', description=description)
+
+def install_inventory(inventory_listbox, store, index, alerts):
+    # Swap in a store whose search index and reorder alerts are already built, without rebuilding on the Tk thread
+    global inventory_data, reorder_alerts
+    inventory_data = store
+    if not inventory_listbox.winfo_exists():
+        index.close()
+        alerts.close()
+        return
+    old_index = inventory_listbox.index
+    inventory_listbox.set_store(store, index=index)
+    old_index.close()
+    if reorder_alerts is not None:
+        reorder_alerts.close()
+    if reorder_alert_panel is not None:
+        reorder_alert_panel.set_alerts(alerts)
+    reorder_alerts = alerts
+
+def inventory_busy(action):
+    # Edits wait for a running import or reset, whose changes are planned against the current store
+    if reconcile_running:
+        messagebox.showwarning("Inventory Busy", f"Inventory changes are being applied. {action} once they are done.")
+    return reconcile_running
 
+def reset_inventory_from_product_data(inventory_listbox):
+    # Quantities come from product_data.csv stock and items it does not list are removed;
+    # hand-set reorder levels are kept and new items start at 0
+    def product_data():
+        from data_cache import read_csv_cached
+        return read_csv_cached('product_data.csv')
+
+    if inventory_busy("Reset the inventory"):
+        return
+    reconcile_inventory(inventory_listbox, product_data, 'replace', "Reset Inventory",
+                        "Comparing inventory with product data")
+
+def import_inventory_file(inventory_listbox):
+    # A supplier file or stock count adds and updates the items it lists; other items are left alone
+    from tkinter import filedialog
+    if inventory_busy("Import the file"):
+        return
+    path = filedialog.askopenfilename(title="Import Stock File", filetypes=[("CSV files", "*.csv"), ("All files", "*.*")])
+    if path:
+        reconcile_inventory(inventory_listbox, path, 'merge', "Import Stock File", "Comparing inventory with stock file")
+
+
+# Rows of the per-material and per-SKU breakdowns shown under the sales statistics
+STATISTICS_BREAKDOWN_ROWS = 10
 
 def show_statistics():
-    try:
-        data = pd.read_csv('sales_data.csv')  # Adjust the path and DataFrame as needed
-        stats = display_basic_statistics(data)
-        messagebox.showinfo("Sales Statistics", str(stats))
-    except Exception as e:
-        messagebox.showerror("Error", str(e))
+    def compute():
+        from statistics_service import statistics_service
+        # Cached per file version; appended rows or months are merged in incrementally
+        stats = statistics_service.describe('sales_data.csv')
+        by_material = statistics_service.per_material('sales_data.csv', 'product_data.csv', 'mat_data.csv')
+        by_sku = statistics_service.per_sku('sales_data.csv').nlargest(STATISTICS_BREAKDOWN_ROWS, 'total')
+        return (f"{stats}\n\nMonthly sales per material:\n"
+                f"{by_material.head(STATISTICS_BREAKDOWN_ROWS).round(1).to_string(index=False)}\n\n"
+                f"Top {STATISTICS_BREAKDOWN_ROWS} SKUs by total sales:\n"
+                f"{by_sku[['sku', 'total', 'mean', 'std']].round(1).to_string(index=False)}")
+
+    run_in_background(compute, on_done=lambda stats: messagebox.showinfo("Sales Statistics", str(stats)),
+                      on_error=lambda e: messagebox.showerror("Error", str(e)),
+                      key='sales_statistics', description="Computing sales statistics")
 
 def show_statistics2():
-    try:
-        data2 = pd.read_csv('mat_data.csv')  # Adjust the path and DataFrame as needed
-        stats2 = display_basic_statistics(data2)
-        messagebox.showinfo("Material Statistics", str(stats2))
-    except Exception as e:
-        messagebox.showerror("Error", str(e))
+    def compute():
+        from statistics_service import statistics_service
+        return statistics_service.describe('mat_data.csv')
+
+    run_in_background(compute, on_done=lambda stats2: messagebox.showinfo("Material Statistics", str(stats2)),
+                      on_error=lambda e: messagebox.showerror("Error", str(e)),
+                      key='material_statistics', description="Computing material statistics")
 
 def create_inventory_management_panel():
-    global inventory_data
+    global inventory_data, reorder_alerts, reorder_alert_panel
+    from data_cache import read_csv_cached
+    from inventory_search import InventorySearchIndex
+    from inventory_store import InventoryStore
+    from reorder_alerts import ReorderAlerts
     inventory_window = Toplevel()
     inventory_window.title("Inventory Management")
 
@@ -231,11 +536,25 @@ def create_inventory_management_panel():
     reorder_level_entry = tk.Entry(inventory_window)
     reorder_level_entry.pack()
 
-    inventory_listbox = tk.Listbox(inventory_window)
+    # Type-ahead search over Item Name and product name; the list filters on every keystroke
+    tk.Label(inventory_window, text="Search").pack()
+    search_text = tk.StringVar(inventory_window)
+    tk.Entry(inventory_window, textvariable=search_text).pack()
+
+    product_data = read_csv_cached('product_data.csv')
+    search_index = InventorySearchIndex(product_names=zip(product_data['sku'], product_data['name']))
+    inventory_listbox = SearchableInventoryList(inventory_window, index=search_index)
     inventory_listbox.pack()
-    inventory_data = load_inventory_data()
+    search_text.trace_add('write', lambda *args: inventory_listbox.set_query(search_text.get()))
+    inventory_data = InventoryStore.from_frame(load_inventory_data())
     refresh_inventory_display(inventory_listbox, inventory_data)
 
+    # Alerts follow the store, so every add/update/remove below updates the panel
+    reorder_alerts = ReorderAlerts(inventory_data, margin=REORDER_ALERT_MARGIN)
+    alert_panel = ReorderAlertPanel(inventory_window, reorder_alerts)
+    alert_panel.pack(fill='x', padx=10, pady=5)
+    reorder_alert_panel = alert_panel
+
     initialize_inventory()
     def add_item():
         global inventory_data
@@ -247,6 +566,9 @@ def create_inventory_management_panel():
             if not item_name:
                 raise ValueError("Item name cannot be empty.")
 
+            if inventory_busy("Add the item"):
+                return
+
             if not quantity_str.isdigit() or not reorder_level_str.isdigit():
                 raise ValueError("Quantity and reorder level must be integers.")
 
@@ -256,9 +578,10 @@ def create_inventory_management_panel():
             if quantity < 0 or reorder_level < 0:
                 raise ValueError("Quantity and reorder level must be non-negative.")
 
+            exists = item_name in inventory_data
             inventory_data = add_item_to_inventory(inventory_data, item_name, quantity, reorder_level)
-            refresh_inventory_display(inventory_listbox, inventory_data)
-            save_inventory_data(inventory_data)
+            if not exists:
+                record_inventory_change(inventory_data, 'add', item_name, quantity, reorder_level)
 
         except ValueError as e:
             messagebox.showerror("Input Error", str(e))
@@ -267,56 +590,75 @@ def create_inventory_management_panel():
         global inventory_data  # Access the global inventory_data
         item_name = item_name_entry.get()
         new_quantity = int(quantity_entry.get())
+        if inventory_busy("Update the item"):
+            return
+        exists = item_name in inventory_data
         inventory_data = update_inventory_item(inventory_data, item_name, new_quantity)
-        refresh_inventory_display(inventory_listbox, inventory_data)
-        save_inventory_data(inventory_data)
+        if exists:
+            record_inventory_change(inventory_data, 'update', item_name, new_quantity)
 
     def remove_item():
         global inventory_data
         item_name = item_name_entry.get()
+        if inventory_busy("Remove the item"):
+            return
+        exists = item_name in inventory_data
         inventory_data = remove_item_from_inventory(inventory_data, item_name)
-        refresh_inventory_display(inventory_listbox, inventory_data)
-        save_inventory_data(inventory_data)
+        if exists:
+            record_inventory_change(inventory_data, 'remove', item_name)
     
     def on_listbox_select(event):
-        global index
-        w = event.widget
-        if w.curselection():
-            index = int(w.curselection()[0])
-        value = w.get(index)
-        try:
-            item_name, rest = value.split(" - Qty: ")
-            quantity_str, reorder_level_str = rest.split(" - Reorder Level: ")
-            quantity = int(quantity_str)
-            reorder_level = int(reorder_level_str)
+        # Selection maps straight to the store row, no parsing of the display text
+        selected = inventory_listbox.selected_item()
+        if selected is None:
+            return
+        item_name, quantity, reorder_level = selected
 
-            item_name_entry.delete(0, tk.END)
-            item_name_entry.insert(0, item_name)
-            quantity_entry.delete(0, tk.END)
-            quantity_entry.insert(0, quantity)
-            reorder_level_entry.delete(0, tk.END)
-            reorder_level_entry.insert(0, reorder_level)
-        except ValueError:
-            messagebox.showerror("Selection Error", "Error in parsing the selected item.")
+        item_name_entry.delete(0, tk.END)
+        item_name_entry.insert(0, item_name)
+        quantity_entry.delete(0, tk.END)
+        quantity_entry.insert(0, quantity)
+        reorder_level_entry.delete(0, tk.END)
+        reorder_level_entry.insert(0, reorder_level)
 
 
-    inventory_listbox.bind('<<ListboxSelect>>', on_listbox_select)
+    inventory_listbox.bind_select(on_listbox_select)
     button_width = 20  # Width in characters
 
-    remove_button = tk.Button(inventory_window, text="Remove Item", command=remove_item)
+    remove_button = tk.Button(inventory_window, text="Remove Item", command=tk_callback("Remove Item", remove_item))
     remove_button.pack()
 
-    add_button = tk.Button(inventory_window, text="Add Item", command=add_item)
+    add_button = tk.Button(inventory_window, text="Add Item", command=tk_callback("Add Item", add_item))
     add_button.pack()
 
-    update_button = tk.Button(inventory_window, text="Update Item", command=update_item)
+    update_button = tk.Button(inventory_window, text="Update Item", command=tk_callback("Update Item", update_item))
     update_button.pack()
 
-    reset_button = tk.Button(inventory_window, text="Reset Inventory", command=lambda: reset_inventory_from_product_data(inventory_listbox), bg=BUTTON_COLOR, fg=TEXT_COLOR, font=LARGE_FONT, width=button_width)
+    reset_button = tk.Button(inventory_window, text="Reset Inventory", command=tk_callback("Reset Inventory", lambda: reset_inventory_from_product_data(inventory_listbox)), bg=BUTTON_COLOR, fg=TEXT_COLOR, font=LARGE_FONT, width=button_width)
     reset_button.pack(pady=5)
 
+    import_button = tk.Button(inventory_window, text="Import Stock File", command=tk_callback("Import Stock File", lambda: import_inventory_file(inventory_listbox)), bg=BUTTON_COLOR, fg=TEXT_COLOR, font=LARGE_FONT, width=button_width)
+    import_button.pack(pady=5)
 
-def create_gui(sales_trends, monthly_sales, monthly_seasonality, on_demand_vs_regular, product_stock, material_stock):
+    def on_close():
+        # Fold the journal back into inventory.csv when the panel is closed
+        global reorder_alerts, reorder_alert_panel
+        if inventory_busy("Close the panel"):
+            return
+        if get_inventory_journal().record_count:
+            save_inventory_data(inventory_data)
+        alert_panel.alerts.close()
+        inventory_listbox.index.close()
+        if reorder_alerts is alert_panel.alerts:
+            reorder_alerts = None
+        if reorder_alert_panel is alert_panel:
+            reorder_alert_panel = None
+        inventory_window.destroy()
+
+    inventory_window.protocol("WM_DELETE_WINDOW", on_close)
+
+def create_gui(sales_trends, monthly_sales, monthly_seasonality, on_demand_vs_regular, product_stock, material_stock, material_requirements=None, sales_cube=None):
+    global task_executor
     root = tk.Tk()
     root.title("Inventory Management System")
     root.state('zoomed')  # For Windows to start maximized
@@ -324,7 +666,41 @@ def create_gui(sales_trends, monthly_sales, monthly_seasonality, on_demand_vs_re
 
     root.configure(bg=BACKGROUND_COLOR)  # Set the background color for the main window
 
-    figures = create_figures(sales_trends, monthly_sales, monthly_seasonality, on_demand_vs_regular, product_stock, material_stock)
+    # Status bar showing background work
+    status_frame = tk.Frame(root, bg=BACKGROUND_COLOR)
+    status_frame.pack(side='bottom', fill='x', padx=10, pady=5)
+    status_text = tk.StringVar(root, value="Ready")
+    tk.Label(status_frame, textvariable=status_text, bg=BACKGROUND_COLOR, font=FONT).pack(side='left')
+    progress = ttk.Progressbar(status_frame, mode='indeterminate', length=150)
+    progress.pack(side='right')
+    progress_running = {'value': False}
+
+    def set_status(text, busy):
+        status_text.set(text)
+        if busy and not progress_running['value']:
+            progress.start(15)
+        elif not busy and progress_running['value']:
+            progress.stop()
+        progress_running['value'] = busy
+
+    task_executor = TaskExecutor(root, status_callback=set_status)
+
+    # Live readout of the most recent button action or background task
+    last_operation_text = tk.StringVar(root, value="")
+    tk.Label(status_frame, textvariable=last_operation_text, bg=BACKGROUND_COLOR, font=FONT).pack(side='right', padx=10)
+
+    def refresh_last_operation():
+        last = last_operation()
+        if last is not None:
+            last_operation_text.set(f"Last operation: {last[0]} took {last[1]:.0f} ms")
+        root.after(250, refresh_last_operation)
+
+    refresh_last_operation()
+
+    # Figures are built lazily when first shown and cached per month filter and data version
+    from plotting import data_fingerprint, figure_factories
+    data_version = data_fingerprint(sales_trends, monthly_sales, monthly_seasonality, on_demand_vs_regular, product_stock, material_stock)
+    figures = figure_factories(sales_trends, monthly_sales, monthly_seasonality, on_demand_vs_regular, product_stock, material_stock, data_version=data_version, material_requirements=material_requirements)
     # Dropdown for selecting month or resetting
     months = ['All'] + list(range(1, 13))  # Adding 'All' to the list
     selected_month = tk.StringVar(root)
@@ -332,30 +708,71 @@ def create_gui(sales_trends, monthly_sales, monthly_seasonality, on_demand_vs_re
     month_dropdown = tk.OptionMenu(root, selected_month, *months)
     month_dropdown.pack()
 
+    # Drill-down filters answered from the precomputed sales cube
+    cube_filters = {}
+    if sales_cube is not None:
+        filter_frame = tk.Frame(root, bg=BACKGROUND_COLOR)
+        filter_frame.pack(pady=5)
+        for dimension, label in [('year', "Year"), ('quarter', "Quarter"), ('mat_id', "Material"), ('on_demand', "On Demand")]:
+            tk.Label(filter_frame, text=label, bg=BACKGROUND_COLOR, font=FONT).pack(side='left', padx=(10, 2))
+            cube_filters[dimension] = tk.StringVar(root, value='All')
+            tk.OptionMenu(filter_frame, cube_filters[dimension], 'All', *sales_cube.values(dimension)).pack(side='left')
+        tk.Label(filter_frame, text="SKUs", bg=BACKGROUND_COLOR, font=FONT).pack(side='left', padx=(10, 2))
+        cube_filters['sku'] = tk.StringVar(root, value='')
+        tk.Entry(filter_frame, textvariable=cube_filters['sku'], width=30).pack(side='left')
+
+    def filtered_analytics():
+        # Figure inputs for the selected filters; the month filter is applied by the figures themselves
+        filters = {}
+        for dimension, variable in cube_filters.items():
+            value = variable.get().strip()
+            if dimension == 'sku':
+                skus = [sku.strip() for sku in value.split(',') if sku.strip()]
+                if skus:
+                    filters['sku'] = skus
+            elif value != 'All':
+                filters[dimension] = value
+        if not filters:
+            return (sales_trends, monthly_sales, monthly_seasonality, on_demand_vs_regular, product_stock), data_version
+        cube_slice = sales_cube.slice(**filters)
+        return cube_slice.analytics(), (data_version, cube_slice.key)
+
+    # Warm the figure cache in the background so the first "Plots and Graphs" is instant
+    for kind, factory in figures:
+        run_in_background(factory, key=('warm', kind), description="Preparing figures")
+
     def update_plots():
         selected_month_value = selected_month.get()
-        figures = create_figures(sales_trends, monthly_sales, monthly_seasonality, on_demand_vs_regular, product_stock, material_stock, selected_month_value)
+        frames, version = filtered_analytics()
+        figures = figure_factories(*frames, material_stock, selected_month_value, version, material_requirements=material_requirements)
         create_visualization_window(figures)
 
-    update_button = tk.Button(root, text="Update Plots", command=update_plots, bg=BUTTON_COLOR, fg=TEXT_COLOR, font=LARGE_FONT)
+    update_button = tk.Button(root, text="Update Plots", command=tk_callback("Update Plots", update_plots), bg=BUTTON_COLOR, fg=TEXT_COLOR, font=LARGE_FONT)
     update_button.pack(pady=10)
 
-    plots_button = tk.Button(root, text="Plots and Graphs", command=lambda: create_visualization_window(figures), bg=BUTTON_COLOR, fg=TEXT_COLOR, font=LARGE_FONT)
+    plots_button = tk.Button(root, text="Plots and Graphs", command=tk_callback("Plots and Graphs", lambda: create_visualization_window(figures)), bg=BUTTON_COLOR, fg=TEXT_COLOR, font=LARGE_FONT)
     plots_button.pack(pady=10)
 
-    inventory_button = tk.Button(root, text="Inventory Management", command=create_inventory_management_panel, bg=BUTTON_COLOR, fg=TEXT_COLOR, font=LARGE_FONT)
+    inventory_button = tk.Button(root, text="Inventory Management", command=tk_callback("Inventory Management", create_inventory_management_panel), bg=BUTTON_COLOR, fg=TEXT_COLOR, font=LARGE_FONT)
     inventory_button.pack(pady=10)
 
-    logout_button = tk.Button(root, text="Log Out", command=root.destroy, bg=BUTTON_COLOR, fg=TEXT_COLOR, font=LARGE_FONT)
+    def log_out():
+        global task_executor
+        task_executor.shutdown()
+        task_executor = None
+        root.destroy()
+
+    root.protocol("WM_DELETE_WINDOW", log_out)
+    logout_button = tk.Button(root, text="Log Out", command=log_out, bg=BUTTON_COLOR, fg=TEXT_COLOR, font=LARGE_FONT)
     logout_button.pack(pady=10)
 
     stats_frame = tk.Frame(root, bg=BACKGROUND_COLOR, pady=5)
     stats_frame.pack(fill='x')  # fill='x' makes the frame fill the entire width of the window
 
-    stats_button = tk.Button(stats_frame, text="Sales Statistics", command=show_statistics, bg=BUTTON_COLOR, fg=TEXT_COLOR, font=LARGE_FONT, width=20)
+    stats_button = tk.Button(stats_frame, text="Sales Statistics", command=tk_callback("Sales Statistics", show_statistics), bg=BUTTON_COLOR, fg=TEXT_COLOR, font=LARGE_FONT, width=20)
     stats_button.pack(side='left', padx=10)  # side='left' aligns the button to the left
 
-    stats2_button = tk.Button(stats_frame, text="Material Statistics", command=show_statistics2, bg=BUTTON_COLOR, fg=TEXT_COLOR, font=LARGE_FONT, width=20)
+    stats2_button = tk.Button(stats_frame, text="Material Statistics", command=tk_callback("Material Statistics", show_statistics2), bg=BUTTON_COLOR, fg=TEXT_COLOR, font=LARGE_FONT, width=20)
     stats2_button.pack(side='left', padx=10)  # side='left' aligns the button to the left
 
 
@@ -364,16 +781,14 @@ def create_gui(sales_trends, monthly_sales, monthly_seasonality, on_demand_vs_re
 # Main function to run the project
 def main():
     global inventory_data
+    from inventory_store import InventoryStore
     initialize_inventory()
-    inventory_data = load_inventory_data()
+    inventory_data = InventoryStore.from_frame(load_inventory_data())
+    analytics = start_analytics_preload()
     save_inventory_data(inventory_data)
-    product_data, mat_data, sales_data = load_and_preprocess()
-    sales_trends, monthly_sales, monthly_seasonality, on_demand_vs_regular = analyze_data(product_data, mat_data, sales_data)
-    product_stock, material_stock = analyze_stock_levels(product_data, mat_data)
-    create_gui(sales_trends, monthly_sales, monthly_seasonality, on_demand_vs_regular, product_stock, material_stock)
+    create_gui(*analytics.result())
 
 if __name__ == "__main__":
-    product_data, mat_data, sales_data = load_and_preprocess()
-    sales_trends, monthly_sales, monthly_seasonality, on_demand_vs_regular = analyze_data(product_data, mat_data, sales_data)
-    product_stock, material_stock = analyze_stock_levels(product_data, mat_data)
+    # Load the data while the user types their credentials
+    start_analytics_preload()
     create_login_window()
\ No newline at end of file
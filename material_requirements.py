@@ -0,0 +1,114 @@
+import numpy as np
+import pandas as pd
+from instrumentation import traced
+
+# Months of recent sales averaged into the monthly demand rate
+DEMAND_WINDOW_MONTHS = 12
+# Months of demand beyond the lead time that the materials on hand should cover
+PLANNING_HORIZON_MONTHS = 3
+# avg_lt is given in days
+DAYS_PER_MONTH = 30.4375
+
+REQUIREMENT_COLUMNS = ['raw_id', 'name', 'stock', 'cost_pp', 'monthly_demand', 'requirement',
+                       'shortfall', 'cost_exposure', 'coverage_months']
+
+
+class SkuMaterialIndex:
+    """Precomputed SKU -> raw material mapping shared by every rollup.
+
+    sku_index maps product SKUs to product rows, and material_codes[row] is
+    the mat_data row of that product's material (-1 if the material is not
+    in mat_data). Lead times are converted to months once.
+    """
+
+    def __init__(self, product_data, mat_data):
+        self.sku_index = pd.Index(product_data['sku'])
+        self.material_ids = pd.Index(mat_data['raw_id'])
+        self.material_codes = self.material_ids.get_indexer(product_data['mat_id'])
+        self.lead_time_months = product_data['avg_lt'].fillna(0).to_numpy(dtype=np.float64) / DAYS_PER_MONTH
+        self.product_stock = product_data['stock'].fillna(0).to_numpy(dtype=np.float64)
+
+    def product_rows(self, skus):
+        """Product row of each SKU (-1 for SKUs missing from product_data)."""
+        return self.sku_index.get_indexer(skus)
+
+
+def recent_window(dates, window_months):
+    """Boolean mask of the dates within the last window_months distinct months."""
+    unique = np.unique(dates)
+    if len(unique) == 0:
+        return np.zeros(len(dates), dtype=bool), 0
+    cutoff = unique[max(0, len(unique) - window_months)]
+    return dates >= cutoff, min(window_months, len(unique))
+
+
+@traced()
+def compute_material_requirements(product_data, mat_data, sales_data, window_months=DEMAND_WINDOW_MONTHS,
+                                  horizon_months=PLANNING_HORIZON_MONTHS, index=None):
+    """Roll product demand up to raw materials and compare it with material stock.
+
+    Per SKU, the average monthly sales over the last window_months, times
+    (lead time + horizon_months), less the finished stock on hand, is the
+    number of units that still have to be made; each unit consumes one unit
+    of the product's material. The per-SKU and per-material sums are two
+    np.bincount passes over the sales rows, so the cost is linear in the
+    number of sales rows. Returns one row per material with its
+    requirement, shortfall against stock and cost exposure (shortfall x cost_pp).
+    """
+    index = index or SkuMaterialIndex(product_data, mat_data)
+    dates = sales_data['date_sale'].to_numpy()
+    in_window, n_months = recent_window(dates, window_months)
+    rows = index.product_rows(sales_data['sku'])
+    use = in_window & (rows >= 0)
+    quantity = np.nan_to_num(sales_data['quantity'].to_numpy(dtype=np.float64)[use])
+    sku_monthly = np.bincount(rows[use], weights=quantity, minlength=len(index.sku_index)) / max(n_months, 1)
+    return _rollup(index, mat_data, sku_monthly, horizon_months)
+
+
+@traced()
+def compute_material_requirements_matrix(product_data, mat_data, skus, dates, matrix,
+                                         window_months=DEMAND_WINDOW_MONTHS,
+                                         horizon_months=PLANNING_HORIZON_MONTHS, index=None):
+    """compute_material_requirements for a dense SKU x month matrix (e.g. CompactSales).
+
+    Only the last window_months columns are read, so a memory-mapped matrix
+    is never paged in beyond the demand window.
+    """
+    index = index or SkuMaterialIndex(product_data, mat_data)
+    in_window, n_months = recent_window(np.asarray(pd.DatetimeIndex(dates)), window_months)
+    rows = index.product_rows(skus)
+    use = rows >= 0
+    window = np.flatnonzero(in_window)
+    sku_sums = np.zeros(len(rows))
+    for j in window:
+        sku_sums += np.nan_to_num(np.asarray(matrix[:, j], dtype=np.float64))
+    sku_monthly = np.bincount(rows[use], weights=sku_sums[use], minlength=len(index.sku_index)) / max(n_months, 1)
+    return _rollup(index, mat_data, sku_monthly, horizon_months)
+
+
+def _rollup(index, mat_data, sku_monthly, horizon_months):
+    n_materials = len(index.material_ids)
+    # Units still to be produced per SKU over its lead time plus the planning horizon
+    sku_requirement = np.maximum(sku_monthly * (index.lead_time_months + horizon_months) - index.product_stock, 0)
+
+    known = index.material_codes >= 0
+    codes = index.material_codes[known]
+    monthly_demand = np.bincount(codes, weights=sku_monthly[known], minlength=n_materials)
+    requirement = np.bincount(codes, weights=sku_requirement[known], minlength=n_materials)
+
+    stock = mat_data['stock'].fillna(0).to_numpy(dtype=np.float64)
+    cost = mat_data['cost_pp'].fillna(0).to_numpy(dtype=np.float64)
+    shortfall = np.maximum(requirement - stock, 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        coverage = np.where(monthly_demand > 0, stock / monthly_demand, np.inf)
+    return pd.DataFrame({
+        'raw_id': mat_data['raw_id'].to_numpy(),
+        'name': mat_data['name'].to_numpy(),
+        'stock': mat_data['stock'].to_numpy(),
+        'cost_pp': mat_data['cost_pp'].to_numpy(),
+        'monthly_demand': monthly_demand,
+        'requirement': requirement,
+        'shortfall': shortfall,
+        'cost_exposure': shortfall * cost,
+        'coverage_months': coverage,
+    }, columns=REQUIREMENT_COLUMNS)
@@ -1,33 +1,89 @@
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+# pandas and numpy stay module-level: every helper here works on frames and arrays, and the
+# GUI start path never imports this module (benchmarks/import_time.py checks that for main)
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
 import numpy as np
-import matplotlib.dates as mdates
+from instrumentation import count, span, traced
 
-def create_figures(sales_trends, monthly_sales, monthly_seasonality, on_demand_vs_regular, product_stock, material_stock, selected_month=None):
-    
-    # Skip filtering if 'All' or 'Reset' is selected
-    if selected_month not in [None, 'All', 'Reset']:
-        selected_month_value = int(selected_month)
-        sales_trends = sales_trends[sales_trends['date_sale'].dt.month == selected_month_value]
-        monthly_sales = monthly_sales[monthly_sales['date_sale'].dt.month == selected_month_value]
+# Order in which create_figures returns the figures
+FIGURE_KINDS = ['sales_trends', 'monthly_sales', 'monthly_seasonality', 'on_demand_vs_regular', 'product_stock', 'material_stock']
+# Figures filtered by the selected month; all others are shared across month filters
+MONTH_DEPENDENT_KINDS = {'sales_trends', 'monthly_sales'}
+# Figure size in inches per kind, so viewers can lay out figures before building them
+FIGURE_SIZES = {'sales_trends': (12, 6), 'monthly_sales': (12, 6), 'monthly_seasonality': (12, 6),
+                'on_demand_vs_regular': (8, 5), 'product_stock': (10, 6), 'material_stock': (10, 6),
+                'material_requirements': (12, 6)}
 
-    figures = []
+# Maximum number of figures kept by the default figure cache
+FIGURE_CACHE_SIZE = 24
 
+# Stock colour thresholds per chart as (high, low): green above high, orange above low, red otherwise
+STOCK_THRESHOLDS = {'product_stock': (50, 20), 'material_stock': (100, 50)}
+# Stock charts with more items than this switch from one bar per item to top/bottom-N ('auto' view)
+STOCK_CHART_MAX_BARS = 40
+# Items shown at each end of a top/bottom-N stock chart
+STOCK_CHART_TOP_N = 15
+STOCK_VIEWS = ('auto', 'bars', 'top', 'histogram')
+
+# Colors for Q4, Q1, Q2, Q3 of the financial year, i.e. calendar months 1-3, 4-6, 7-9, 10-12
+QUARTER_COLORS = np.array(['salmon', 'skyblue', 'lightgreen', 'sandybrown'], dtype=object)
+
+def _month_key(selected_month):
+    # None, 'All' and 'Reset' all mean "no filter"
+    if selected_month in [None, 'All', 'Reset']:
+        return None
+    return int(selected_month)
+
+
+def filter_by_month(sales_trends, monthly_sales, selected_month):
+    """Return (sales_trends, monthly_sales) restricted to a calendar month, with monthly_sales dates parsed."""
+    monthly_sales = monthly_sales.assign(date_sale=pd.to_datetime(monthly_sales['date_sale']))
+    month = _month_key(selected_month)
+    if month is not None:
+        sales_trends = sales_trends[sales_trends['date_sale'].dt.month == month]
+        monthly_sales = monthly_sales[monthly_sales['date_sale'].dt.month == month]
+    return sales_trends, monthly_sales
+
+
+def data_fingerprint(*frames):
+    """Cheap content hash of the plotted frames, usable as a figure cache data version."""
+    return tuple(int(pd.util.hash_pandas_object(frame, index=False).sum()) for frame in frames)
+
+
+# matplotlib and seaborn are imported on the first figure built, not when this module is imported
+def _new_figure(figsize):
+    from matplotlib.figure import Figure
+    return Figure(figsize=figsize)
+
+
+def _rotate_xticklabels(ax):
+    for label in ax.get_xticklabels():
+        label.set_rotation(45)
+        label.set_horizontalalignment('right')
+
+
+def _sales_trends_stats(sales_trends):
+    import matplotlib.dates as mdates
+    quantity = sales_trends['quantity']
+    dates = mdates.date2num(sales_trends['date_sale'])
+    trend = np.poly1d(np.polyfit(dates, quantity, 1))(dates) if len(quantity) > 1 else quantity.to_numpy()
+    return quantity.mean(), quantity.median(), quantity.std(), trend
+
+
+def _sales_trends_figure(sales_trends):
     # Sales trends figure with statistical annotations
-    fig_sales_trends, ax = plt.subplots(figsize=(12, 6))  # Adjusted for better fit
+    fig_sales_trends = _new_figure(FIGURE_SIZES['sales_trends'])  # Adjusted for better fit
+    ax = fig_sales_trends.add_subplot(111)
     ax.plot(sales_trends['date_sale'], sales_trends['quantity'], label='Sales Data', color='royalblue')
     # Calculate statistical data
-    mean_sales = sales_trends['quantity'].mean()
-    median_sales = sales_trends['quantity'].median()
-    std_dev_sales = sales_trends['quantity'].std()
+    mean_sales, median_sales, std_dev_sales, trend = _sales_trends_stats(sales_trends)
     # Add statistical annotations
     ax.axhline(mean_sales, color='green', linestyle='--', label=f'Mean: {mean_sales:.2f}')
     ax.axhline(median_sales, color='red', linestyle='-.', label=f'Median: {median_sales:.2f}')
     # Add a trend line
-    z = np.polyfit(mdates.date2num(sales_trends['date_sale']), sales_trends['quantity'], 1)
-    p = np.poly1d(z)
-    ax.plot(sales_trends['date_sale'], p(mdates.date2num(sales_trends['date_sale'])), linestyle='--', color='orange', label='Trend Line')
+    ax.plot(sales_trends['date_sale'], trend, linestyle='--', color='orange', label='Trend Line')
     # Annotations for statistical data
     ax.annotate(f'Standard Deviation: {std_dev_sales:.2f}', xy=(0.05, 0.85), xycoords='axes fraction', color='blue')
     # Improve the appearance of the plot
@@ -35,19 +91,16 @@ def create_figures(sales_trends, monthly_sales, monthly_seasonality, on_demand_v
     ax.set_xlabel('Date')
     ax.set_ylabel('Quantity Sold')
     # Adjust plot layout to make space for the legend on the right
-    plt.subplots_adjust(right=0.8)
+    fig_sales_trends.subplots_adjust(right=0.8)
     ax.legend(loc='center left', bbox_to_anchor=(1, 0.5))
     ax.grid(True)
     # Rotate x-axis labels to prevent overlapping
-    plt.setp(ax.get_xticklabels(), rotation=45, ha='right')
-    figures.append(fig_sales_trends)
-    # Close the plot to avoid displaying it in the current context
-    plt.close(fig_sales_trends)
+    _rotate_xticklabels(ax)
+    return fig_sales_trends
 
-# Monthly Sales figure with statistical annotations
-    fig_monthly_sales, ax = plt.subplots(figsize=(12, 6))
+
+def _draw_monthly_sales(ax, monthly_sales):
     # Ensure 'date_sale' is in datetime format and then format for plotting
-    monthly_sales['date_sale'] = pd.to_datetime(monthly_sales['date_sale'])
     monthly_sales_formatted = monthly_sales['date_sale'].dt.strftime('%Y-%m')
     ax.bar(monthly_sales_formatted, monthly_sales['quantity'], color='skyblue')
     # Calculate statistical data
@@ -66,33 +119,31 @@ def create_figures(sales_trends, monthly_sales, monthly_seasonality, on_demand_v
     ax.legend(loc='upper right')
     ax.grid(True, linestyle='--', linewidth=0.5)
     # Rotate x-axis labels to prevent overlapping
-    plt.setp(ax.get_xticklabels(), rotation=45, ha='right')
+    _rotate_xticklabels(ax)
+
+
+def _monthly_sales_figure(monthly_sales):
+    # Monthly Sales figure with statistical annotations
+    fig_monthly_sales = _new_figure(FIGURE_SIZES['monthly_sales'])
+    ax = fig_monthly_sales.add_subplot(111)
+    _draw_monthly_sales(ax, monthly_sales)
     # Adjust subplot parameters to give the plot more room
-    plt.subplots_adjust(bottom=0.15)
-    figures.append(fig_monthly_sales)
-    # Close the plot to avoid displaying it in the current context
-    plt.close(fig_monthly_sales)
+    fig_monthly_sales.subplots_adjust(bottom=0.15)
+    return fig_monthly_sales
+
 
+def _monthly_seasonality_figure(monthly_seasonality):
     # Monthly Seasonality figure with financial quarter grouping
-    fig_monthly_seasonality, ax = plt.subplots(figsize=(12, 6))
-    # Define colors for each quarter based on the new financial year structure
-    quarter_colors = ['salmon', 'skyblue', 'lightgreen', 'sandybrown']  # Colors for Q4, Q1, Q2, Q3
-    # Assign colors to each month based on its quarter
-    def assign_color(month):
-        if month in [1, 2, 3]:    # Q4
-            return quarter_colors[0]
-        elif month in [4, 5, 6]:  # Q1
-            return quarter_colors[1]
-        elif month in [7, 8, 9]:  # Q2
-            return quarter_colors[2]
-        elif month in [10, 11, 12]: # Q3
-            return quarter_colors[3]
-    monthly_seasonality['color'] = monthly_seasonality['month'].apply(assign_color)
+    fig_monthly_seasonality = _new_figure(FIGURE_SIZES['monthly_seasonality'])
+    ax = fig_monthly_seasonality.add_subplot(111)
+    # Assign colors to each month based on its financial quarter
+    colors = quarter_colors(monthly_seasonality['month'])
     # Add bars for each month, colored by quarter
     bars = ax.bar(monthly_seasonality['month'], monthly_seasonality['quantity'],
-                  color=monthly_seasonality['color'])
+                  color=colors)
     # Create custom labels for the legend
-    custom_labels = [plt.Rectangle((0, 0), 1, 1, color=color) for color in quarter_colors]
+    from matplotlib.patches import Rectangle
+    custom_labels = [Rectangle((0, 0), 1, 1, color=color) for color in QUARTER_COLORS]
     ax.legend(custom_labels, ['Q4', 'Q1', 'Q2', 'Q3'], title='Financial Quarters')
     # Improve the appearance of the plot
     ax.set_title('Monthly Seasonality', fontsize=14, fontweight='bold')
@@ -105,12 +156,12 @@ def create_figures(sales_trends, monthly_sales, monthly_seasonality, on_demand_v
     ax.axhline(average, color='red', linestyle='--', label=f'Average: {average:.2f}')
     ax.annotate(f'Average: {average:.2f}', xy=(0.75, 0.95), xycoords='axes fraction', color='red')
     ax.grid(True, linestyle='--', linewidth=0.5)
-    figures.append(fig_monthly_seasonality)
-    # Close the plot to avoid displaying it in the current context
-    plt.close(fig_monthly_seasonality)
+    return fig_monthly_seasonality
 
-     # On demand vs regular products figure with statistical annotations
-    fig_on_demand_vs_regular = plt.figure(figsize=(8, 5))
+
+def _on_demand_vs_regular_figure(on_demand_vs_regular):
+    # On demand vs regular products figure with statistical annotations
+    fig_on_demand_vs_regular = _new_figure(FIGURE_SIZES['on_demand_vs_regular'])
     ax = fig_on_demand_vs_regular.add_subplot(111)
     on_demand_vs_regular.plot(kind='bar', ax=ax, color=['skyblue', 'salmon'])
     total_count = on_demand_vs_regular['count'].sum()
@@ -119,56 +170,293 @@ def create_figures(sales_trends, monthly_sales, monthly_seasonality, on_demand_v
     ax.annotate(f'Total: {total_count}', xy=(0.05, 0.9), xycoords='axes fraction', color='blue')
     ax.annotate(f'Mean: {mean_count:.2f}', xy=(0.05, 0.85), xycoords='axes fraction', color='green')
     ax.annotate(f'Std Dev: {std_dev_count:.2f}', xy=(0.05, 0.8), xycoords='axes fraction', color='red')
-    plt.title('On Demand vs Regular Products', fontsize=14, fontweight='bold')
-    plt.xlabel('Product Type', fontsize=12)
-    plt.ylabel('Count', fontsize=12)
-    plt.xticks([0, 1], ['Regular', 'On Demand'], rotation=0)
-    plt.grid(True, linestyle='--', linewidth=0.5)
-    figures.append(fig_on_demand_vs_regular)
-
-    # Product stock levels figure with statistical annotations
-    fig_product_stock = plt.figure(figsize=(10, 6))
-    ax = fig_product_stock.add_subplot(111)
-    product_stock.loc[:, 'color'] = product_stock['stock'].apply(lambda x: 'green' if x > 50 else ('orange' if x > 20 else 'red'))
-    unique_colors = product_stock['color'].unique().tolist()
-    sns.barplot(x='name', y='stock', hue='color', data=product_stock, palette=unique_colors, dodge=False, ax=ax)
-    ax.get_legend().remove()
-    mean_stock = product_stock['stock'].mean()
-    median_stock = product_stock['stock'].median()
-    std_dev_stock = product_stock['stock'].std()
-    ax.axhline(mean_stock, color='blue', linestyle='--', label=f'Mean: {mean_stock:.2f}')
-    ax.axhline(median_stock, color='green', linestyle='-.', label=f'Median: {median_stock:.2f}')
+    ax.set_title('On Demand vs Regular Products', fontsize=14, fontweight='bold')
+    ax.set_xlabel('Product Type', fontsize=12)
+    ax.set_ylabel('Count', fontsize=12)
+    ax.set_xticks([0, 1], ['Regular', 'On Demand'], rotation=0)
+    ax.grid(True, linestyle='--', linewidth=0.5)
+    return fig_on_demand_vs_regular
+
+
+def quarter_colors(months):
+    """Vectorized financial-quarter colour for an array of calendar months (1-12)."""
+    return QUARTER_COLORS[(np.asarray(months, dtype=np.int64) - 1) // 3].tolist()
+
+
+def classify_stock(stock, high, low):
+    """Vectorized stock colour: 'green' above high, 'orange' above low, 'red' otherwise."""
+    stock = np.asarray(stock)
+    return np.where(stock > high, 'green', np.where(stock > low, 'orange', 'red')).astype(object)
+
+
+def select_top_bottom(stock, n=STOCK_CHART_TOP_N):
+    """Return the n highest and n lowest stocked items plus an 'Others' row averaging the rest.
+
+    Uses argpartition, so the cost is linear in the number of items. The
+    returned frame has name/stock columns, highest first, with the Others
+    row (if any) between the two groups and an 'others' flag column.
+    """
+    values = stock['stock'].to_numpy()
+    names = stock['name'].to_numpy(dtype=object)
+    count = len(values)
+    if count <= 2 * n:
+        order = np.argsort(-values, kind='stable')
+        return pd.DataFrame({'name': names[order], 'stock': values[order], 'others': False})
+    top = np.argpartition(-values, n - 1)[:n]
+    bottom = np.argpartition(values, n - 1)[:n]
+    top = top[np.argsort(-values[top], kind='stable')]
+    bottom = bottom[np.argsort(-values[bottom], kind='stable')]
+    rest = np.ones(count, dtype=bool)
+    rest[top] = False
+    rest[bottom] = False
+    others = pd.DataFrame({'name': [f'Others ({int(rest.sum())} items, avg)'],
+                           'stock': [values[rest].mean()], 'others': [True]})
+    return pd.concat([
+        pd.DataFrame({'name': names[top], 'stock': values[top], 'others': False}),
+        others,
+        pd.DataFrame({'name': names[bottom], 'stock': values[bottom], 'others': False}),
+    ], ignore_index=True)
+
+
+def _stock_statistics(ax, values):
+    mean_stock = values.mean()
+    median_stock = np.median(values)
+    std_dev_stock = values.std(ddof=1) if len(values) > 1 else np.nan
     ax.annotate(f'Std Dev: {std_dev_stock:.2f}', xy=(0.7, 0.9), xycoords='axes fraction', color='red')
-    plt.title('Product Stock Levels', fontsize=14, fontweight='bold')
-    plt.xlabel('Product', fontsize=12)
-    plt.ylabel('Stock Level', fontsize=12)
-    plt.xticks(rotation=45)
-    plt.legend()
-    plt.grid(True, linestyle='--', linewidth=0.5)
-    figures.append(fig_product_stock)
-
-    # Material stock levels figure with statistical annotations
-    fig_material_stock = plt.figure(figsize=(10, 6))
-    ax = fig_material_stock.add_subplot(111)
-
-    # Create a copy of the DataFrame slice to avoid SettingWithCopyWarning
-    material_stock = material_stock.copy()
-    material_stock['color'] = material_stock['stock'].apply(lambda x: 'green' if x > 100 else ('orange' if x > 50 else 'red'))
-    unique_colors_material = material_stock['color'].unique().tolist()
-    sns.barplot(x='name', y='stock', hue='color', data=material_stock, palette=unique_colors_material, dodge=False, ax=ax)
-    ax.get_legend().remove()
-    mean_material_stock = material_stock['stock'].mean()
-    median_material_stock = material_stock['stock'].median()
-    std_dev_material_stock = material_stock['stock'].std()
-    ax.axhline(mean_material_stock, color='blue', linestyle='--', label=f'Mean: {mean_material_stock:.2f}')
-    ax.axhline(median_material_stock, color='green', linestyle='-.', label=f'Median: {median_material_stock:.2f}')
-    ax.annotate(f'Std Dev: {std_dev_material_stock:.2f}', xy=(0.7, 0.9), xycoords='axes fraction', color='red')
-    plt.title('Material Stock Levels', fontsize=14, fontweight='bold')
-    plt.xlabel('Material', fontsize=12)
-    plt.ylabel('Stock Level', fontsize=12)
-    plt.xticks(rotation=45)
-    plt.legend()
-    plt.grid(True, linestyle='--', linewidth=0.5)
-    figures.append(fig_material_stock)
-
-    return figures
\ No newline at end of file
+    return mean_stock, median_stock
+
+
+def _stock_figure(stock, high, low, title, xlabel, figsize, view='auto', top_n=STOCK_CHART_TOP_N):
+    # Stock levels figure with statistical annotations
+    if view not in STOCK_VIEWS:
+        raise ValueError(f"Unknown stock chart view: {view}")
+    if view == 'auto':
+        view = 'bars' if len(stock) <= STOCK_CHART_MAX_BARS else 'top'
+    fig_stock = _new_figure(figsize)
+    ax = fig_stock.add_subplot(111)
+    values = stock['stock'].to_numpy(dtype=np.float64)
+    # Statistics always describe every item, whatever subset is drawn
+    mean_stock, median_stock = _stock_statistics(ax, values)
+
+    if view == 'histogram':
+        ax.hist(values, bins=min(50, max(10, int(np.sqrt(len(values))))), color='skyblue', edgecolor='white')
+        ax.axvline(low, color='red', linestyle=':', label=f'Low: {low}')
+        ax.axvline(high, color='orange', linestyle=':', label=f'High: {high}')
+        ax.axvline(mean_stock, color='blue', linestyle='--', label=f'Mean: {mean_stock:.2f}')
+        ax.axvline(median_stock, color='green', linestyle='-.', label=f'Median: {median_stock:.2f}')
+        ax.set_xlabel('Stock Level', fontsize=12)
+        ax.set_ylabel(f'Number of {xlabel}s', fontsize=12)
+    else:
+        if view == 'top':
+            shown = select_top_bottom(stock, top_n)
+            title = f'{title} (top and bottom {top_n})'
+        else:
+            shown = pd.DataFrame({'name': stock['name'].to_numpy(), 'stock': stock['stock'].to_numpy(), 'others': False})
+        colors = classify_stock(shown['stock'], high, low)
+        colors[shown['others'].to_numpy()] = 'grey'
+        shown = shown.assign(color=colors)
+        unique_colors = shown['color'].unique().tolist()
+        import seaborn as sns
+        sns.barplot(x='name', y='stock', hue='color', data=shown, palette=unique_colors, dodge=False, ax=ax)
+        if ax.get_legend() is not None:
+            # (no legend when a filter leaves no items)
+            ax.get_legend().remove()
+        ax.axhline(mean_stock, color='blue', linestyle='--', label=f'Mean: {mean_stock:.2f}')
+        ax.axhline(median_stock, color='green', linestyle='-.', label=f'Median: {median_stock:.2f}')
+        ax.set_xlabel(xlabel, fontsize=12)
+        ax.set_ylabel('Stock Level', fontsize=12)
+        ax.tick_params(axis='x', labelrotation=45)
+    ax.set_title(title, fontsize=14, fontweight='bold')
+    ax.legend()
+    ax.grid(True, linestyle='--', linewidth=0.5)
+    return fig_stock
+
+
+def _stock_options(kind, stock_options):
+    options = dict(stock_options or {})
+    high, low = options.pop('thresholds', {}).get(kind, STOCK_THRESHOLDS[kind])
+    return high, low, options
+
+
+def _product_stock_figure(product_stock, stock_options=None):
+    high, low, options = _stock_options('product_stock', stock_options)
+    return _stock_figure(product_stock, high, low, 'Product Stock Levels', 'Product', FIGURE_SIZES['product_stock'], **options)
+
+
+def _material_stock_figure(material_stock, stock_options=None):
+    high, low, options = _stock_options('material_stock', stock_options)
+    return _stock_figure(material_stock, high, low, 'Material Stock Levels', 'Material', FIGURE_SIZES['material_stock'], **options)
+
+
+def _material_requirements_figure(requirements, top_n=STOCK_CHART_TOP_N):
+    # Requirement vs stock per material; large catalogs show the biggest cost exposures only
+    fig = _new_figure(FIGURE_SIZES['material_requirements'])
+    ax = fig.add_subplot(111)
+    shown = requirements
+    if len(requirements) > STOCK_CHART_MAX_BARS:
+        order = np.lexsort((-requirements['requirement'].to_numpy(), -requirements['cost_exposure'].to_numpy()))
+        shown = requirements.iloc[order[:top_n]]
+    x = np.arange(len(shown))
+    width = 0.4
+    short = shown['shortfall'].to_numpy() > 0
+    ax.bar(x - width / 2, shown['requirement'], width, color='skyblue', edgecolor='black', label='Requirement')
+    ax.bar(x + width / 2, shown['stock'], width, color=np.where(short, 'salmon', 'lightgreen').tolist(),
+           edgecolor='black', label='Stock')
+    ax.set_xticks(x, shown['name'].astype(str), rotation=45, ha='right')
+    n_short = int((requirements['shortfall'] > 0).sum())
+    ax.annotate(f"Cost exposure: {requirements['cost_exposure'].sum():,.0f}", xy=(0.02, 0.93), xycoords='axes fraction', color='red')
+    ax.annotate(f"Materials short: {n_short} of {len(requirements)}", xy=(0.02, 0.87), xycoords='axes fraction', color='blue')
+    title = 'Material Requirements vs Stock'
+    if len(shown) < len(requirements):
+        title += f' (top {len(shown)} by cost exposure)'
+    ax.set_title(title, fontsize=14, fontweight='bold')
+    ax.set_xlabel('Material', fontsize=12)
+    ax.set_ylabel('Units', fontsize=12)
+    from matplotlib.patches import Rectangle
+    ax.legend(handles=[Rectangle((0, 0), 1, 1, color='skyblue'), Rectangle((0, 0), 1, 1, color='lightgreen'),
+                       Rectangle((0, 0), 1, 1, color='salmon')],
+              labels=['Requirement', 'Stock (covers requirement)', 'Stock (shortfall)'])
+    ax.grid(True, axis='y', linestyle='--', linewidth=0.5)
+    fig.tight_layout()
+    return fig
+
+
+def build_figure(kind, sales_trends, monthly_sales, monthly_seasonality, on_demand_vs_regular, product_stock, material_stock, selected_month=None, stock_options=None, material_requirements=None):
+    """Build a single figure of the given kind.
+
+    stock_options tunes the two stock charts: 'thresholds' maps a chart kind
+    to (high, low) colour thresholds, 'view' is one of STOCK_VIEWS and
+    'top_n' sets how many items the top/bottom view shows at each end.
+    The 'material_requirements' kind needs the frame returned by
+    material_requirements.compute_material_requirements.
+    """
+    with span('figure.build', kind=kind, month=selected_month):
+        if kind in MONTH_DEPENDENT_KINDS:
+            sales_trends, monthly_sales = filter_by_month(sales_trends, monthly_sales, selected_month)
+        if kind == 'sales_trends':
+            return _sales_trends_figure(sales_trends)
+        if kind == 'monthly_sales':
+            return _monthly_sales_figure(monthly_sales)
+        if kind == 'monthly_seasonality':
+            return _monthly_seasonality_figure(monthly_seasonality)
+        if kind == 'on_demand_vs_regular':
+            return _on_demand_vs_regular_figure(on_demand_vs_regular)
+        if kind == 'product_stock':
+            return _product_stock_figure(product_stock, stock_options)
+        if kind == 'material_stock':
+            return _material_stock_figure(material_stock, stock_options)
+        if kind == 'material_requirements' and material_requirements is not None:
+            return _material_requirements_figure(material_requirements)
+    raise ValueError(f"Unknown figure kind: {kind}")
+
+
+class FigureCache:
+    """LRU cache of figures keyed by (kind, month filter, data version).
+
+    Month-independent figures are stored under a month of None so every
+    filter shares them. Cached figures are never modified: they are
+    requested from worker threads while an earlier one may be on screen in a
+    FigureCanvasTkAgg, so a new month filter gets a newly built figure that
+    the viewer swaps onto its canvas on the Tk thread.
+    """
+
+    def __init__(self, max_entries=FIGURE_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        # Figures may be requested from background threads. The lock only guards the
+        # dicts; builds run outside it, and a key being built maps to the Future of
+        # that build so concurrent misses on it wait for one build.
+        self._lock = threading.Lock()
+        self._building = {}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def get(self, kind, selected_month, data_version, build):
+        month = _month_key(selected_month) if kind in MONTH_DEPENDENT_KINDS else None
+        key = (kind, month, data_version)
+        with self._lock:
+            fig = self._entries.get(key)
+            if fig is not None:
+                self._entries.move_to_end(key)
+                count('figure_cache.hit')
+                return fig
+            pending = self._building.get(key)
+            if pending is None:
+                count('figure_cache.miss')
+                pending = self._building[key] = Future()
+                building = True
+            else:
+                building = False
+        if not building:
+            return pending.result()
+        try:
+            fig = build()
+        except BaseException as e:
+            with self._lock:
+                del self._building[key]
+            pending.set_exception(e)
+            raise
+        with self._lock:
+            del self._building[key]
+            self._entries[key] = fig
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        pending.set_result(fig)
+        return fig
+
+
+# Cache shared by the GUI
+figure_cache = FigureCache()
+
+
+def _options_key(stock_options):
+    # Hashable form of stock_options so it can be part of a cache key
+    if not stock_options:
+        return None
+    return tuple(sorted((key, tuple(sorted(value.items())) if isinstance(value, dict) else value)
+                        for key, value in stock_options.items()))
+
+
+def figure_factories(sales_trends, monthly_sales, monthly_seasonality, on_demand_vs_regular, product_stock, material_stock, selected_month=None, data_version=None, cache=None, stock_options=None, material_requirements=None):
+    """Return [(kind, factory)] where calling factory() builds or fetches that figure.
+
+    Nothing is rendered until a factory is called, so a viewer can build
+    figures as they become visible. With a data_version the figures come
+    from the cache (figure_cache by default); without one they are always
+    built fresh. Passing material_requirements adds that figure after the
+    FIGURE_KINDS ones.
+    """
+    data = (sales_trends, monthly_sales, monthly_seasonality, on_demand_vs_regular, product_stock, material_stock)
+    if cache is None and data_version is not None:
+        cache = figure_cache
+
+    def factory(kind):
+        def build():
+            return build_figure(kind, *data, selected_month=selected_month, stock_options=stock_options,
+                                material_requirements=material_requirements)
+
+        if cache is None:
+            return build
+
+        version = data_version
+        if kind in STOCK_THRESHOLDS:
+            version = (data_version, _options_key(stock_options))
+        elif kind == 'material_requirements':
+            version = (data_version, data_fingerprint(material_requirements))
+        return lambda: cache.get(kind, selected_month, version, build)
+
+    kinds = FIGURE_KINDS + (['material_requirements'] if material_requirements is not None else [])
+    return [(kind, factory(kind)) for kind in kinds]
+
+
+@traced()
+def create_figures(sales_trends, monthly_sales, monthly_seasonality, on_demand_vs_regular, product_stock, material_stock, selected_month=None, data_version=None, stock_options=None, material_requirements=None):
+    factories = figure_factories(sales_trends, monthly_sales, monthly_seasonality, on_demand_vs_regular,
+                                 product_stock, material_stock, selected_month, data_version,
+                                 stock_options=stock_options, material_requirements=material_requirements)
+    return [factory() for _, factory in factories]
\ No newline at end of file
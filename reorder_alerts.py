@@ -0,0 +1,113 @@
+from bisect import bisect_left, bisect_right, insort
+import numpy as np
+
+# Batches touching more than this share of the inventory are re-indexed in one vectorized pass
+REBUILD_FRACTION = 0.125
+
+
+class ReorderAlerts:
+    """Items at or near their reorder level, kept up to date from InventoryStore events.
+
+    An item is watched while its slack (Quantity - Reorder Level) is at most
+    `margin`; watched items are held in a list sorted by (slack, item name),
+    so the most urgent come first. Store edits move a single entry in
+    O(log k) plus the list shift, and below_reorder_level() returns the k
+    items with slack <= 0 without touching the rest of the inventory. The
+    initial index is built with NumPy over the whole store.
+
+    Listeners registered with subscribe() are called as listener(alerts)
+    after every change to the watched set.
+    """
+
+    def __init__(self, store=None, margin=0):
+        self.margin = int(margin)
+        self.store = None
+        self._keys = []
+        self._slack = {}
+        self._listeners = []
+        if store is not None:
+            self.set_store(store)
+
+    def set_store(self, store):
+        """Index a (possibly different) store and follow its changes."""
+        if self.store is not None:
+            self.store.unsubscribe(self._on_store_change)
+        self.store = store
+        store.subscribe(self._on_store_change)
+        self.rebuild()
+
+    def close(self):
+        if self.store is not None:
+            self.store.unsubscribe(self._on_store_change)
+            self.store = None
+
+    def subscribe(self, listener):
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def _notify(self):
+        for listener in list(self._listeners):
+            listener(self)
+
+    def rebuild(self):
+        """Recompute the watched set from the whole store in one vectorized pass."""
+        names, quantity, reorder = self.store.live_arrays()
+        slack = quantity - reorder
+        watched = slack <= self.margin
+        names, slack = names[watched], slack[watched]
+        order = np.lexsort((names.astype(str), slack))
+        slack, names = slack[order].tolist(), names[order].tolist()
+        self._keys = list(zip(slack, names))
+        self._slack = dict(zip(names, slack))
+        self._notify()
+
+    def _refresh_item(self, item_name):
+        old = self._slack.pop(item_name, None)
+        if old is not None:
+            i = bisect_right(self._keys, (old, item_name)) - 1
+            del self._keys[i]
+        row = self.store.get(item_name)
+        if row is not None and row[0] - row[1] <= self.margin:
+            slack = row[0] - row[1]
+            self._slack[item_name] = slack
+            insort(self._keys, (slack, item_name))
+        return old is not None or item_name in self._slack
+
+    def _on_store_change(self, event, item_name, pos):
+        if event in ('add', 'update', 'remove'):
+            if self._refresh_item(item_name):
+                self._notify()
+        elif event == 'batch':
+            if len(item_name) > REBUILD_FRACTION * max(len(self.store), 1):
+                self.rebuild()
+                return
+            changed = False
+            for name in dict.fromkeys(op[1] for op in item_name):
+                changed = self._refresh_item(name) or changed
+            if changed:
+                self._notify()
+        # 'reindex' only moves row positions; the index is keyed by item name
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __contains__(self, item_name):
+        return item_name in self._slack
+
+    def slack(self, item_name):
+        """Quantity - Reorder Level of a watched item, or None if it is not watched."""
+        return self._slack.get(item_name)
+
+    def below_reorder_level(self):
+        """(slack, item name) of every item with Quantity <= Reorder Level, most urgent first."""
+        return self._keys[:bisect_left(self._keys, (1,))]
+
+    def near_reorder_level(self):
+        """(slack, item name) of every watched item, including those within margin of their level."""
+        return list(self._keys)
+
+    def most_urgent(self, limit):
+        return self._keys[:limit]
@@ -0,0 +1,121 @@
+"""Headless report export: renders the figure set for many month filters in parallel.
+
+Usage:
+    python report_export.py --output reports --formats png svg pdf
+    python report_export.py --months All 1 2 3 --workers 4
+
+Runs load_compact -> analytics / analyze_stock_levels / material
+requirements -> figure_factories (the dashboard's figure set) on
+matplotlib's non-interactive Agg backend (tkinter is never imported) and
+writes one directory per month filter plus a manifest.json. Worker processes
+share the memory-mapped sales matrix written by the parent.
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import matplotlib
+matplotlib.use('Agg')
+from data_cache import source_signature
+from data_processing import compute_analytics
+from plotting import figure_factories
+
+# 'All' plus every calendar month, matching the GUI's month dropdown
+MONTH_FILTERS = ['All'] + [str(month) for month in range(1, 13)]
+SUPPORTED_FORMATS = ('png', 'svg', 'pdf')
+SOURCE_FILES = ('product_data.csv', 'mat_data.csv', 'sales_data.csv')
+
+# Analytics computed once per worker process by _init_worker
+_worker_data = None
+
+
+def load_report_data(data_dir='.'):
+    """The six analytics frames plus the material requirements, as the GUI plots them."""
+    from compact_data import load_compact
+    from material_requirements import compute_material_requirements_matrix
+    analytics = compute_analytics(data_dir, compact=True)
+    product_data, mat_data, sales = load_compact(data_dir)
+    requirements = compute_material_requirements_matrix(product_data, mat_data, sales.skus, sales.dates, sales.matrix)
+    return analytics + (requirements,)
+
+
+def _init_worker(data_dir):
+    global _worker_data
+    # Every worker maps the sales matrix the parent wrote instead of loading its own copy
+    _worker_data = load_report_data(data_dir)
+
+
+def month_label(selected_month):
+    return 'all' if selected_month in (None, 'All') else f"month_{int(selected_month):02d}"
+
+
+def render_variant(selected_month, output_dir, formats, data=None):
+    """Render and save the figure set for one month filter; returns its manifest entry."""
+    data = data if data is not None else _worker_data
+    start = time.perf_counter()
+    variant_dir = os.path.join(output_dir, month_label(selected_month))
+    os.makedirs(variant_dir, exist_ok=True)
+    files = []
+    *analytics, requirements = data
+    for index, (kind, factory) in enumerate(figure_factories(*analytics, selected_month=selected_month,
+                                                             material_requirements=requirements), start=1):
+        fig = factory()
+        for fmt in formats:
+            path = os.path.join(variant_dir, f"{index:02d}_{kind}.{fmt}")
+            fig.savefig(path, format=fmt, bbox_inches='tight')
+            files.append({"kind": kind, "format": fmt,
+                          "path": os.path.relpath(path, output_dir), "bytes": os.path.getsize(path)})
+    return {"month": selected_month, "label": month_label(selected_month), "files": files,
+            "seconds": round(time.perf_counter() - start, 3)}
+
+
+def export_reports(data_dir='.', output_dir='reports', months=MONTH_FILTERS, formats=('png',), workers=None):
+    """Render every month filter across a process pool and write output_dir/manifest.json."""
+    formats = tuple(formats)
+    unknown = [fmt for fmt in formats if fmt not in SUPPORTED_FORMATS]
+    if unknown:
+        raise ValueError(f"Unsupported format(s): {', '.join(unknown)}")
+    months = list(months)
+    os.makedirs(output_dir, exist_ok=True)
+    start = time.perf_counter()
+
+    # Parse once in the parent so every worker starts from the binary data cache
+    compute_analytics(data_dir, compact=True)
+    workers = workers or min(len(months), os.cpu_count() or 1)
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(data_dir,)) as executor:
+            variants = list(executor.map(render_variant, months, [output_dir] * len(months), [formats] * len(months)))
+    else:
+        data = load_report_data(data_dir)
+        variants = [render_variant(month, output_dir, formats, data) for month in months]
+
+    manifest = {
+        "generated_at": time.strftime('%Y-%m-%dT%H:%M:%S'),
+        "data_dir": os.path.abspath(data_dir),
+        "sources": [source_signature(os.path.join(data_dir, name)) for name in SOURCE_FILES],
+        "formats": list(formats),
+        "workers": workers,
+        "seconds": round(time.perf_counter() - start, 3),
+        "variants": variants,
+    }
+    with open(os.path.join(output_dir, 'manifest.json'), 'w') as file:
+        json.dump(manifest, file, indent=2)
+    return manifest
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export the dashboard figures for every month filter without the GUI.")
+    parser.add_argument('--data-dir', default='.', help="directory containing the source CSV files")
+    parser.add_argument('--output', default='reports', help="directory to write figures and manifest.json to")
+    parser.add_argument('--months', nargs='+', default=MONTH_FILTERS, help="month filters to render ('All' or 1-12)")
+    parser.add_argument('--formats', nargs='+', default=['png'], choices=SUPPORTED_FORMATS)
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: one per variant, up to the CPU count)")
+    args = parser.parse_args(argv)
+
+    manifest = export_reports(args.data_dir, args.output, args.months, args.formats, args.workers)
+    print(f"Exported {len(manifest['variants'])} report variants to {args.output} in {manifest['seconds']:.2f}s.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+import numpy as np
+import pandas as pd
+from instrumentation import span, traced
+
+# Dimensions a cube can be sliced and rolled up by; quarter is derived from month
+CUBE_DIMENSIONS = ('sku', 'mat_id', 'on_demand', 'year', 'quarter', 'month')
+# Material / on_demand label of SKUs that are missing from product_data or have no value there
+MISSING = '(none)'
+
+
+def _values(selection):
+    # A single value or an iterable of values
+    if isinstance(selection, (str, bytes)) or not hasattr(selection, '__iter__'):
+        return [selection]
+    return list(selection)
+
+
+def _csr(codes, n_groups):
+    """(order, starts): order[starts[g]:starts[g + 1]] are the positions with code g, ascending."""
+    order = np.argsort(codes, kind='stable')
+    starts = np.searchsorted(codes[order], np.arange(n_groups + 1))
+    return order, starts
+
+
+class SalesCube:
+    """Sales pre-aggregated over SKU x material x on_demand x year x month.
+
+    Every SKU has one material (mat_id) and one on_demand flag, so the
+    material x on_demand x month cells are one small array of per-group
+    totals (and non-empty cell counts) computed in a single pass over the
+    SKU x month matrix; the finest level, SKU x month, is the matrix itself.
+    Year and month are properties of the month columns. slice() selects
+    groups and columns from these, and reads SKU rows only when the slice
+    or roll-up is by SKU, so its cost follows the size of the result rather
+    than the number of sales rows.
+    """
+
+    @traced('cube.build')
+    def __init__(self, product_data, skus, dates, matrix):
+        self.skus = pd.Index(skus)
+        self.matrix = matrix
+        self._integer = matrix.dtype.kind in 'iu'
+        # Month columns in date order; _columns maps them back to matrix columns
+        dates = pd.DatetimeIndex(dates)
+        self._columns = np.argsort(np.asarray(dates), kind='stable')
+        self.dates = dates[self._columns]
+        self.years = self.dates.year.to_numpy()
+        self.months = self.dates.month.to_numpy()
+        self.quarters = (self.months - 1) // 3 + 1
+
+        # Products keep every product_data row, as analyze_data and analyze_stock_levels count them
+        self.products = product_data.reset_index(drop=True)
+        self._product_skus = pd.Index(self.products['sku'])
+        lookup = self.products.drop_duplicates(subset='sku').set_index('sku')
+        attributes = {
+            dimension: pd.concat([lookup[dimension].reindex(self.skus), self.products[dimension]], ignore_index=True)
+            .astype(object).fillna(MISSING)
+            for dimension in ('mat_id', 'on_demand')
+        }
+        # (mat_id, on_demand) pairs as one integer code, numbered in sorted order
+        mat_codes, materials = pd.factorize(attributes['mat_id'], sort=True)
+        flag_codes, flags = pd.factorize(attributes['on_demand'], sort=True)
+        pairs, codes = np.unique(mat_codes.astype(np.int64) * len(flags) + flag_codes, return_inverse=True)
+        # One row per (mat_id, on_demand) combination that occurs
+        self.groups = pd.DataFrame({'mat_id': np.asarray(materials, dtype=object)[pairs // len(flags)],
+                                    'on_demand': np.asarray(flags, dtype=object)[pairs % len(flags)]})
+        n_groups = len(self.groups)
+        self._sku_group = codes[:len(self.skus)]
+        self._product_group = codes[len(self.skus):]
+        self._sku_order, self._sku_starts = _csr(self._sku_group, n_groups)
+        self._product_order, self._product_starts = _csr(self._product_group, n_groups)
+        # on_demand values of the catalog, i.e. the rows analyze_data gives for on_demand_vs_regular
+        self._on_demand_values = pd.Index(sorted(self.products['on_demand'].dropna().unique()), name='on_demand')
+        # Named products per group, i.e. what on_demand_vs_regular counts
+        self._group_named = np.bincount(self._product_group, weights=self.products['name'].notna().to_numpy(),
+                                        minlength=n_groups).astype(np.int64)
+
+        # group x month totals and the number of SKU cells with data behind them
+        self._group_totals = np.zeros((n_groups, len(self.dates)), dtype=np.int64 if self._integer else np.float64)
+        self._group_cells = np.zeros((n_groups, len(self.dates)), dtype=np.int64)
+        sizes = np.bincount(self._sku_group, minlength=n_groups)
+        for j, column in enumerate(self._columns):
+            values = np.asarray(matrix[:, column])
+            if self._integer:
+                self._group_totals[:, j] = np.bincount(self._sku_group, weights=values, minlength=n_groups)
+                self._group_cells[:, j] = sizes
+            else:
+                present = ~np.isnan(values)
+                self._group_totals[:, j] = np.bincount(self._sku_group, weights=np.where(present, values, 0),
+                                                       minlength=n_groups)
+                self._group_cells[:, j] = np.bincount(self._sku_group, weights=present, minlength=n_groups)
+
+    @classmethod
+    def from_long(cls, product_data, sales_data):
+        """Build the cube from the long sales frame returned by load_and_preprocess."""
+        wide = sales_data.pivot(index='sku', columns='date_sale', values='quantity')
+        wide = wide.reindex(sales_data['sku'].drop_duplicates())
+        matrix = wide.to_numpy()
+        if not sales_data['quantity'].isna().any() and sales_data['quantity'].dtype.kind in 'iu':
+            matrix = matrix.astype(sales_data['quantity'].dtype)
+        return cls(product_data, wide.index, wide.columns, matrix)
+
+    @classmethod
+    def from_compact(cls, product_data, sales):
+        """Build the cube over the (memory-mapped) matrix of a compact_data.CompactSales."""
+        return cls(product_data, sales.skus, sales.dates, sales.matrix)
+
+    def values(self, dimension):
+        """Sorted distinct values of a dimension, e.g. to fill a filter control."""
+        if dimension == 'sku':
+            return sorted(self.skus)
+        if dimension in ('mat_id', 'on_demand'):
+            return sorted(self.groups[dimension].unique(), key=str)
+        if dimension in ('year', 'quarter', 'month'):
+            return np.unique(getattr(self, dimension + 's')).tolist()
+        raise ValueError(f"Unknown cube dimension: {dimension}")
+
+    def slice(self, sku=None, mat_id=None, on_demand=None, year=None, quarter=None, month=None):
+        """Select part of the cube; each argument is None (everything), one value or several values."""
+        with span('cube.slice'):
+            filters = {'sku': sku, 'mat_id': mat_id, 'on_demand': on_demand,
+                       'year': year, 'quarter': quarter, 'month': month}
+            filters = {dimension: _values(value) for dimension, value in filters.items() if value is not None}
+
+            group_mask = np.ones(len(self.groups), dtype=bool)
+            for dimension in ('mat_id', 'on_demand'):
+                if dimension in filters:
+                    group_mask &= self.groups[dimension].isin(filters[dimension]).to_numpy()
+            column_mask = np.ones(len(self.dates), dtype=bool)
+            for dimension in ('year', 'quarter', 'month'):
+                if dimension in filters:
+                    column_mask &= np.isin(getattr(self, dimension + 's'), [int(v) for v in filters[dimension]])
+
+            rows, product_rows = None, None
+            if 'sku' in filters:
+                rows = self.skus.get_indexer(filters['sku'])
+                rows = np.unique(rows[rows >= 0])
+                rows = rows[group_mask[self._sku_group[rows]]]
+                product_rows = self._product_skus.get_indexer_for(filters['sku'])
+                product_rows = np.unique(product_rows[product_rows >= 0])
+                product_rows = product_rows[group_mask[self._product_group[product_rows]]]
+            key = tuple((dimension, tuple(sorted(map(str, filters[dimension])))) for dimension in CUBE_DIMENSIONS
+                        if dimension in filters)
+            return CubeSlice(self, np.flatnonzero(group_mask), np.flatnonzero(column_mask), rows, product_rows, key)
+
+    def _members(self, order, starts, groups):
+        # Positions belonging to the given groups, ascending
+        if len(groups) == len(starts) - 1:
+            return np.arange(len(order))
+        parts = [order[starts[g]:starts[g + 1]] for g in groups]
+        return np.sort(np.concatenate(parts)) if parts else np.array([], dtype=np.intp)
+
+
+class CubeSlice:
+    """The part of a SalesCube selected by SalesCube.slice(); key identifies the filters."""
+
+    def __init__(self, cube, groups, columns, rows, product_rows, key):
+        self.cube = cube
+        self.groups = groups
+        self.columns = columns
+        self._rows = rows
+        self._product_rows = product_rows
+        self.key = key
+        self.totals, self.cells = self._date_totals()
+
+    def _block(self, rows):
+        # SKU x month cells of the slice, read from the matrix
+        return np.asarray(self.cube.matrix[np.ix_(rows, self.cube._columns[self.columns])])
+
+    def rows(self):
+        """SKU rows of the slice (matrix row positions)."""
+        if self._rows is None:
+            self._rows = self.cube._members(self.cube._sku_order, self.cube._sku_starts, self.groups)
+        return self._rows
+
+    def product_rows(self):
+        """product_data rows of the slice, in file order."""
+        if self._product_rows is None:
+            self._product_rows = self.cube._members(self.cube._product_order, self.cube._product_starts, self.groups)
+        return self._product_rows
+
+    def _date_totals(self):
+        cube = self.cube
+        if self._rows is None:
+            # Whole groups: add up the pre-aggregated cells
+            cells = np.ix_(self.groups, self.columns)
+            return cube._group_totals[cells].sum(axis=0), cube._group_cells[cells].sum(axis=0)
+        block = self._block(self._rows)
+        if cube._integer:
+            return block.sum(axis=0, dtype=np.int64), np.full(len(self.columns), len(self._rows), dtype=np.int64)
+        return np.nansum(block, axis=0), np.count_nonzero(~np.isnan(block), axis=0)
+
+    def dates(self):
+        return self.cube.dates[self.columns]
+
+    def sales_trends(self):
+        return pd.DataFrame({'date_sale': self.dates(), 'quantity': self.totals})
+
+    def monthly_sales(self):
+        return pd.DataFrame({'date_sale': pd.Series(self.dates().strftime('%Y-%m')), 'quantity': self.totals})
+
+    def monthly_seasonality(self):
+        """Mean quantity per SKU and month, by calendar month (as analyze_data computes it)."""
+        months = self.cube.months[self.columns]
+        present = np.unique(months)
+        sums = np.bincount(months, weights=self.totals, minlength=13)
+        cells = np.bincount(months, weights=self.cells, minlength=13)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return pd.DataFrame({'month': present, 'quantity': sums[present] / cells[present]})
+
+    def on_demand_vs_regular(self):
+        """Named products per on_demand value; values the filters exclude are kept with a count of 0."""
+        cube = self.cube
+        if self._product_rows is None:
+            # Whole groups: add up the per-group product counts
+            labels = cube.groups['on_demand'].to_numpy()[self.groups]
+            counts = pd.Series(cube._group_named[self.groups], index=pd.Index(labels, name='on_demand'))
+            counts = counts.groupby(level=0).sum()
+        else:
+            counts = cube.products.iloc[self._product_rows].groupby('on_demand')['name'].count()
+        return counts.reindex(cube._on_demand_values, fill_value=0).rename_axis('on_demand').reset_index(name='count')
+
+    def product_stock(self):
+        products = self.cube.products.iloc[self.product_rows()]
+        return products[products['on_demand'] == 'no'][['name', 'stock']]
+
+    def analytics(self):
+        """(sales_trends, monthly_sales, monthly_seasonality, on_demand_vs_regular, product_stock) of the slice."""
+        return (self.sales_trends(), self.monthly_sales(), self.monthly_seasonality(),
+                self.on_demand_vs_regular(), self.product_stock())
+
+    def rollup(self, dimension):
+        """Total quantity of the slice per value of one dimension, as a Series."""
+        cube = self.cube
+        if dimension in ('year', 'quarter', 'month'):
+            labels = getattr(cube, dimension + 's')[self.columns]
+            return pd.Series(self.totals, index=pd.Index(labels, name=dimension)).groupby(level=0).sum()
+        if dimension == 'sku':
+            rows = self.rows()
+            block = self._block(rows)
+            totals = block.sum(axis=1, dtype=np.int64) if cube._integer else np.nansum(block, axis=1)
+            return pd.Series(totals, index=pd.Index(cube.skus[rows], name='sku'), name='quantity')
+        if dimension in ('mat_id', 'on_demand'):
+            if self._rows is None:
+                totals = cube._group_totals[np.ix_(self.groups, self.columns)].sum(axis=1)
+                labels = cube.groups[dimension].to_numpy()[self.groups]
+            else:
+                block = self._block(self._rows)
+                totals = block.sum(axis=1, dtype=np.int64) if cube._integer else np.nansum(block, axis=1)
+                labels = cube.groups[dimension].to_numpy()[cube._sku_group[self._rows]]
+            return pd.Series(totals, index=pd.Index(labels, name=dimension), name='quantity').groupby(level=0).sum()
+        raise ValueError(f"Unknown cube dimension: {dimension}")
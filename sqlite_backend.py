@@ -0,0 +1,386 @@
+"""Optional SQLite storage for inventory and catalog data.
+
+Enable it for the GUI by pointing INVENTORY_DB at a database file:
+
+    python sqlite_backend.py import --db inventory.db --data-dir .
+    INVENTORY_DB=inventory.db python main.py
+    python sqlite_backend.py export --db inventory.db --output-dir export
+
+The database runs in WAL mode, so readers never block the writer and several
+operators can edit the same inventory: every edit is a single-row
+INSERT/UPDATE/DELETE instead of a rewrite of inventory.csv.
+"""
+import argparse
+import os
+import sqlite3
+import threading
+import numpy as np
+import pandas as pd
+from inventory_journal import INVENTORY_COLUMNS, InventoryJournal, atomic_write_csv
+from sales_ingest import iter_sales_chunks, read_sales_header
+from instrumentation import traced
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS inventory (
+    id INTEGER PRIMARY KEY,
+    item_name TEXT NOT NULL UNIQUE,
+    quantity INTEGER NOT NULL,
+    reorder_level INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS products (
+    id INTEGER PRIMARY KEY,
+    sku TEXT NOT NULL,
+    name TEXT,
+    on_demand TEXT,
+    stock NUMERIC,
+    price_pp NUMERIC,
+    mat_id TEXT,
+    avg_lt NUMERIC
+);
+CREATE INDEX IF NOT EXISTS products_sku ON products (sku);
+CREATE INDEX IF NOT EXISTS products_mat_id ON products (mat_id);
+CREATE INDEX IF NOT EXISTS products_on_demand ON products (on_demand);
+CREATE TABLE IF NOT EXISTS materials (
+    id INTEGER PRIMARY KEY,
+    raw_id TEXT NOT NULL,
+    name TEXT,
+    cost_pp NUMERIC,
+    stock NUMERIC
+);
+CREATE INDEX IF NOT EXISTS materials_raw_id ON materials (raw_id);
+CREATE TABLE IF NOT EXISTS sales_items (
+    id INTEGER PRIMARY KEY,
+    sku TEXT NOT NULL,
+    name TEXT
+);
+CREATE INDEX IF NOT EXISTS sales_items_sku ON sales_items (sku);
+CREATE TABLE IF NOT EXISTS sales (
+    item_id INTEGER NOT NULL,
+    month TEXT NOT NULL,
+    quantity INTEGER,
+    PRIMARY KEY (item_id, month)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS sales_month ON sales (month, quantity);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+PRODUCT_COLUMNS = ['sku', 'name', 'on_demand', 'stock', 'price_pp', 'mat_id', 'avg_lt']
+MATERIAL_COLUMNS = ['raw_id', 'name', 'cost_pp', 'stock']
+
+# meta key recording that inventory.csv was taken over, so it is imported only once
+INVENTORY_IMPORTED = 'inventory_imported'
+
+# Sales cells inserted per executemany batch during import
+SALES_INSERT_BATCH = 100_000
+
+
+def _python_value(value):
+    # sqlite3 only binds Python scalars; NaN becomes NULL
+    if value is None or (isinstance(value, float) and value != value):
+        return None
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def _like_read_csv(df):
+    # TEXT columns come back as str; read_csv parses a column of numbers as numbers
+    for column in df.select_dtypes(include=['object', 'string']).columns:
+        try:
+            df[column] = pd.to_numeric(df[column])
+        except (ValueError, TypeError):
+            pass
+    return df
+
+
+class SQLiteBackend:
+    """Inventory, product, material and monthly sales tables in one SQLite file.
+
+    Exposes the same append/load/compact interface as InventoryJournal so
+    main.py can persist edits through either one. Each thread gets its own
+    connection.
+    """
+
+    def __init__(self, path, inventory_file='inventory.csv'):
+        self.path = path
+        self.inventory_file = inventory_file
+        self._local = threading.local()
+        # Edits go straight to the database; there is never a journal to compact
+        self.record_count = 0
+        self.needs_compaction = False
+        conn = self.connection()
+        with conn:
+            conn.executescript(SCHEMA)
+        # First use: take over the CSV inventory including any journaled edits. Later starts
+        # must not, or items deleted in the database would come back from the stale CSV.
+        conn.execute('BEGIN IMMEDIATE')
+        with conn:
+            if not self._inventory_imported(conn):
+                if self._count(conn) == 0 and os.path.exists(inventory_file):
+                    self._replace_inventory(conn, InventoryJournal(inventory_file).load())
+                self._mark_inventory_imported(conn)
+
+    def connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def close(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    # Inventory
+
+    @staticmethod
+    def _count(conn):
+        return conn.execute('SELECT COUNT(*) FROM inventory').fetchone()[0]
+
+    @staticmethod
+    def _inventory_imported(conn):
+        return conn.execute('SELECT EXISTS (SELECT 1 FROM meta WHERE key = ?)', (INVENTORY_IMPORTED,)).fetchone()[0]
+
+    @staticmethod
+    def _mark_inventory_imported(conn):
+        conn.execute('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)', (INVENTORY_IMPORTED, '1'))
+
+    def inventory_count(self):
+        return self._count(self.connection())
+
+    def get_item(self, item_name):
+        """(quantity, reorder_level) of one item via the item_name index, or None."""
+        return self.connection().execute(
+            'SELECT quantity, reorder_level FROM inventory WHERE item_name = ?', (item_name,)).fetchone()
+
+    def _apply(self, conn, op, item_name, quantity=None, reorder_level=None):
+        if op == 'add':
+            cursor = conn.execute(
+                'INSERT INTO inventory (item_name, quantity, reorder_level) VALUES (?, ?, ?) '
+                'ON CONFLICT (item_name) DO NOTHING',
+                (item_name, _python_value(quantity), _python_value(reorder_level)))
+        elif op == 'update':
+            cursor = conn.execute('UPDATE inventory SET quantity = ? WHERE item_name = ?',
+                                  (_python_value(quantity), item_name))
+        elif op == 'remove':
+            cursor = conn.execute('DELETE FROM inventory WHERE item_name = ?', (item_name,))
+        else:
+            raise ValueError(f"Unknown inventory operation: {op}")
+        return cursor.rowcount > 0
+
+    def append(self, op, item_name, quantity=None, reorder_level=None):
+        """Apply one 'add', 'update' or 'remove' edit as a single-row statement."""
+        conn = self.connection()
+        with conn:
+            return self._apply(conn, op, item_name, quantity, reorder_level)
+
+    def append_many(self, ops):
+        """Apply a batch of (op, item_name[, quantity[, reorder_level]]) edits in one transaction."""
+        conn = self.connection()
+        with conn:
+            for op in ops:
+                self._apply(conn, *op)
+
+    def upsert_item(self, item_name, quantity, reorder_level):
+        """Insert an item or overwrite its quantity and reorder level."""
+        conn = self.connection()
+        with conn:
+            conn.execute(
+                'INSERT INTO inventory (item_name, quantity, reorder_level) VALUES (?, ?, ?) '
+                'ON CONFLICT (item_name) DO UPDATE SET quantity = excluded.quantity, reorder_level = excluded.reorder_level',
+                (item_name, _python_value(quantity), _python_value(reorder_level)))
+
+    def load(self):
+        """The inventory as a DataFrame in insertion order."""
+        rows = self.connection().execute(
+            'SELECT item_name, quantity, reorder_level FROM inventory ORDER BY id').fetchall()
+        return pd.DataFrame(rows, columns=INVENTORY_COLUMNS)
+
+    @staticmethod
+    def _replace_inventory(conn, df):
+        conn.execute('DELETE FROM inventory')
+        conn.executemany('INSERT OR IGNORE INTO inventory (item_name, quantity, reorder_level) VALUES (?, ?, ?)',
+                         ((_python_value(n), _python_value(q), _python_value(r))
+                          for n, q, r in df[INVENTORY_COLUMNS].itertuples(index=False)))
+
+    def replace_inventory(self, df):
+        conn = self.connection()
+        with conn:
+            self._replace_inventory(conn, df)
+            self._mark_inventory_imported(conn)
+
+    def compact(self):
+        """Nothing to do: every edit is already a durable row, so a save never rewrites the table."""
+        return None
+
+    def maybe_compact(self):
+        return None
+
+    def wait_for_compaction(self):
+        pass
+
+    # Catalog import/export
+
+    def _replace_table(self, conn, table, columns, df):
+        conn.execute(f'DELETE FROM {table}')
+        placeholders = ', '.join('?' * len(columns))
+        conn.executemany(f'INSERT INTO {table} ({", ".join(columns)}) VALUES ({placeholders})',
+                         (tuple(_python_value(v) for v in row) for row in df[columns].itertuples(index=False)))
+
+    @traced('sqlite.import')
+    def import_csv(self, data_dir='.', replace_inventory=False):
+        """Load product_data.csv, mat_data.csv and sales_data.csv.
+
+        inventory.csv (if present) is only loaded while the inventory table is
+        empty, or with replace_inventory=True, so refreshing the catalog keeps
+        the edits made in the database.
+        """
+        conn = self.connection()
+        with conn:
+            self._replace_table(conn, 'products', PRODUCT_COLUMNS, pd.read_csv(os.path.join(data_dir, 'product_data.csv')))
+            self._replace_table(conn, 'materials', MATERIAL_COLUMNS, pd.read_csv(os.path.join(data_dir, 'mat_data.csv')))
+            conn.execute('DELETE FROM sales')
+            conn.execute('DELETE FROM sales_items')
+            sales_path = os.path.join(data_dir, 'sales_data.csv')
+            _, dates = read_sales_header(sales_path)
+            months = list(dates.strftime('%Y-%m-%d'))
+            next_id = 1
+            for skus, names, values in iter_sales_chunks(sales_path):
+                ids = range(next_id, next_id + len(skus))
+                conn.executemany('INSERT INTO sales_items (id, sku, name) VALUES (?, ?, ?)',
+                                 zip(ids, (_python_value(s) for s in skus), (_python_value(n) for n in names)))
+                rows = [(item_id, month, _python_value(value))
+                        for item_id, row in zip(ids, values.tolist()) for month, value in zip(months, row)]
+                for start in range(0, len(rows), SALES_INSERT_BATCH):
+                    conn.executemany('INSERT INTO sales (item_id, month, quantity) VALUES (?, ?, ?)',
+                                     rows[start:start + SALES_INSERT_BATCH])
+                next_id += len(skus)
+        inventory_file = os.path.join(data_dir, 'inventory.csv')
+        if os.path.exists(inventory_file) and (replace_inventory or self.inventory_count() == 0):
+            self.replace_inventory(InventoryJournal(inventory_file).load())
+        conn.execute('ANALYZE')
+
+    def has_catalog(self):
+        conn = self.connection()
+        return all(conn.execute(f'SELECT EXISTS (SELECT 1 FROM {table})').fetchone()[0]
+                   for table in ('products', 'materials', 'sales'))
+
+    def products(self):
+        return _like_read_csv(pd.read_sql_query(f'SELECT {", ".join(PRODUCT_COLUMNS)} FROM products ORDER BY id',
+                                                self.connection()))
+
+    def materials(self):
+        return _like_read_csv(pd.read_sql_query(f'SELECT {", ".join(MATERIAL_COLUMNS)} FROM materials ORDER BY id',
+                                                self.connection()))
+
+    def sales_long(self):
+        """The long (sku, name, date_sale, quantity) frame load_and_preprocess returns."""
+        df = pd.read_sql_query(
+            'SELECT i.sku, i.name, s.month AS date_sale, s.quantity FROM sales s '
+            'JOIN sales_items i ON i.id = s.item_id ORDER BY s.month, s.item_id', self.connection())
+        df['date_sale'] = pd.to_datetime(df['date_sale'], format='%Y-%m-%d')
+        return df
+
+    @traced('sqlite.sales_matrix')
+    def sales_matrix(self):
+        """(skus, dates, SKU x month matrix) of the sales, read one month at a time without a long frame.
+
+        The matrix is int64, or float64 with NaN for missing cells, like the
+        compact model's, so SalesCube and compute_material_requirements_matrix
+        take it directly.
+        """
+        conn = self.connection()
+        items = conn.execute('SELECT id, sku FROM sales_items ORDER BY id').fetchall()
+        ids = np.array([item_id for item_id, _ in items], dtype=np.int64)
+        skus = pd.Index([sku for _, sku in items], dtype=object)
+        months = [month for (month,) in conn.execute('SELECT DISTINCT month FROM sales ORDER BY month')]
+        integer = self._integer_sales(conn)
+        matrix = np.zeros((len(ids), len(months)), dtype=np.int64) if integer else np.full((len(ids), len(months)), np.nan)
+        for j, month in enumerate(months):
+            # Covered by the (month, quantity) index
+            cells = np.array(conn.execute('SELECT item_id, quantity FROM sales WHERE month = ? AND quantity IS NOT NULL',
+                                          (month,)).fetchall(), dtype=np.float64).reshape(-1, 2)
+            matrix[np.searchsorted(ids, cells[:, 0].astype(np.int64)), j] = cells[:, 1]
+        return skus, pd.to_datetime(pd.Series(months, dtype=object), format='%Y-%m-%d'), matrix
+
+    def sales_wide(self):
+        long = self.sales_long()
+        long['item'] = long.groupby(['sku', 'name'], sort=False, dropna=False).ngroup()
+        wide = long.pivot(index='item', columns='date_sale', values='quantity')
+        ids = long.drop_duplicates('item').set_index('item')[['sku', 'name']]
+        wide.columns = wide.columns.strftime('%m/%Y')
+        return ids.join(wide).reset_index(drop=True)
+
+    @traced('sqlite.export')
+    def export_csv(self, output_dir='.'):
+        """Write the four CSV files in the layout the rest of the app reads."""
+        os.makedirs(output_dir, exist_ok=True)
+        atomic_write_csv(self.products(), os.path.join(output_dir, 'product_data.csv'))
+        atomic_write_csv(self.materials(), os.path.join(output_dir, 'mat_data.csv'))
+        atomic_write_csv(self.sales_wide(), os.path.join(output_dir, 'sales_data.csv'))
+        atomic_write_csv(self.load(), os.path.join(output_dir, 'inventory.csv'))
+
+    # Analytics pushed down to SQL
+
+    @traced('sqlite.analyze_data')
+    def analyze_data(self):
+        """Same (sales_trends, monthly_sales, monthly_seasonality, on_demand_vs_regular) as analyze_data."""
+        conn = self.connection()
+        totals = conn.execute('SELECT month, COALESCE(SUM(quantity), 0) FROM sales GROUP BY month ORDER BY month').fetchall()
+        dates = pd.to_datetime(pd.Series([month for month, _ in totals], dtype=object), format='%Y-%m-%d')
+        quantity = np.array([total for _, total in totals], dtype=np.int64 if self._integer_sales(conn) else np.float64)
+        sales_trends = pd.DataFrame({'date_sale': dates, 'quantity': quantity})
+        monthly_sales = pd.DataFrame({'date_sale': dates.dt.strftime('%Y-%m'), 'quantity': quantity})
+        seasonality = conn.execute(
+            "SELECT CAST(strftime('%m', month) AS INTEGER) AS m, AVG(quantity) FROM sales GROUP BY m ORDER BY m").fetchall()
+        monthly_seasonality = pd.DataFrame(seasonality, columns=['month', 'quantity'])
+        monthly_seasonality['month'] = monthly_seasonality['month'].astype(np.int32)
+        on_demand = conn.execute(
+            'SELECT on_demand, COUNT(name) FROM products WHERE on_demand IS NOT NULL GROUP BY on_demand ORDER BY on_demand').fetchall()
+        on_demand_vs_regular = pd.DataFrame(on_demand, columns=['on_demand', 'count'])
+        return sales_trends, monthly_sales, monthly_seasonality, on_demand_vs_regular
+
+    @staticmethod
+    def _integer_sales(conn):
+        return not conn.execute('SELECT EXISTS (SELECT 1 FROM sales WHERE quantity IS NULL)').fetchone()[0]
+
+    def analyze_stock_levels(self):
+        product_stock = _like_read_csv(pd.read_sql_query(
+            "SELECT name, stock FROM products WHERE on_demand = 'no' ORDER BY id", self.connection()))
+        material_stock = _like_read_csv(pd.read_sql_query('SELECT name, stock FROM materials ORDER BY id',
+                                                          self.connection()))
+        return product_stock, material_stock
+
+    def compute_analytics(self):
+        """The six frames compute_analytics returns, computed by the database."""
+        return self.analyze_data() + self.analyze_stock_levels()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import the CSV files into SQLite or export them back.")
+    parser.add_argument('command', choices=['import', 'export'])
+    parser.add_argument('--db', default='inventory.db')
+    parser.add_argument('--data-dir', default='.', help="directory to import the CSV files from")
+    parser.add_argument('--output-dir', default='.', help="directory to export the CSV files to")
+    parser.add_argument('--replace-inventory', action='store_true',
+                        help="import: overwrite the database inventory with inventory.csv")
+    args = parser.parse_args(argv)
+
+    backend = SQLiteBackend(args.db, os.path.join(args.data_dir, 'inventory.csv'))
+    if args.command == 'import':
+        backend.import_csv(args.data_dir, args.replace_inventory)
+        print(f"Imported {args.data_dir} into {args.db}.")
+    else:
+        backend.export_csv(args.output_dir)
+        print(f"Exported {args.db} to {args.output_dir}.")
+
+
+if __name__ == "__main__":
+    main()
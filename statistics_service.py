@@ -0,0 +1,319 @@
+import hashlib
+import io
+import os
+import threading
+import numpy as np
+import pandas as pd
+from data_cache import read_csv_cached, source_signature
+from instrumentation import count, traced
+
+# Compactor size of the quantile sketches; rank error is roughly 1.7 / SKETCH_K
+SKETCH_K = 200
+# Bytes before the previous end of file that must be unchanged for an append to be read incrementally
+TAIL_CHECK_BYTES = 64 * 1024
+DESCRIBE_QUANTILES = (0.25, 0.5, 0.75)
+ID_COLUMNS = ['sku', 'name']
+
+
+class RunningStats:
+    """count/mean/std/min/max for a vector of independent keys (columns, SKUs, materials).
+
+    Batches are reduced with NumPy and merged with Chan et al.'s parallel
+    form of Welford's update, so accumulators can be updated with new
+    samples, extended with new keys, or combined into groups without
+    revisiting old data. NaNs are ignored.
+    """
+
+    def __init__(self, n_keys=0):
+        self.count = np.zeros(n_keys, dtype=np.int64)
+        self.mean = np.zeros(n_keys)
+        self.m2 = np.zeros(n_keys)
+        self.min = np.full(n_keys, np.nan)
+        self.max = np.full(n_keys, np.nan)
+
+    def __len__(self):
+        return len(self.count)
+
+    @classmethod
+    def from_values(cls, values):
+        """Accumulators for a (keys x samples) array, one key per row."""
+        values = np.asarray(values, dtype=np.float64)
+        stats = cls(values.shape[0])
+        present = ~np.isnan(values)
+        stats.count = present.sum(axis=1)
+        has = stats.count > 0
+        totals = np.where(present, values, 0).sum(axis=1)
+        stats.mean = np.divide(totals, stats.count, out=np.zeros(len(totals)), where=has)
+        stats.m2 = np.where(present, (values - stats.mean[:, None]) ** 2, 0).sum(axis=1)
+        if values.shape[1]:
+            with np.errstate(all='ignore'):
+                stats.min = np.where(has, np.fmin.reduce(values, axis=1), np.nan)
+                stats.max = np.where(has, np.fmax.reduce(values, axis=1), np.nan)
+        return stats
+
+    def merge(self, other):
+        """Fold in more samples for the same keys."""
+        n = self.count + other.count
+        delta = other.mean - self.mean
+        safe_n = np.where(n > 0, n, 1)
+        self.mean = self.mean + delta * other.count / safe_n
+        self.m2 = self.m2 + other.m2 + delta ** 2 * self.count * other.count / safe_n
+        self.count = n
+        self.min = np.fmin(self.min, other.min)
+        self.max = np.fmax(self.max, other.max)
+        return self
+
+    def update(self, values):
+        return self.merge(RunningStats.from_values(values))
+
+    def extend(self, other):
+        """Append the keys of other (e.g. rows added to a file)."""
+        for attr in ('count', 'mean', 'm2', 'min', 'max'):
+            setattr(self, attr, np.concatenate([getattr(self, attr), getattr(other, attr)]))
+        return self
+
+    def grouped(self, codes, n_groups):
+        """Combine keys into groups (codes[i] is the group of key i; negative codes are skipped)."""
+        keep = codes >= 0
+        codes = codes[keep]
+        count, mean, m2 = self.count[keep], self.mean[keep], self.m2[keep]
+        result = RunningStats(n_groups)
+        result.count = np.bincount(codes, weights=count, minlength=n_groups).astype(np.int64)
+        sums = np.bincount(codes, weights=count * mean, minlength=n_groups)
+        result.mean = np.divide(sums, result.count, out=np.zeros(n_groups), where=result.count > 0)
+        spread = count * (mean - result.mean[codes]) ** 2
+        result.m2 = np.bincount(codes, weights=m2 + spread, minlength=n_groups)
+        np.fmin.at(result.min, codes, self.min[keep])
+        np.fmax.at(result.max, codes, self.max[keep])
+        return result
+
+    @property
+    def std(self):
+        return np.sqrt(np.divide(self.m2, self.count - 1, out=np.full(len(self), np.nan), where=self.count > 1))
+
+    def to_frame(self, index):
+        return pd.DataFrame({'count': self.count, 'mean': np.where(self.count > 0, self.mean, np.nan),
+                             'std': self.std, 'min': self.min, 'max': self.max,
+                             'total': self.mean * self.count}, index=index)
+
+
+class QuantileSketch:
+    """Mergeable KLL-style quantile sketch.
+
+    Level h holds items that each stand for 2**h inputs. When a level
+    exceeds its capacity it is sorted and every other item (random offset)
+    is promoted, so memory stays O(k log(n / k)) and quantiles are accurate
+    to about 1.7 / k in rank. Batches are absorbed with NumPy sorts.
+    """
+
+    def __init__(self, k=SKETCH_K, seed=None):
+        self.k = k
+        self.n = 0
+        self.levels = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, level):
+        depth = len(self.levels) - level - 1
+        return max(int(np.ceil(self.k * (2 / 3) ** depth)), 2)
+
+    def _compress(self):
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) > self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                items = np.sort(items)
+                # An odd item out stays on this level so total weight is preserved
+                leftover, items = (items[-1:], items[:-1]) if len(items) % 2 else (items[:0], items)
+                promoted = items[self._rng.integers(2)::2]
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+                self.levels[level] = leftover
+                # Adding a level shrinks the capacity of the ones below, so start over
+                level = 0
+                continue
+            level += 1
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[~np.isnan(values)]
+        if len(values):
+            self.levels[0] = np.concatenate([self.levels[0], values])
+            self.n += len(values)
+            self._compress()
+        return self
+
+    def merge(self, other):
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.n += other.n
+        self._compress()
+        return self
+
+    def quantiles(self, qs):
+        items = np.concatenate(self.levels)
+        if len(items) == 0:
+            return np.full(len(qs), np.nan)
+        if len(self.levels) == 1:
+            # Nothing compacted yet: exact, interpolated like DataFrame.describe
+            return np.quantile(items, qs)
+        weights = np.concatenate([np.full(len(level), 2.0 ** h) for h, level in enumerate(self.levels)])
+        order = np.argsort(items, kind='stable')
+        items, cumulative = items[order], np.cumsum(weights[order])
+        # Same convention as linear-interpolation quantiles: q=0 is the min, q=1 the max
+        targets = np.asarray(qs) * (cumulative[-1] - 1) + 1
+        return items[np.minimum(np.searchsorted(cumulative, targets), len(items) - 1)]
+
+
+class TableStats:
+    """Statistics of one CSV file: per numeric column, and per row for wide (SKU x month) files."""
+
+    def __init__(self, df):
+        self.columns = list(df.columns)
+        self.numeric = [c for c in df.columns if pd.api.types.is_numeric_dtype(df[c])]
+        values = df[self.numeric].to_numpy(dtype=np.float64)
+        self.column_stats = RunningStats.from_values(values.T)
+        self.sketches = [QuantileSketch().update(values[:, j]) for j in range(len(self.numeric))]
+        self.row_stats = RunningStats.from_values(values)
+        self.row_keys = df[self.key_columns].reset_index(drop=True)
+
+    @property
+    def key_columns(self):
+        return [c for c in ID_COLUMNS if c in self.columns]
+
+    def append_rows(self, df):
+        values = df[self.numeric].to_numpy(dtype=np.float64)
+        self.column_stats.update(values.T)
+        for j, sketch in enumerate(self.sketches):
+            sketch.update(values[:, j])
+        self.row_stats.extend(RunningStats.from_values(values))
+        self.row_keys = pd.concat([self.row_keys, df[self.key_columns]], ignore_index=True)
+
+    def append_columns(self, df):
+        """Add new numeric columns (e.g. a new month) for the existing rows."""
+        new = [c for c in df.columns if c not in self.columns]
+        values = df[new].to_numpy(dtype=np.float64)
+        self.columns += new
+        self.numeric += new
+        self.column_stats.extend(RunningStats.from_values(values.T))
+        self.sketches += [QuantileSketch().update(values[:, j]) for j in range(len(new))]
+        self.row_stats.update(values)
+
+    def describe(self):
+        """Same layout as DataFrame.describe(); the quartiles come from the sketches."""
+        stats = self.column_stats
+        quantiles = np.array([sketch.quantiles(DESCRIBE_QUANTILES) for sketch in self.sketches]).reshape(-1, len(DESCRIBE_QUANTILES))
+        rows = {'count': stats.count.astype(np.float64), 'mean': np.where(stats.count > 0, stats.mean, np.nan),
+                'std': stats.std, 'min': stats.min}
+        for i, q in enumerate(DESCRIBE_QUANTILES):
+            rows[f"{q:.0%}"] = quantiles[:, i]
+        rows['max'] = stats.max
+        return pd.DataFrame(rows, index=self.numeric).T
+
+    def per_row(self):
+        """count/mean/std/min/max/total of each row across the numeric columns (per SKU for the sales file)."""
+        return pd.concat([self.row_keys, self.row_stats.to_frame(self.row_keys.index)], axis=1)
+
+
+def _tail_digest(path, size):
+    start = max(0, size - TAIL_CHECK_BYTES)
+    with open(path, 'rb') as file:
+        file.seek(start)
+        return hashlib.sha1(file.read(size - start)).hexdigest()
+
+
+class _Entry:
+    def __init__(self, path):
+        self.stats = TableStats(pd.read_csv(path))
+        self.remember(path)
+
+    def remember(self, path):
+        self.signature = source_signature(path)
+        self.tail = _tail_digest(path, self.signature['size'])
+        with open(path, 'rb') as file:
+            self.header = file.readline()
+
+
+class StatisticsService:
+    """Descriptive statistics per CSV file, cached per file version.
+
+    A file is parsed once; afterwards an unchanged file is served from the
+    cache, rows appended at the end of the file are parsed and merged on
+    their own, and new columns (a new month in sales_data.csv) are read with
+    usecols and merged. Anything else triggers a full recompute.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def table(self, path):
+        with self._lock:
+            key = os.path.abspath(path)
+            entry = self._entries.get(key)
+            if entry is None:
+                count('statistics.full')
+                entry = self._entries[key] = _Entry(path)
+            elif source_signature(path) != entry.signature:
+                if not (self._append_rows(entry, path) or self._append_columns(entry, path)):
+                    count('statistics.full')
+                    entry = self._entries[key] = _Entry(path)
+            else:
+                count('statistics.hit')
+            return entry.stats
+
+    def _append_rows(self, entry, path):
+        old_size = entry.signature['size']
+        if os.path.getsize(path) <= old_size or _tail_digest(path, old_size) != entry.tail:
+            return False
+        with open(path, 'rb') as file:
+            if file.readline() != entry.header:
+                return False
+            file.seek(old_size)
+            appended = file.read()
+        if appended.strip():
+            entry.stats.append_rows(pd.read_csv(io.BytesIO(entry.header + appended)))
+        entry.remember(path)
+        count('statistics.append_rows')
+        return True
+
+    def _append_columns(self, entry, path):
+        stats = entry.stats
+        columns = list(pd.read_csv(path, nrows=0).columns)
+        if columns[:len(stats.columns)] != stats.columns or not stats.key_columns:
+            return False
+        new = columns[len(stats.columns):]
+        df = pd.read_csv(path, usecols=stats.key_columns + new)
+        if len(df) != len(stats.row_keys) or not df[stats.key_columns].equals(stats.row_keys):
+            return False
+        stats.append_columns(df[new])
+        entry.remember(path)
+        count('statistics.append_columns')
+        return True
+
+    @traced('statistics.describe')
+    def describe(self, path):
+        return self.table(path).describe()
+
+    def per_sku(self, sales_path='sales_data.csv'):
+        return self.table(sales_path).per_row()
+
+    def per_material(self, sales_path='sales_data.csv', product_path='product_data.csv', material_path='mat_data.csv'):
+        """Monthly sales statistics of all SKUs made from each material."""
+        stats = self.table(sales_path)
+        products = read_csv_cached(product_path)
+        materials = read_csv_cached(material_path)
+        mat_ids = pd.Index(materials['raw_id'])
+        sku_materials = products.drop_duplicates('sku').set_index('sku')['mat_id']
+        codes = mat_ids.get_indexer(sku_materials.reindex(stats.row_keys['sku']).to_numpy())
+        grouped = stats.row_stats.grouped(codes, len(mat_ids))
+        frame = grouped.to_frame(mat_ids)
+        frame.insert(0, 'name', materials['name'].to_numpy())
+        frame.index.name = 'raw_id'
+        return frame.reset_index()
+
+
+# Service shared by the GUI
+statistics_service = StatisticsService()
@@ -0,0 +1,116 @@
+import queue
+import traceback
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+
+# How often the Tk thread checks for finished tasks
+POLL_INTERVAL_MS = 50
+
+
+class Task:
+    """Handle for a submitted job."""
+
+    def __init__(self, key, description, on_done, on_error):
+        self.key = key
+        self.description = description
+        self.on_done = on_done
+        self.on_error = on_error
+        self.future = None
+        self.superseded = False
+
+    def cancel(self):
+        """Drop the task: it is cancelled if not started and its result is ignored otherwise."""
+        self.superseded = True
+        if self.future is not None:
+            self.future.cancel()
+
+
+class TaskExecutor:
+    """Runs jobs on a worker thread pool and delivers results on the Tk thread.
+
+    Workers never touch Tk: finished futures are put on a queue that the Tk
+    thread drains with after(), and on_done/on_error run there. Submitting a
+    task with a key supersedes any earlier task with the same key (e.g. a
+    user quickly flipping months), so only the latest result is delivered.
+    status_callback(text, busy) is called on the Tk thread whenever the set
+    of running tasks changes.
+    """
+
+    def __init__(self, root, max_workers=2, status_callback=None, poll_interval=POLL_INTERVAL_MS):
+        self.root = root
+        self.status_callback = status_callback
+        self.poll_interval = poll_interval
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='gui-task')
+        self._finished = queue.Queue()
+        self._active = {}
+        self._pending = []
+        self._polling = False
+        self._closed = False
+
+    def submit(self, fn, *args, on_done=None, on_error=None, key=None, description=None):
+        """Run fn(*args) in the background; call on_done(result) or on_error(exc) on the Tk thread."""
+        task = Task(key, description or getattr(fn, '__name__', 'task'), on_done, on_error)
+        if key is not None:
+            previous = self._active.get(key)
+            if previous is not None:
+                previous.cancel()
+            self._active[key] = task
+        self._pending.append(task)
+        task.future = self._pool.submit(fn, *args)
+        task.future.add_done_callback(lambda future: self._finished.put(task))
+        self._update_status()
+        self._ensure_polling()
+        return task
+
+    def _ensure_polling(self):
+        if not self._polling and not self._closed:
+            self._polling = True
+            self.root.after(self.poll_interval, self._poll)
+
+    def _poll(self):
+        self._polling = False
+        while True:
+            try:
+                task = self._finished.get_nowait()
+            except queue.Empty:
+                break
+            self._deliver(task)
+        if self._pending:
+            self._ensure_polling()
+        self._update_status()
+
+    def _deliver(self, task):
+        if task in self._pending:
+            self._pending.remove(task)
+        if task.key is not None and self._active.get(task.key) is task:
+            del self._active[task.key]
+        if task.superseded:
+            return
+        try:
+            result = task.future.result()
+        except CancelledError:
+            return
+        except Exception as e:
+            if task.on_error is not None:
+                task.on_error(e)
+            else:
+                traceback.print_exception(type(e), e, e.__traceback__)
+            return
+        if task.on_done is not None:
+            task.on_done(result)
+
+    def _update_status(self):
+        if self.status_callback is None:
+            return
+        running = [task for task in self._pending if not task.superseded]
+        if not running:
+            self.status_callback("Ready", False)
+        elif len(running) == 1:
+            self.status_callback(f"Working: {running[0].description}...", True)
+        else:
+            self.status_callback(f"Working: {running[0].description} (+{len(running) - 1} more)...", True)
+
+    def shutdown(self):
+        self._closed = True
+        for task in self._pending:
+            task.cancel()
+        self._pool.shutdown(wait=False, cancel_futures=True)
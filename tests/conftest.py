@@ -0,0 +1,36 @@
+import os
+import shutil
+import sys
+import pytest
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# The modules live at the top of the repository, next to main.py
+sys.path.insert(0, REPO_DIR)
+# Figures are rendered off-screen
+os.environ.setdefault('MPLBACKEND', 'Agg')
+
+DATA_FILES = ('product_data.csv', 'mat_data.csv', 'sales_data.csv', 'inventory.csv')
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    """A copy of the sample CSV files, so tests never touch the ones in the repository."""
+    for name in DATA_FILES:
+        shutil.copy(os.path.join(REPO_DIR, name), tmp_path / name)
+    return str(tmp_path)
+
+
+@pytest.fixture(scope='session')
+def sample_dir(tmp_path_factory):
+    """A read-only copy of the sample CSV files shared by every test of the session."""
+    path = tmp_path_factory.mktemp('sample')
+    for name in DATA_FILES:
+        shutil.copy(os.path.join(REPO_DIR, name), path / name)
+    return str(path)
+
+
+@pytest.fixture(scope='session')
+def analytics(sample_dir):
+    """The six frames of data_processing.compute_analytics for the sample data."""
+    from data_processing import compute_analytics
+    return compute_analytics(sample_dir)
@@ -0,0 +1,62 @@
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from analytics_engine import SalesAggregator
+from data_processing import analyze_data, load_and_preprocess
+
+
+def assert_matches_analyze_data(aggregator, product_data, sales_data):
+    for got, expected in zip(aggregator.analyze(product_data), analyze_data(product_data, None, sales_data)):
+        pd.testing.assert_frame_equal(got, expected, check_dtype=False, check_names=False)
+
+
+@pytest.fixture
+def loaded(sample_dir):
+    product_data, _, sales_data = load_and_preprocess(sample_dir)
+    return product_data, sales_data
+
+
+def test_aggregates_match_analyze_data(loaded, sample_dir):
+    product_data, sales_data = loaded
+    assert_matches_analyze_data(SalesAggregator.from_long(sales_data), product_data, sales_data)
+    aggregator = SalesAggregator.from_sales_file(os.path.join(sample_dir, 'sales_data.csv'))
+    assert_matches_analyze_data(aggregator, product_data, sales_data)
+
+
+def test_new_month_and_corrections_match_a_full_recompute(loaded):
+    product_data, sales_data = loaded
+    aggregator = SalesAggregator.from_long(sales_data)
+    skus = aggregator.skus
+    new_month = pd.DataFrame({'sku': skus, 'name': 'x', 'date_sale': pd.Timestamp('2023-11-01'),
+                              'quantity': np.arange(len(skus))})
+    aggregator.add_month('2023-11-01', np.arange(len(skus)))
+    sales_data = pd.concat([sales_data, new_month], ignore_index=True)
+    assert_matches_analyze_data(aggregator, product_data, sales_data)
+
+    sku, date = skus[3], pd.Timestamp('2022-05-01')
+    aggregator.update_cell(sku, date, 1000)
+    sales_data.loc[(sales_data['sku'] == sku) & (sales_data['date_sale'] == date), 'quantity'] = 1000
+    assert_matches_analyze_data(aggregator, product_data, sales_data)
+    assert aggregator.sku_totals()[sku] == sales_data.loc[sales_data['sku'] == sku, 'quantity'].sum()
+
+
+def test_missing_cell_switches_to_nan_aware_sums(loaded):
+    product_data, sales_data = loaded
+    aggregator = SalesAggregator.from_long(sales_data)
+    sku, date = aggregator.skus[0], pd.Timestamp('2022-01-01')
+    aggregator.update_cell(sku, date, None)
+    sales_data = sales_data.astype({'quantity': np.float64})
+    sales_data.loc[(sales_data['sku'] == sku) & (sales_data['date_sale'] == date), 'quantity'] = np.nan
+    assert_matches_analyze_data(aggregator, product_data, sales_data)
+
+
+def test_refresh_reads_only_appended_months(sample_dir, tmp_path):
+    path = str(tmp_path / 'sales_data.csv')
+    wide = pd.read_csv(os.path.join(sample_dir, 'sales_data.csv'))
+    wide.iloc[:, :-1].to_csv(path, index=False)
+    aggregator = SalesAggregator.from_sales_file(path)
+    wide.to_csv(path, index=False)
+    assert aggregator.refresh_from_file(path) == [pd.Timestamp('2023-10-01')]
+    assert aggregator.refresh_from_file(path) == []
+    assert aggregator.sales_trends()['quantity'].iloc[-1] == wide['10/2023'].sum()
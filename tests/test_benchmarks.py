@@ -0,0 +1,48 @@
+import os
+import sys
+import pandas as pd
+from conftest import REPO_DIR
+from data_processing import compute_analytics
+
+sys.path.insert(0, os.path.join(REPO_DIR, 'benchmarks'))
+from generate_data import generate_dataset  # noqa: E402
+from run_benchmarks import benchmark_inventory, compare, parse_scale  # noqa: E402
+
+
+def test_generated_data_has_the_sample_layout(tmp_path):
+    spec = generate_dataset(str(tmp_path), n_skus=300, n_months=7, seed=1)
+    assert spec['materials'] == 3
+    for name in ('product_data.csv', 'mat_data.csv', 'sales_data.csv', 'inventory.csv'):
+        assert list(pd.read_csv(tmp_path / name, nrows=0).columns)[:2] == \
+            list(pd.read_csv(os.path.join(REPO_DIR, name), nrows=0).columns)[:2]
+    sales = pd.read_csv(tmp_path / 'sales_data.csv')
+    assert sales.shape == (300, 2 + 7)
+    assert sales.columns[-1] == '10/2023'
+    sales_trends, *_ = compute_analytics(str(tmp_path))
+    assert len(sales_trends) == 7
+
+
+def test_generation_is_reproducible(tmp_path):
+    generate_dataset(str(tmp_path / 'a'), n_skus=50, n_months=3, seed=5)
+    generate_dataset(str(tmp_path / 'b'), n_skus=50, n_months=3, seed=5)
+    for name in ('product_data.csv', 'sales_data.csv', 'inventory.csv'):
+        assert (tmp_path / 'a' / name).read_bytes() == (tmp_path / 'b' / name).read_bytes()
+
+
+def test_inventory_stages_run_on_generated_data(tmp_path, monkeypatch):
+    data_dir, cwd = tmp_path / 'data', tmp_path / 'cwd'
+    cwd.mkdir()
+    monkeypatch.chdir(cwd)
+    generate_dataset(str(data_dir), n_skus=200, n_months=3)
+    stages = benchmark_inventory(str(data_dir), repeat=2, n_ops=50)
+    assert stages['inventory_add']['operations'] == 50
+    assert stages['reconcile_apply']['best'] > 0
+    # The journal and its lock files stay in the generated directory
+    assert list(cwd.iterdir()) == []
+
+
+def test_compare_flags_only_slower_stages():
+    baseline = {"runs": [{"scale": "10x2", "stages": {"load": {"best": 1.0}, "plot": {"best": 1.0}}}]}
+    results = {"runs": [{"scale": "10x2", "stages": {"load": {"best": 1.5}, "plot": {"best": 1.1}}}]}
+    assert compare(results, baseline, tolerance=1.25) == [("10x2", "load", 1.0, 1.5)]
+    assert parse_scale('1000x24') == (1000, 24)
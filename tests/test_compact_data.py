@@ -0,0 +1,79 @@
+import os
+import shutil
+import numpy as np
+import pandas as pd
+import pytest
+import compact_data
+import data_cache
+from compact_data import compact_frame, load_compact_sales, matrix_paths, narrow_dtype, widen_frame
+from data_cache import source_signature
+from data_processing import analyze_data, compute_analytics, load_and_preprocess
+
+
+@pytest.fixture
+def sales_path(sample_dir, tmp_path):
+    path = str(tmp_path / 'sales_data.csv')
+    shutil.copy(os.path.join(sample_dir, 'sales_data.csv'), path)
+    compact_data.clear_cache()
+    data_cache.clear_cache()
+    yield path
+    compact_data.clear_cache()
+
+
+def test_matrix_is_a_narrow_read_only_memory_map(sales_path):
+    sales = load_compact_sales(sales_path)
+    assert isinstance(sales.matrix, np.memmap)
+    assert sales.matrix.dtype == np.int32 and not sales.matrix.flags.writeable
+    wide = pd.read_csv(sales_path)
+    assert list(sales.skus) == list(wide['sku'])
+    assert (np.asarray(sales.matrix) == wide.drop(columns=['sku', 'name']).to_numpy()).all()
+
+
+def test_a_new_process_maps_the_file_instead_of_parsing(sales_path, monkeypatch):
+    first = load_compact_sales(sales_path)
+    compact_data.clear_cache()
+    monkeypatch.setattr(compact_data, 'load_sales_matrix', lambda *args: pytest.fail("the CSV was parsed again"))
+    again = load_compact_sales(sales_path)
+    assert again is not first
+    assert (np.asarray(again.matrix) == np.asarray(first.matrix)).all()
+
+
+def test_changed_file_gets_a_new_matrix_file(sales_path):
+    old_file = matrix_paths(sales_path, source_signature(sales_path))[0]
+    load_compact_sales(sales_path)
+    wide = pd.read_csv(sales_path)
+    wide['11/2023'] = 7
+    wide.to_csv(sales_path, index=False)
+    sales = load_compact_sales(sales_path)
+    assert sales.matrix.shape[1] == wide.shape[1] - 2
+    assert not os.path.exists(old_file)
+
+
+def test_to_long_and_analyze_match_the_long_pipeline(sample_dir):
+    product_data, mat_data, sales_data = load_and_preprocess(sample_dir)
+    _, _, sales = compact_data.load_compact(sample_dir)
+    long = sales.to_long()
+    assert isinstance(long['sku'].dtype, pd.CategoricalDtype)
+    pd.testing.assert_frame_equal(long.astype({'sku': object, 'name': object}), sales_data,
+                                  check_dtype=False)
+    # Same values and dtypes either way: the narrowing does not leak out of compute_analytics
+    for got, expected in zip(compute_analytics(sample_dir, compact=True), compute_analytics(sample_dir)):
+        pd.testing.assert_frame_equal(got.reset_index(drop=True), expected.reset_index(drop=True))
+    expected = analyze_data(product_data, mat_data, sales_data)
+    for got, want in zip(sales.analyze(product_data), expected):
+        pd.testing.assert_frame_equal(got, want, check_dtype=False, check_names=False)
+
+
+def test_narrowing():
+    assert narrow_dtype(np.array([1, 2**40])) == np.int64
+    assert narrow_dtype(np.array([1, 2])) == np.int32
+    assert narrow_dtype(np.array([1.5])) == np.float64
+    frame = compact_frame(pd.DataFrame({'kind': ['a', 'b'] * 5, 'id': [str(i) for i in range(10)],
+                                        'stock': np.arange(10, dtype=np.int64)}))
+    assert isinstance(frame['kind'].dtype, pd.CategoricalDtype)
+    assert not isinstance(frame['id'].dtype, pd.CategoricalDtype)
+    assert frame['stock'].dtype == np.int8
+    widened = widen_frame(frame)
+    assert widened['kind'].tolist() == ['a', 'b'] * 5
+    assert not isinstance(widened['kind'].dtype, pd.CategoricalDtype)
+    assert widened['stock'].dtype == np.int64
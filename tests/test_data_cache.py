@@ -0,0 +1,60 @@
+import os
+import numpy as np
+import pandas as pd
+import pytest
+import data_cache
+from data_cache import cache_path, cached_frame, read_columnar, read_csv_cached, source_signature, write_columnar
+
+
+@pytest.fixture(autouse=True)
+def empty_memory_cache():
+    data_cache.clear_cache()
+    yield
+    data_cache.clear_cache()
+
+
+def test_columnar_round_trip_keeps_dtypes_and_missing_values(tmp_path):
+    source = tmp_path / 'frame.csv'
+    source.write_text('x')
+    df = pd.DataFrame({'name': ['a', None, 'c'], 'qty': np.array([1, 2, 3], dtype=np.int16),
+                       'price': [1.5, np.nan, 3.0], 'when': pd.to_datetime(['2020-01-01', '2020-02-01', '2020-03-01'])})
+    path = str(tmp_path / 'frame.npz')
+    write_columnar(df, path, source_signature(str(source)))
+    loaded = read_columnar(path, source_signature(str(source)))
+    pd.testing.assert_frame_equal(loaded, df)
+
+
+def test_changed_source_invalidates_the_cache(tmp_path):
+    source = tmp_path / 'data.csv'
+    source.write_text('a,b\n1,2\n')
+    calls = []
+    def loader(path):
+        calls.append(path)
+        return pd.read_csv(path)
+
+    assert cached_frame(str(source), 'test', loader)['b'].tolist() == [2]
+    data_cache.clear_cache()
+    # A fresh process reads the binary cache instead of parsing
+    assert cached_frame(str(source), 'test', loader)['b'].tolist() == [2]
+    assert len(calls) == 1
+    assert os.path.exists(cache_path(str(source), 'test'))
+
+    source.write_text('a,b\n1,2\n3,4\n')
+    assert cached_frame(str(source), 'test', loader)['b'].tolist() == [2, 4]
+    assert len(calls) == 2
+
+
+def test_callers_get_a_copy(tmp_path):
+    source = tmp_path / 'data.csv'
+    source.write_text('a\n1\n')
+    first = read_csv_cached(str(source))
+    first.loc[0, 'a'] = 99
+    assert read_csv_cached(str(source))['a'].tolist() == [1]
+
+
+def test_sample_files_match_pandas(sample_dir):
+    for name in ('product_data.csv', 'mat_data.csv', 'sales_data.csv'):
+        path = os.path.join(sample_dir, name)
+        read_csv_cached(path)
+        data_cache.clear_cache()
+        pd.testing.assert_frame_equal(read_csv_cached(path), pd.read_csv(path))
@@ -0,0 +1,61 @@
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from data_processing import load_and_preprocess
+from forecasting import SalesForecaster, design_matrix, forecast_cached
+
+
+def test_batched_fit_matches_a_per_sku_fit():
+    rng = np.random.default_rng(0)
+    dates = pd.date_range('2022-01-01', periods=12, freq='MS')
+    matrix = rng.integers(0, 100, size=(5, 12)).astype(float)
+    forecast = SalesForecaster(['a', 'b', 'c', 'd', 'e'], dates, matrix).forecast(horizon=3)
+    X = design_matrix(dates, dates[0])
+    Xf = design_matrix(forecast.dates, dates[0])
+    for i in range(5):
+        coef = np.linalg.lstsq(X, matrix[i], rcond=None)[0]
+        np.testing.assert_allclose(forecast.mean[i], Xf @ coef)
+    assert list(forecast.dates) == list(pd.date_range('2023-01-01', periods=3, freq='MS'))
+
+
+def test_noise_free_trend_and_seasonality_are_recovered():
+    dates = pd.date_range('2020-01-01', periods=36, freq='MS')
+    season = np.array([0, 5, 10, 0, 0, 20, 0, 0, 0, 0, 0, 30], dtype=float)
+    def demand(when):
+        months = (when.year - 2020) * 12 + when.month - 1
+        return 50 + 2 * np.asarray(months, dtype=float) + season[when.month - 1]
+    forecast = SalesForecaster(['sku'], dates, demand(dates)[None, :]).forecast(horizon=12)
+    np.testing.assert_allclose(forecast.mean[0], demand(forecast.dates), atol=1e-6)
+    np.testing.assert_allclose(forecast.stderr, 0, atol=1e-6)
+
+
+def test_missing_months_are_filled_with_the_sku_mean():
+    dates = pd.date_range('2023-01-01', periods=4, freq='MS')
+    forecaster = SalesForecaster(['a'], dates, np.array([[10, np.nan, 10, 10]]))
+    np.testing.assert_allclose(forecaster.matrix, [[10, 10, 10, 10]])
+    frame = forecaster.forecast(horizon=2).for_sku('a')
+    np.testing.assert_allclose(frame['forecast'], 10)
+    assert (frame['lower'] <= frame['forecast']).all() and (frame['upper'] >= frame['forecast']).all()
+
+
+def test_long_frame_and_sales_file_agree(sample_dir):
+    _, _, sales_data = load_and_preprocess(sample_dir)
+    from_long = SalesForecaster.from_long(sales_data).forecast()
+    from_file = SalesForecaster.from_sales_file(os.path.join(sample_dir, 'sales_data.csv')).forecast()
+    np.testing.assert_allclose(from_long.mean, from_file.mean)
+    frame = from_file.to_frame()
+    assert len(frame) == len(from_file.skus) * 6 and (frame['forecast'] >= 0).all()
+    assert from_file.totals().sum() == pytest.approx(frame['forecast'].sum())
+
+
+def test_forecasts_are_cached_per_data_version():
+    dates = pd.date_range('2023-01-01', periods=6, freq='MS')
+    builds = []
+    def build():
+        builds.append(1)
+        return SalesForecaster(['a'], dates, np.ones((1, 6)))
+    first = forecast_cached(('test', 1), build)
+    assert forecast_cached(('test', 1), build) is first
+    forecast_cached(('test', 2), build)
+    assert len(builds) == 2
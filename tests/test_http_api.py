@@ -0,0 +1,119 @@
+import asyncio
+import json
+import os
+import pandas as pd
+import pytest
+from http_api import HttpError, InventoryApi
+from inventory_journal import InventoryJournal
+
+
+def read_request(data):
+    async def run():
+        reader = asyncio.StreamReader()
+        reader.feed_data(data)
+        reader.feed_eof()
+        api = InventoryApi()
+        try:
+            return await api._read_request(reader)
+        finally:
+            api._executor.shutdown()
+    return asyncio.run(run())
+
+
+def test_request_with_json_body():
+    body = b'{"quantity": 3}'
+    request = read_request(b'PUT /inventory/Item%20A?x=1 HTTP/1.1\r\nContent-Length: 15\r\n\r\n' + body)
+    assert request == ('PUT', '/inventory/Item%20A', {'x': ['1']}, {'quantity': 3}, True)
+
+
+@pytest.mark.parametrize('length', [b'abc', b'-1', b'1.5'])
+def test_bad_content_length_is_a_client_error(length):
+    with pytest.raises(HttpError) as error:
+        read_request(b'POST /inventory HTTP/1.1\r\nContent-Length: ' + length + b'\r\n\r\n{}')
+    assert error.value.status == 400
+
+
+def test_oversized_body_is_rejected():
+    with pytest.raises(HttpError) as error:
+        read_request(b'POST /inventory HTTP/1.1\r\nContent-Length: 99999999\r\n\r\n')
+    assert error.value.status == 413
+
+
+async def call(host, port, method, path, body=None):
+    reader, writer = await asyncio.open_connection(host, port)
+    payload = json.dumps(body).encode() if body is not None else b''
+    writer.write(f'{method} {path} HTTP/1.1\r\nConnection: close\r\nContent-Length: {len(payload)}\r\n\r\n'.encode()
+                 + payload)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, content = response.partition(b'\r\n\r\n')
+    status = int(head.split()[1])
+    if head.count(b'application/json'):
+        return status, json.loads(content)
+    return status, content
+
+
+def run_api(data_dir, scenario):
+    async def run():
+        api = InventoryApi(data_dir, workers=2)
+        host, port = await api.start('127.0.0.1', 0)
+        try:
+            return await scenario(lambda *args: call(host, port, *args))
+        finally:
+            await api.close()
+    return asyncio.run(run())
+
+
+def test_inventory_crud_uses_the_data_dir(data_dir):
+    async def scenario(request):
+        assert await request('POST', '/inventory', {'item_name': 'Widget', 'quantity': 4, 'reorder_level': 1}) == \
+            (201, {'item_name': 'Widget', 'quantity': 4, 'reorder_level': 1})
+        assert (await request('POST', '/inventory', {'item_name': 'Widget', 'quantity': 4, 'reorder_level': 1}))[0] == 409
+        assert await request('PUT', '/inventory/Widget', {'quantity': 9}) == \
+            (200, {'item_name': 'Widget', 'quantity': 9, 'reorder_level': 1})
+        assert (await request('PUT', '/inventory/Widget', {'quantity': -1}))[0] == 400
+        assert (await request('GET', '/inventory/Nothing'))[0] == 404
+        status, items = await request('GET', '/inventory')
+        assert status == 200 and items[-1] == {'item_name': 'Widget', 'quantity': 9, 'reorder_level': 1}
+        assert (await request('DELETE', '/inventory/27-033-1026406'))[0] == 204
+        return await request('GET', '/inventory')
+
+    before = pd.read_csv(os.path.join(data_dir, 'inventory.csv'))
+    _, items = run_api(data_dir, scenario)
+    assert len(items) == len(before)
+    # The edits went to the inventory in data_dir, not to the one in the working directory
+    after = InventoryJournal(os.path.join(data_dir, 'inventory.csv')).load()
+    assert 'Widget' in set(after['Item Name']) and '27-033-1026406' not in set(after['Item Name'])
+
+
+def test_failed_journal_writes_leave_the_store_unchanged(data_dir, monkeypatch):
+    def fail(*args):
+        raise OSError("disk full")
+    monkeypatch.setattr(InventoryJournal, 'append', fail)
+
+    async def scenario(request):
+        assert (await request('POST', '/inventory', {'item_name': 'Widget', 'quantity': 4, 'reorder_level': 1}))[0] == 500
+        assert (await request('GET', '/inventory/Widget'))[0] == 404
+        before = await request('GET', '/inventory/27-033-1026406')
+        assert (await request('PUT', '/inventory/27-033-1026406', {'quantity': 999}))[0] == 500
+        assert (await request('DELETE', '/inventory/27-033-1026406'))[0] == 500
+        assert await request('GET', '/inventory/27-033-1026406') == before
+    run_api(data_dir, scenario)
+
+
+def test_analytics_and_figures(data_dir):
+    async def scenario(request):
+        sales = await request('GET', '/analytics/sales')
+        stock = await request('GET', '/analytics/stock')
+        figure = await request('GET', '/figures/sales_trends.png?month=3')
+        bad_month = await request('GET', '/figures/sales_trends.png?month=13')
+        unknown = await request('GET', '/figures/nothing.png')
+        return sales, stock, figure, bad_month, unknown
+
+    sales, stock, figure, bad_month, unknown = run_api(data_dir, scenario)
+    assert sales[0] == 200 and set(sales[1]) == {'sales_trends', 'monthly_sales', 'monthly_seasonality',
+                                                 'on_demand_vs_regular'}
+    assert stock[0] == 200 and set(stock[1]) == {'product_stock', 'material_stock'}
+    assert figure[0] == 200 and figure[1].startswith(b'\x89PNG')
+    assert bad_month[0] == 400 and unknown[0] == 404
@@ -0,0 +1,13 @@
+import os
+import sys
+import pytest
+from conftest import REPO_DIR
+
+sys.path.insert(0, os.path.join(REPO_DIR, 'benchmarks'))
+from import_time import IMPORT_CHECKS, check_module  # noqa: E402
+
+
+@pytest.mark.parametrize('module', sorted(IMPORT_CHECKS))
+def test_module_does_not_import_its_heavy_dependencies(module):
+    # Timing is left to benchmarks/import_time.py; only the imported packages are checked here
+    assert check_module(module, IMPORT_CHECKS[module], repeat=1)['forbidden_loaded'] == []
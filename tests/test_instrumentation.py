@@ -0,0 +1,73 @@
+import json
+import pytest
+import instrumentation
+from instrumentation import configure, count, counters, disable, last_operation, operation, span, traced
+
+
+@pytest.fixture
+def trace(tmp_path):
+    path = tmp_path / 'trace.jsonl'
+    configure(trace_file=str(path))
+    yield path
+    disable()
+
+
+def records(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_disabled_spans_are_a_shared_no_op():
+    assert not instrumentation.is_enabled()
+    assert span('a') is span('b')
+    count('ignored')
+    assert 'ignored' not in counters()
+
+
+def test_spans_are_written_with_their_parent_and_fields(trace):
+    @traced('outer')
+    def outer():
+        with span('inner', rows=3) as inner:
+            inner.set(hits=1)
+
+    outer()
+    disable()
+    inner, outer_record = records(trace)[:2]
+    assert inner['name'] == 'inner' and inner['parent'] == 'outer'
+    assert inner['rows'] == 3 and inner['hits'] == 1
+    assert outer_record['name'] == 'outer' and outer_record['ms'] >= inner['ms']
+
+
+def test_errors_are_recorded_and_reraised(trace):
+    with pytest.raises(KeyError):
+        with span('failing'):
+            raise KeyError('x')
+    disable()
+    assert records(trace)[0]['error'] == 'KeyError'
+
+
+def test_counters_are_flushed_to_the_trace(trace):
+    count('cache.hit')
+    count('cache.hit', 2)
+    assert counters()['cache.hit'] == 3
+    disable()
+    assert records(trace)[-1]['counters']['cache.hit'] == 3
+
+
+def test_operations_are_timed_even_when_disabled():
+    with operation('Update Plots'):
+        pass
+    name, ms = last_operation()
+    assert name == 'Update Plots' and ms >= 0
+
+
+def test_profiled_spans_write_a_profile(tmp_path):
+    configure(profile='slow', profile_dir=str(tmp_path / 'profiles'))
+    try:
+        with span('slow'):
+            sum(range(1000))
+        with span('fast'):
+            pass
+    finally:
+        disable()
+    files = list((tmp_path / 'profiles').iterdir())
+    assert len(files) == 1 and files[0].name.startswith('slow-')
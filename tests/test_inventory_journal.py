@@ -0,0 +1,140 @@
+import os
+import random
+import stat
+import subprocess
+import sys
+import pandas as pd
+import pytest
+from inventory_journal import INVENTORY_COLUMNS, InventoryJournal, atomic_write_csv
+
+
+@pytest.fixture
+def inventory_file(tmp_path):
+    path = tmp_path / 'inventory.csv'
+    pd.DataFrame([['Item A', 100, 20], ['Item B', 50, 10]], columns=INVENTORY_COLUMNS).to_csv(path, index=False)
+    return str(path)
+
+
+def rows(df):
+    return [tuple(row) for row in df[INVENTORY_COLUMNS].itertuples(index=False)]
+
+
+def test_load_replays_appended_edits(inventory_file):
+    journal = InventoryJournal(inventory_file)
+    journal.append('add', 'Item C', 5, 1)
+    journal.append('update', 'Item A', 90)
+    journal.append_many([('remove', 'Item B'), ('add', 'Item D', 3, 0)])
+    assert journal.record_count == 4
+    assert rows(InventoryJournal(inventory_file).load()) == [('Item A', 90, 20), ('Item C', 5, 1), ('Item D', 3, 0)]
+
+
+def test_torn_final_line_is_dropped(inventory_file):
+    journal = InventoryJournal(inventory_file)
+    journal.append('update', 'Item A', 1)
+    with open(journal.path, 'a', encoding='utf-8') as file:
+        file.write('{"op": "update", "item": "Item B", "q')
+    reopened = InventoryJournal(inventory_file)
+    assert reopened.record_count == 1
+    reopened.append('update', 'Item B', 2)
+    assert rows(reopened.load()) == [('Item A', 1, 20), ('Item B', 2, 10)]
+
+
+def test_compact_writes_snapshot_and_drops_journal(inventory_file):
+    journal = InventoryJournal(inventory_file)
+    journal.append('update', 'Item A', 7)
+    journal.compact()
+    assert not os.path.exists(journal.path)
+    assert journal.record_count == 0
+    assert rows(pd.read_csv(inventory_file)) == [('Item A', 7, 20), ('Item B', 50, 10)]
+
+
+def test_background_compaction_keeps_edits_made_meanwhile(inventory_file):
+    journal = InventoryJournal(inventory_file, compact_threshold=2)
+    journal.append('update', 'Item A', 1)
+    journal.append('update', 'Item B', 2)
+    assert journal.needs_compaction
+    journal.maybe_compact()
+    journal.append('add', 'Item C', 3, 0)
+    journal.wait_for_compaction()
+    assert not os.path.exists(journal.compacting_path)
+    assert rows(InventoryJournal(inventory_file).load()) == [('Item A', 1, 20), ('Item B', 2, 10), ('Item C', 3, 0)]
+
+
+@pytest.mark.skipif(os.name != 'posix', reason="POSIX permission bits")
+def test_atomic_write_keeps_file_mode(tmp_path):
+    path = str(tmp_path / 'inventory.csv')
+    df = pd.DataFrame([['Item A', 1, 0]], columns=INVENTORY_COLUMNS)
+    atomic_write_csv(df, path)
+    umask = os.umask(0)
+    os.umask(umask)
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o666 & ~umask
+    os.chmod(path, 0o640)
+    atomic_write_csv(df, path)
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o640
+
+
+def test_compaction_keeps_edits_journaled_by_another_process(inventory_file):
+    # Two journals on one file stand in for the GUI and the HTTP API
+    gui, api = InventoryJournal(inventory_file), InventoryJournal(inventory_file)
+    api.append('add', 'Item C', 3, 1)
+    gui.append('update', 'Item A', 5)
+    gui.compact()
+    api.append('remove', 'Item B')
+    api.compact()
+    assert rows(pd.read_csv(inventory_file)) == [('Item A', 5, 20), ('Item C', 3, 1)]
+
+
+APPEND_SCRIPT = """
+import sys
+sys.path.insert(0, {repo!r})
+from inventory_journal import InventoryJournal
+journal = InventoryJournal({path!r}, compact_threshold=20)
+for i in range({count}):
+    journal.append('add', f'P{worker}-{{i}}', i, 0)
+    if journal.needs_compaction:
+        journal.maybe_compact()
+journal.compact()
+"""
+
+
+def test_concurrent_processes_lose_no_edits(inventory_file):
+    repo = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    workers = [subprocess.Popen([sys.executable, '-c', APPEND_SCRIPT.format(repo=repo, path=inventory_file,
+                                                                             count=100, worker=worker)])
+               for worker in range(3)]
+    assert [worker.wait(timeout=120) for worker in workers] == [0, 0, 0]
+    names = set(pd.read_csv(inventory_file)['Item Name'])
+    assert {f'P{worker}-{i}' for worker in range(3) for i in range(100)} <= names
+    assert not os.path.exists(inventory_file + '.journal.compacting')
+
+
+def replay_one_by_one(df, records):
+    items = {}
+    for name, quantity, reorder in df.itertuples(index=False):
+        items.setdefault(name, [quantity, reorder])
+    for op, name, *values in records:
+        if op == 'add' and name not in items:
+            items[name] = list(values)
+        elif op == 'update' and name in items:
+            items[name][0] = values[0]
+        elif op == 'remove':
+            items.pop(name, None)
+    return [(name, quantity, reorder) for name, (quantity, reorder) in items.items()]
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_replay_matches_applying_records_one_by_one(tmp_path, seed):
+    rng = random.Random(seed)
+    path = str(tmp_path / 'inventory.csv')
+    df = pd.DataFrame([[f'I{i}', i, i % 7] for i in range(30)], columns=INVENTORY_COLUMNS)
+    df.to_csv(path, index=False)
+    journal = InventoryJournal(path)
+    records = []
+    for _ in range(200):
+        name = f'I{rng.randrange(40)}'
+        op = rng.choice(['add', 'update', 'remove'])
+        record = (op, name, rng.randrange(100), rng.randrange(10)) if op == 'add' else \
+            (op, name, rng.randrange(100)) if op == 'update' else (op, name)
+        records.append(record)
+    journal.append_many(records)
+    assert rows(journal.load()) == replay_one_by_one(df, records)
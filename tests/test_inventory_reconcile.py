@@ -0,0 +1,128 @@
+import os
+from types import SimpleNamespace
+import pandas as pd
+import pytest
+import main
+from inventory_journal import InventoryJournal
+from inventory_reconcile import apply_plan, main as reconcile_main, plan_reconcile
+from inventory_search import InventorySearchIndex
+from inventory_store import InventoryStore
+from sqlite_backend import SQLiteBackend
+
+
+def make_store(rows):
+    return InventoryStore.from_frame(pd.DataFrame(rows, columns=['Item Name', 'Quantity', 'Reorder Level']))
+
+
+def test_merge_adds_and_updates_listed_items_only():
+    store = make_store([('A', 1, 5), ('B', 2, 0), ('C', 3, 0)])
+    incoming = pd.DataFrame({'Item Name': ['A', 'B', 'D'], 'Quantity': [1, 7, 4], 'Reorder Level': [9, 9, 9]})
+    plan = plan_reconcile(store, incoming, mode='merge')
+    assert plan.summary() == {'inserts': 1, 'updates': 1, 'deletes': 0, 'unchanged': 1, 'errors': 0}
+    assert sorted(plan.ops()) == [('add', 'D', 4, 9), ('update', 'B', 7)]
+
+
+def test_replace_removes_unlisted_items_but_keeps_rejected_ones():
+    store = make_store([('A', 1, 5), ('B', 2, 0), ('C', 3, 0)])
+    incoming = pd.DataFrame({'Item Name': ['A', 'B', ''], 'Quantity': ['1', 'x', '2']})
+    plan = plan_reconcile(store, incoming, mode='replace')
+    assert list(plan.errors['line']) == [3, 4]
+    # B is named by a rejected row, so only C goes
+    assert list(plan.deletes['Item Name']) == ['C']
+    assert plan.ops() == [('remove', 'C')]
+
+
+def test_applied_plan_matches_the_reloaded_journal(data_dir):
+    journal = InventoryJournal(os.path.join(data_dir, 'inventory.csv'))
+    store = InventoryStore.from_frame(journal.load())
+    product_data = pd.read_csv(os.path.join(data_dir, 'product_data.csv'))
+    plan = plan_reconcile(store, product_data, mode='replace')
+    applied = apply_plan(store, journal, plan)
+    assert len(applied) == len(plan)
+    reloaded = InventoryJournal(journal.inventory_file).load()
+    pd.testing.assert_frame_equal(reloaded, store.to_frame(), check_dtype=False)
+
+
+def test_cli_edits_the_sqlite_inventory_when_inventory_db_is_set(data_dir, monkeypatch):
+    inventory_file = os.path.join(data_dir, 'inventory.csv')
+    db_path = os.path.join(data_dir, 'inventory.db')
+    before = open(inventory_file).read()
+    incoming = os.path.join(data_dir, 'stock_count.csv')
+    pd.DataFrame({'Item Name': ['New Item'], 'Quantity': [12]}).to_csv(incoming, index=False)
+    monkeypatch.setenv('INVENTORY_DB', db_path)
+    assert reconcile_main([incoming, '--inventory', inventory_file]) == 0
+    assert open(inventory_file).read() == before
+    assert not os.path.exists(inventory_file + '.journal')
+    backend = SQLiteBackend(db_path, inventory_file)
+    assert backend.get_item('New Item') == (12, 0)
+    backend.close()
+
+
+class FakeInventoryList:
+    """Just enough of SearchableInventoryList for main.install_inventory."""
+
+    def __init__(self, store):
+        self.store = store
+        self.index = InventorySearchIndex(store)
+
+    def winfo_exists(self):
+        return True
+
+    def set_store(self, store, index=None):
+        self.store, self.index = store, index
+
+
+@pytest.fixture
+def gui(data_dir, monkeypatch):
+    # Tasks run inline without a TaskExecutor; dialogs are answered with yes and recorded
+    shown = []
+    monkeypatch.setattr(main, 'messagebox', SimpleNamespace(
+        askyesno=lambda title, text: shown.append(text) or True,
+        showinfo=lambda title, text: shown.append(text),
+        showwarning=lambda title, text: shown.append(text),
+        showerror=lambda title, text: pytest.fail(text)))
+    journal = InventoryJournal(os.path.join(data_dir, 'inventory.csv'))
+    monkeypatch.setattr(main, 'inventory_journal', journal)
+    monkeypatch.setattr(main, 'inventory_data', InventoryStore.from_frame(journal.load()), raising=False)
+    monkeypatch.setattr(main, 'reorder_alerts', None)
+    return SimpleNamespace(journal=journal, shown=shown, listbox=FakeInventoryList(main.inventory_data))
+
+
+def test_reconcile_swaps_in_the_planned_store(gui):
+    incoming = pd.DataFrame({'Item Name': ['Widget'], 'Quantity': [3]})
+    main.reconcile_inventory(gui.listbox, incoming, 'merge', "Import", "Comparing")
+    assert gui.listbox.store is main.inventory_data
+    assert gui.listbox.index.store is main.inventory_data
+    assert main.inventory_data.get('Widget') == (3, 0)
+    assert main.reorder_alerts.store is main.inventory_data
+    assert not main.reconcile_running
+    assert InventoryJournal(gui.journal.inventory_file).load().equals(main.inventory_data.to_frame())
+
+
+def test_rejected_rows_are_reported_next_to_the_inventory_file(gui):
+    incoming = pd.DataFrame({'Item Name': ['Widget', ''], 'Quantity': [3, 1]})
+    main.reconcile_inventory(gui.listbox, incoming, 'merge', "Import", "Comparing")
+    report = gui.journal.inventory_file + '.import_errors.csv'
+    assert list(pd.read_csv(report)['line']) == [3]
+    assert any(report in text for text in gui.shown)
+
+
+def test_edits_made_while_planning_are_not_overwritten(gui):
+    comparisons = []
+    def incoming():
+        # Runs inside the comparison; the first time, simulate an edit made meanwhile in the panel
+        if not comparisons:
+            main.inventory_data.add('Edited Meanwhile', 1, 0)
+        comparisons.append(len(main.inventory_data))
+        return pd.DataFrame({'Item Name': ['Widget'], 'Quantity': [3]})
+
+    main.reconcile_inventory(gui.listbox, incoming, 'merge', "Import", "Comparing")
+    assert len(comparisons) == 2
+    assert main.inventory_data.get('Edited Meanwhile') == (1, 0)
+    assert main.inventory_data.get('Widget') == (3, 0)
+
+
+def test_edits_are_refused_while_a_plan_is_applied(gui, monkeypatch):
+    monkeypatch.setattr(main, 'reconcile_running', True)
+    assert main.inventory_busy("Add the item")
+    assert "being applied" in gui.shown[-1]
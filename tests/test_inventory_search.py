@@ -0,0 +1,85 @@
+import numpy as np
+import pytest
+from inventory_search import InventorySearchIndex
+from inventory_store import InventoryStore
+
+
+def make_store(n):
+    store = InventoryStore()
+    for i in range(n):
+        store.add(f'item{i}', i, 5)
+    return store
+
+
+def names_at(store, positions):
+    return [store.row_at(pos)[0] for pos in positions]
+
+
+def test_prefix_and_substring_search_cover_product_names():
+    store = InventoryStore()
+    store.add('SKU-001', 1, 0)
+    store.add('SKU-002', 2, 0)
+    store.add('bolt', 3, 0)
+    index = InventorySearchIndex(store, product_names={'SKU-001': 'Red Chair', 'SKU-002': 'Blue Table'})
+    assert index.search('chair') == ['SKU-001']
+    assert index.search('sku') == ['SKU-001', 'SKU-002']
+    assert index.search('b') == ['SKU-002', 'bolt']
+    assert index.prefix_search('blue') == ['SKU-002']
+    assert index.search('') == ['SKU-001', 'SKU-002', 'bolt']
+    assert index.search('nothing') == []
+
+
+def test_single_edits_follow_the_store():
+    store = make_store(100)
+    index = InventorySearchIndex(store)
+    store.add('widget', 1, 1)
+    store.remove('item42')
+    assert index.search('widget') == ['widget']
+    assert index.search('item42') == []
+    assert names_at(store, index.matching_positions('widget')) == ['widget']
+
+
+def test_batch_with_compaction_keeps_positions():
+    # Removing most rows in one batch makes the store compact, which moves every row
+    store = make_store(2000)
+    index = InventorySearchIndex(store)
+    events = []
+    store.subscribe(lambda event, name, pos: events.append(event))
+    store.apply_many([('remove', f'item{i}') for i in range(1400)])
+    assert events == ['batch', 'reindex']
+    for name in ('item1500', 'item1999'):
+        positions = index.matching_positions(name)
+        assert names_at(store, positions) == [name]
+
+
+def test_small_batch_with_compaction_keeps_positions():
+    # Few enough ops for the incremental path, but the removes still trigger compaction
+    store = make_store(200)
+    for i in range(99):
+        store.remove(f'item{i}')
+    index = InventorySearchIndex(store)
+    events = []
+    store.subscribe(lambda event, name, pos: events.append(event))
+    store.apply_many([('remove', 'item100'), ('remove', 'item101')])
+    assert events == ['batch', 'reindex']
+    assert names_at(store, index.matching_positions('item150')) == ['item150']
+
+
+def test_remove_and_readd_in_one_batch_moves_position():
+    store = make_store(1000)
+    index = InventorySearchIndex(store)
+    store.apply_many([('remove', 'item5'), ('add', 'item5', 7, 1)])
+    rows = [store.row_at(pos) for pos in index.matching_positions('item5')]
+    assert ('item5', 7, 1) in rows
+    assert all(name is not None and 'item5' in name for name, _, _ in rows)
+
+
+@pytest.mark.parametrize('query', ['it', 'item1', 'm19'])
+def test_matches_agree_with_a_scan(query):
+    store = make_store(500)
+    index = InventorySearchIndex(store)
+    store.apply_many([('remove', f'item{i}') for i in range(0, 500, 3)] + [('add', 'item1x', 1, 1)])
+    expected = [name for name in store.to_frame()['Item Name'] if query in name]
+    assert sorted(index.search(query)) == sorted(expected)
+    assert sorted(names_at(store, index.matching_positions(query))) == sorted(expected)
+    assert np.all(np.diff(index.matching_positions(query)) > 0)
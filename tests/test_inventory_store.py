@@ -0,0 +1,94 @@
+import random
+import pandas as pd
+from inventory_store import InventoryStore
+
+
+def make_store(n):
+    return InventoryStore.from_frame(pd.DataFrame({'Item Name': [f'item{i}' for i in range(n)],
+                                                   'Quantity': range(n), 'Reorder Level': [5] * n}))
+
+
+def apply_one_at_a_time(store, ops):
+    applied = []
+    for op in ops:
+        kind, name = op[0], op[1]
+        if kind == 'add':
+            done = store.add(name, op[2], op[3])
+        elif kind == 'update':
+            done = store.update(name, op[2])
+        else:
+            done = store.remove(name)
+        if done:
+            applied.append(op)
+    return applied
+
+
+def assert_consistent(store):
+    frame = store.to_frame()
+    assert list(frame['Item Name']) == list(store.live_arrays()[0])
+    for pos in store.live_positions():
+        name, quantity, reorder = store.row_at(pos)
+        assert store.position_of(name) == pos
+        assert store.get(name) == (quantity, reorder)
+
+
+def test_single_edits():
+    store = make_store(3)
+    assert store.add('new', 4, 2)
+    assert not store.add('item0', 9, 9)
+    assert store.update('item1', 42)
+    assert not store.update('missing', 1)
+    assert store.remove('item2')
+    assert not store.remove('item2')
+    assert store.get('item1') == (42, 5)
+    assert list(store.to_frame()['Item Name']) == ['item0', 'item1', 'new']
+    assert len(store) == 3 and 'new' in store and 'item2' not in store
+
+
+def test_from_frame_keeps_the_first_of_duplicate_names():
+    store = InventoryStore.from_frame(pd.DataFrame({'Item Name': ['a', 'b', 'a'], 'Quantity': [1, 2, 3],
+                                                    'Reorder Level': [0, 0, 0]}))
+    assert store.get('a') == (1, 0)
+    assert len(store) == 2
+
+
+def test_apply_many_matches_applying_ops_one_at_a_time():
+    rng = random.Random(7)
+    for _ in range(20):
+        ops = []
+        for _ in range(300):
+            name = f'item{rng.randrange(120)}'
+            kind = rng.choice(['add', 'update', 'remove'])
+            ops.append(('add', name, rng.randrange(50), rng.randrange(10)) if kind == 'add'
+                       else ('update', name, rng.randrange(50)) if kind == 'update' else ('remove', name))
+        batched, single = make_store(100), make_store(100)
+        assert batched.apply_many(ops) == apply_one_at_a_time(single, ops)
+        pd.testing.assert_frame_equal(batched.to_frame().reset_index(drop=True),
+                                      single.to_frame().reset_index(drop=True))
+        assert_consistent(batched)
+
+
+def test_batch_events_are_followed_by_reindex_when_rows_moved():
+    store = make_store(100)
+    events = []
+    store.subscribe(lambda event, item_name, pos: events.append(event))
+    store.apply_many([('update', 'item0', 1), ('add', 'extra', 1, 1)])
+    assert events == ['batch']
+    events.clear()
+    # Removing most rows drops the tombstones and moves the survivors
+    store.apply_many([('remove', f'item{i}') for i in range(80)])
+    assert events == ['batch', 'reindex']
+    assert_consistent(store)
+
+
+def test_single_removes_compact_once_half_the_rows_are_dead():
+    store = make_store(100)
+    events = []
+    store.subscribe(lambda event, item_name, pos: events.append(event))
+    for i in range(50):
+        store.remove(f'item{i}')
+    assert 'reindex' not in events
+    store.remove('item50')
+    assert events[-1] == 'reindex'
+    assert list(store.live_positions()) == list(range(len(store)))
+    assert_consistent(store)
@@ -0,0 +1,37 @@
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from data_processing import load_and_preprocess
+from material_requirements import (DAYS_PER_MONTH, compute_material_requirements,
+                                   compute_material_requirements_matrix)
+from sales_ingest import load_sales_matrix
+
+
+def test_hand_computed_rollup():
+    product_data = pd.DataFrame({'sku': ['p1', 'p2', 'p3'], 'name': ['P1', 'P2', 'P3'], 'on_demand': 'no',
+                                 'stock': [10, 0, 5], 'price_pp': 1, 'mat_id': ['m1', 'm1', 'unknown'],
+                                 'avg_lt': [DAYS_PER_MONTH, 0, 0]})
+    mat_data = pd.DataFrame({'raw_id': ['m1', 'm2'], 'name': ['M1', 'M2'], 'cost_pp': [2.0, 3.0], 'stock': [20, 7]})
+    dates = pd.to_datetime(['2023-01-01', '2023-02-01', '2023-03-01'])
+    # p1 sells 10 a month, p2 4 a month; the oldest month falls outside a two-month window
+    sales = pd.DataFrame({'sku': ['p1', 'p2', 'p3', 'ghost'] * 3, 'date_sale': dates.repeat(4),
+                          'quantity': [99, 99, 99, 99, 10, 4, 1, 1, 10, 4, 1, 1]})
+    result = compute_material_requirements(product_data, mat_data, sales, window_months=2, horizon_months=3)
+    m1, m2 = result.iloc[0], result.iloc[1]
+    assert m1['monthly_demand'] == pytest.approx(14)
+    # p1: 10 * (1 + 3) - 10 = 30; p2: 4 * 3 = 12
+    assert m1['requirement'] == pytest.approx(42)
+    assert m1['shortfall'] == pytest.approx(22)
+    assert m1['cost_exposure'] == pytest.approx(44)
+    assert m1['coverage_months'] == pytest.approx(20 / 14)
+    assert m2['requirement'] == 0 and np.isinf(m2['coverage_months'])
+
+
+def test_matrix_and_long_frame_agree(sample_dir):
+    product_data, mat_data, sales_data = load_and_preprocess(sample_dir)
+    skus, _, dates, matrix = load_sales_matrix(os.path.join(sample_dir, 'sales_data.csv'))
+    from_long = compute_material_requirements(product_data, mat_data, sales_data)
+    from_matrix = compute_material_requirements_matrix(product_data, mat_data, skus, dates, matrix)
+    pd.testing.assert_frame_equal(from_long, from_matrix)
+    assert (from_long['requirement'] > 0).any()
@@ -0,0 +1,98 @@
+import threading
+import pytest
+from plotting import FIGURE_KINDS, FigureCache, data_fingerprint, figure_factories
+
+
+@pytest.fixture
+def version(analytics):
+    return data_fingerprint(*analytics)
+
+
+def test_cache_hit_returns_the_same_figure(analytics, version):
+    cache = FigureCache()
+    first = dict(figure_factories(*analytics, data_version=version, cache=cache))['sales_trends']()
+    again = dict(figure_factories(*analytics, data_version=version, cache=cache))['sales_trends']()
+    assert again is first
+
+
+def test_new_month_builds_a_new_figure_and_leaves_the_cached_one_alone(analytics, version):
+    cache = FigureCache()
+    all_months = dict(figure_factories(*analytics, data_version=version, cache=cache))
+    shown = all_months['sales_trends']()
+    line = shown.axes[0].lines[0]
+    before = (len(line.get_xdata()), len(shown.axes), len(shown.axes[0].lines))
+    seasonality = all_months['monthly_seasonality']()
+
+    march = dict(figure_factories(*analytics, selected_month=3, data_version=version, cache=cache))
+    assert march['sales_trends']() is not shown
+    assert (len(line.get_xdata()), len(shown.axes), len(shown.axes[0].lines)) == before
+    # Month-independent figures are shared across filters
+    assert march['monthly_seasonality']() is seasonality
+
+
+def test_cache_evicts_least_recently_used(analytics, version):
+    cache = FigureCache(max_entries=2)
+    factories = dict(figure_factories(*analytics, data_version=version, cache=cache))
+    first = factories['sales_trends']()
+    factories['monthly_sales']()
+    factories['monthly_seasonality']()
+    assert len(cache) == 2
+    assert factories['sales_trends']() is not first
+
+
+def test_factories_without_a_version_always_build(analytics):
+    factories = figure_factories(*analytics)
+    assert [kind for kind, _ in factories] == FIGURE_KINDS
+    build = dict(factories)['on_demand_vs_regular']
+    assert build() is not build()
+
+
+def test_misses_on_different_keys_build_concurrently():
+    cache = FigureCache()
+    started = threading.Barrier(2, timeout=5)
+
+    def build():
+        # Only returns once both builds are running at the same time
+        started.wait()
+        return object()
+
+    threads = [threading.Thread(target=cache.get, args=(kind, None, 'v1', build)) for kind in FIGURE_KINDS[:2]]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not started.broken and len(cache) == 2
+
+
+def test_concurrent_misses_on_one_key_share_one_build():
+    cache = FigureCache()
+    release = threading.Event()
+    builds = []
+
+    def build():
+        builds.append(1)
+        release.wait(5)
+        return object()
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get('sales_trends', None, 'v1', build)))
+               for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert len(builds) == 1
+    assert len(results) == 3 and all(fig is results[0] for fig in results)
+
+
+def test_a_failed_build_is_not_cached():
+    cache = FigureCache()
+
+    def fail():
+        raise RuntimeError("no data")
+
+    with pytest.raises(RuntimeError):
+        cache.get('sales_trends', None, 'v1', fail)
+    fig = object()
+    assert cache.get('sales_trends', None, 'v1', lambda: fig) is fig
@@ -0,0 +1,26 @@
+import os
+import subprocess
+import sys
+import pandas as pd
+import main
+from conftest import REPO_DIR
+from inventory_journal import InventoryJournal
+from sales_cube import SalesCube
+
+
+def test_preload_returns_the_analytics_material_requirements_and_cube(sample_dir, analytics):
+    loaded = main.preload_analytics(sample_dir, InventoryJournal(os.path.join(sample_dir, 'inventory.csv')))
+    assert len(loaded) == 8
+    for actual, expected in zip(loaded[:6], analytics):
+        pd.testing.assert_frame_equal(actual.reset_index(drop=True), expected.reset_index(drop=True))
+    material_requirements, sales_cube = loaded[6:]
+    assert material_requirements is not None
+    assert isinstance(sales_cube, SalesCube)
+    pd.testing.assert_series_equal(sales_cube.slice().sales_trends()['quantity'], analytics[0]['quantity'])
+
+
+def test_importing_main_opens_no_inventory(tmp_path):
+    env = dict(os.environ, PYTHONPATH=REPO_DIR, INVENTORY_DB=str(tmp_path / 'inventory.db'))
+    subprocess.run([sys.executable, '-c', 'import main; assert main.inventory_journal is None'],
+                   cwd=tmp_path, env=env, check=True)
+    assert list(tmp_path.iterdir()) == []
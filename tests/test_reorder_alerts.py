@@ -0,0 +1,69 @@
+import random
+import pandas as pd
+from inventory_store import InventoryStore
+from reorder_alerts import ReorderAlerts
+
+
+def make_store(rows):
+    return InventoryStore.from_frame(pd.DataFrame(rows, columns=['Item Name', 'Quantity', 'Reorder Level']))
+
+
+def expected_keys(store, margin):
+    frame = store.to_frame()
+    slack = frame['Quantity'] - frame['Reorder Level']
+    return sorted(zip(slack[slack <= margin].tolist(), frame['Item Name'][slack <= margin].tolist()))
+
+
+def test_initial_index_orders_by_slack_then_name():
+    store = make_store([('b', 1, 5), ('a', 1, 5), ('c', 10, 5), ('d', 7, 5), ('e', 50, 5)])
+    alerts = ReorderAlerts(store, margin=5)
+    assert alerts.near_reorder_level() == [(-4, 'a'), (-4, 'b'), (2, 'd'), (5, 'c')]
+    assert alerts.below_reorder_level() == [(-4, 'a'), (-4, 'b')]
+    assert alerts.slack('d') == 2 and 'e' not in alerts
+    assert alerts.most_urgent(1) == [(-4, 'a')]
+
+
+def test_single_edits_move_only_the_edited_item():
+    store = make_store([('a', 10, 5), ('b', 20, 5)])
+    alerts = ReorderAlerts(store, margin=0)
+    notified = []
+    alerts.subscribe(notified.append)
+    store.update('b', 50)
+    assert notified == []
+    store.update('a', 3)
+    assert alerts.below_reorder_level() == [(-2, 'a')]
+    store.add('c', 0, 1)
+    store.remove('a')
+    assert alerts.below_reorder_level() == [(-1, 'c')]
+    assert len(notified) == 3
+
+
+def test_stays_in_sync_through_random_edits_and_batches():
+    rng = random.Random(3)
+    store = make_store([(f'item{i}', rng.randrange(20), rng.randrange(20)) for i in range(200)])
+    alerts = ReorderAlerts(store, margin=3)
+    for step in range(300):
+        name = f'item{rng.randrange(260)}'
+        choice = rng.random()
+        if choice < 0.4:
+            store.update(name, rng.randrange(20))
+        elif choice < 0.6:
+            store.add(name, rng.randrange(20), rng.randrange(20))
+        elif choice < 0.8:
+            store.remove(name)
+        else:
+            # Small batches are applied per item, large ones rebuild the index
+            size = rng.choice([3, 100])
+            store.apply_many([('update', f'item{rng.randrange(260)}', rng.randrange(20)) for _ in range(size)])
+        assert alerts.near_reorder_level() == expected_keys(store, 3)
+
+
+def test_set_store_and_close_stop_following_the_old_store():
+    old, new = make_store([('a', 0, 5)]), make_store([('b', 0, 5)])
+    alerts = ReorderAlerts(old)
+    alerts.set_store(new)
+    old.update('a', 100)
+    assert alerts.near_reorder_level() == [(-5, 'b')]
+    alerts.close()
+    new.update('b', 100)
+    assert alerts.near_reorder_level() == [(-5, 'b')]
@@ -0,0 +1,25 @@
+import json
+import os
+from plotting import FIGURE_KINDS
+from report_export import export_reports
+
+
+def test_export_writes_every_dashboard_figure_per_month(data_dir, tmp_path):
+    output = str(tmp_path / 'reports')
+    manifest = export_reports(data_dir, output, months=['All', '3'], formats=('png',), workers=1)
+    assert [variant['label'] for variant in manifest['variants']] == ['all', 'month_03']
+    for variant in manifest['variants']:
+        kinds = [entry['kind'] for entry in variant['files']]
+        assert kinds == FIGURE_KINDS + ['material_requirements']
+        for entry in variant['files']:
+            assert os.path.getsize(os.path.join(output, entry['path'])) == entry['bytes'] > 0
+    with open(os.path.join(output, 'manifest.json')) as file:
+        assert json.load(file)['variants'] == manifest['variants']
+
+
+def test_worker_processes_write_the_same_files_as_a_single_process(data_dir, tmp_path):
+    single = export_reports(data_dir, str(tmp_path / 'single'), months=['All', '1', '2'], formats=('svg',), workers=1)
+    pooled = export_reports(data_dir, str(tmp_path / 'pooled'), months=['All', '1', '2'], formats=('svg',), workers=2)
+    assert pooled['workers'] == 2
+    assert ([[entry['path'] for entry in variant['files']] for variant in pooled['variants']] ==
+            [[entry['path'] for entry in variant['files']] for variant in single['variants']])
@@ -0,0 +1,95 @@
+import pandas as pd
+import pytest
+from compact_data import load_compact
+from data_processing import analyze_data, analyze_stock_levels, load_and_preprocess
+from sales_cube import SalesCube
+
+
+@pytest.fixture(scope='module')
+def sample(sample_dir):
+    product_data, mat_data, sales_data = load_and_preprocess(sample_dir)
+    # The long frame with each SKU's product attributes, for the pandas reference answers
+    attributes = product_data.drop_duplicates(subset='sku')[['sku', 'mat_id', 'on_demand']]
+    joined = sales_data.merge(attributes, on='sku', how='left')
+    joined['year'] = joined['date_sale'].dt.year
+    joined['quarter'] = joined['date_sale'].dt.quarter
+    joined['month'] = joined['date_sale'].dt.month
+    return product_data, mat_data, sales_data, joined
+
+
+@pytest.fixture(scope='module')
+def cube(sample):
+    product_data, _, sales_data, _ = sample
+    return SalesCube.from_long(product_data, sales_data)
+
+
+def test_compact_and_long_cubes_agree(sample_dir, cube):
+    product_data, _, sales = load_compact(sample_dir)
+    compact = SalesCube.from_compact(product_data, sales)
+    for dimension in ('mat_id', 'on_demand', 'year', 'month'):
+        pd.testing.assert_series_equal(compact.slice().rollup(dimension), cube.slice().rollup(dimension),
+                                       check_dtype=False)
+
+
+@pytest.mark.parametrize('dimension', ['sku', 'mat_id', 'on_demand', 'year', 'quarter', 'month'])
+def test_rollup_matches_groupby(sample, cube, dimension):
+    joined = sample[3]
+    expected = joined.groupby(dimension)['quantity'].sum()
+    actual = cube.slice().rollup(dimension)
+    pd.testing.assert_series_equal(actual.sort_index(), expected.sort_index(), check_dtype=False,
+                                   check_names=False, check_index_type=False)
+
+
+def test_filtered_rollups_match_groupby(sample, cube):
+    joined = sample[3]
+    mat_id = cube.values('mat_id')[0]
+    year = cube.values('year')[-1]
+    selected = joined[(joined['mat_id'] == mat_id) & (joined['year'] == year)]
+    cube_slice = cube.slice(mat_id=mat_id, year=year)
+    pd.testing.assert_series_equal(cube_slice.rollup('month').sort_index(),
+                                   selected.groupby('month')['quantity'].sum().sort_index(),
+                                   check_dtype=False, check_names=False, check_index_type=False)
+    pd.testing.assert_series_equal(cube_slice.rollup('sku').sort_index(),
+                                   selected.groupby('sku')['quantity'].sum().sort_index(),
+                                   check_dtype=False, check_names=False, check_index_type=False)
+
+
+def test_sku_filter_intersects_with_group_filters(sample, cube):
+    joined = sample[3]
+    skus = sorted(joined['sku'].unique())[:3]
+    on_demand = joined.loc[joined['sku'] == skus[0], 'on_demand'].iloc[0]
+    cube_slice = cube.slice(sku=skus + ['no-such-sku'], on_demand=on_demand)
+    selected = joined[joined['sku'].isin(skus) & (joined['on_demand'] == on_demand)]
+    assert sorted(cube.skus[cube_slice.rows()]) == sorted(selected['sku'].unique())
+    assert cube_slice.rollup('on_demand').to_dict() == {on_demand: selected['quantity'].sum()}
+
+
+def test_whole_cube_analytics_match_analyze_data(sample, cube):
+    product_data, mat_data, sales_data, _ = sample
+    expected = analyze_data(product_data, mat_data, sales_data) + analyze_stock_levels(product_data, mat_data)[:1]
+    for actual, frame in zip(cube.slice().analytics(), expected):
+        pd.testing.assert_frame_equal(actual.reset_index(drop=True), frame.reset_index(drop=True),
+                                      check_dtype=False)
+
+
+def test_month_slice_analytics_match_the_filtered_long_frame(sample, cube):
+    product_data, mat_data, sales_data, _ = sample
+    month = cube.values('month')[0]
+    selected = sales_data[sales_data['date_sale'].dt.month == month]
+    expected = analyze_data(product_data, mat_data, selected)
+    cube_slice = cube.slice(month=month)
+    for actual, frame in zip(cube_slice.analytics()[:4], expected):
+        pd.testing.assert_frame_equal(actual.reset_index(drop=True), frame.reset_index(drop=True),
+                                      check_dtype=False)
+
+
+def test_slice_keys_ignore_argument_order(cube):
+    assert cube.slice(month=[3, 1]).key == cube.slice(month=[1, 3]).key
+    assert cube.slice().key != cube.slice(month=1).key
+
+
+def test_unknown_dimensions_are_rejected(cube):
+    with pytest.raises(ValueError):
+        cube.values('colour')
+    with pytest.raises(ValueError):
+        cube.slice().rollup('colour')
@@ -0,0 +1,34 @@
+import os
+import pandas as pd
+from sales_ingest import BYTES_PER_CELL, BYTES_PER_ROW, iter_sales_chunks, load_sales_matrix, read_sales_long_streaming, rows_per_chunk
+
+
+def melted(path):
+    wide = pd.read_csv(path)
+    long = wide.melt(id_vars=['sku', 'name'], var_name='date_sale', value_name='quantity')
+    long['date_sale'] = pd.to_datetime(long['date_sale'], format='%m/%Y')
+    return long
+
+
+def test_streaming_matches_melt_with_one_chunk(sample_dir):
+    path = os.path.join(sample_dir, 'sales_data.csv')
+    pd.testing.assert_frame_equal(read_sales_long_streaming(path), melted(path), check_dtype=False)
+
+
+def test_small_memory_limit_splits_the_file_into_chunks(sample_dir):
+    path = os.path.join(sample_dir, 'sales_data.csv')
+    n_months = len(pd.read_csv(path, nrows=0).columns) - 2
+    # Room for three wide rows per chunk
+    limit = (n_months * BYTES_PER_CELL + BYTES_PER_ROW) * 3
+    chunks = list(iter_sales_chunks(path, memory_limit=limit))
+    assert len(chunks) > 1
+    assert all(len(skus) <= 3 for skus, _, _ in chunks)
+    skus, names, dates, matrix = load_sales_matrix(path, memory_limit=limit)
+    wide = pd.read_csv(path)
+    assert list(skus) == list(wide['sku'])
+    assert (matrix == wide.drop(columns=['sku', 'name']).to_numpy()).all()
+    pd.testing.assert_frame_equal(read_sales_long_streaming(path, memory_limit=limit), melted(path), check_dtype=False)
+
+
+def test_rows_per_chunk_never_drops_to_zero():
+    assert rows_per_chunk(10_000, memory_limit=1) == 1
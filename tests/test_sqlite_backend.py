@@ -0,0 +1,84 @@
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from inventory_journal import InventoryJournal
+from sqlite_backend import SQLiteBackend
+
+
+@pytest.fixture
+def backend(data_dir):
+    backend = SQLiteBackend(os.path.join(data_dir, 'inventory.db'), os.path.join(data_dir, 'inventory.csv'))
+    yield backend
+    backend.close()
+
+
+def test_first_use_takes_over_the_csv_inventory(backend, data_dir):
+    expected = InventoryJournal(os.path.join(data_dir, 'inventory.csv')).load()
+    pd.testing.assert_frame_equal(backend.load(), expected, check_dtype=False)
+
+
+def test_emptied_inventory_is_not_reimported(backend, data_dir):
+    for name in backend.load()['Item Name']:
+        backend.append('remove', name)
+    backend.close()
+    reopened = SQLiteBackend(backend.path, os.path.join(data_dir, 'inventory.csv'))
+    assert reopened.inventory_count() == 0
+    reopened.close()
+
+
+def test_row_edits(backend):
+    assert backend.append('add', 'Widget', 3, 1)
+    assert not backend.append('add', 'Widget', 5, 1)
+    assert backend.append('update', 'Widget', 8)
+    assert backend.get_item('Widget') == (8, 1)
+    backend.append_many([('remove', 'Widget'), ('add', 'Gadget', 2, 0)])
+    assert backend.get_item('Widget') is None
+    assert backend.load()['Item Name'].iloc[-1] == 'Gadget'
+
+
+def test_compact_does_not_rewrite_the_table(backend):
+    backend.append('add', 'Widget', 3, 1)
+    ids = backend.connection().execute('SELECT id, item_name FROM inventory ORDER BY id').fetchall()
+    backend.compact()
+    assert backend.connection().execute('SELECT id, item_name FROM inventory ORDER BY id').fetchall() == ids
+
+
+@pytest.fixture
+def catalog(backend, data_dir):
+    backend.import_csv(data_dir)
+    return backend
+
+
+def test_reimport_keeps_inventory_edits(catalog, data_dir):
+    catalog.append('update', catalog.load()['Item Name'].iloc[0], 999)
+    catalog.append('add', 'Widget', 3, 1)
+    edited = catalog.load()
+    catalog.import_csv(data_dir)
+    pd.testing.assert_frame_equal(catalog.load(), edited)
+    catalog.import_csv(data_dir, replace_inventory=True)
+    assert catalog.get_item('Widget') is None
+
+
+def test_sql_analytics_match_pandas(catalog, data_dir):
+    from data_processing import compute_analytics
+    for sql, expected in zip(catalog.compute_analytics(), compute_analytics(data_dir, compact=False)):
+        pd.testing.assert_frame_equal(sql.reset_index(drop=True), expected.reset_index(drop=True))
+
+
+def test_sales_matrix_matches_the_long_frame(catalog, data_dir):
+    from data_processing import load_and_preprocess
+    _, _, sales_data = load_and_preprocess(data_dir)
+    skus, dates, matrix = catalog.sales_matrix()
+    wide = sales_data.pivot_table(index='sku', columns='date_sale', values='quantity', aggfunc='sum', sort=False)
+    assert list(dates) == list(wide.columns)
+    np.testing.assert_array_equal(matrix.sum(axis=0), wide.sum(axis=0).to_numpy())
+    assert matrix.shape == (len(skus), len(dates))
+
+
+def test_catalog_round_trip(catalog, tmp_path):
+    catalog.export_csv(tmp_path / 'export')
+    for name in ('product_data.csv', 'mat_data.csv', 'sales_data.csv'):
+        original = pd.read_csv(os.path.join(os.path.dirname(catalog.path), name))
+        exported = pd.read_csv(tmp_path / 'export' / name)
+        pd.testing.assert_frame_equal(exported, original, check_dtype=False)
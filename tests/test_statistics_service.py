@@ -0,0 +1,112 @@
+import os
+import shutil
+import numpy as np
+import pandas as pd
+import pytest
+from statistics_service import SKETCH_K, QuantileSketch, RunningStats, StatisticsService
+
+
+def test_merged_running_stats_match_a_single_pass():
+    rng = np.random.default_rng(0)
+    values = rng.normal(10, 3, size=(4, 300))
+    values[1, ::7] = np.nan
+    merged = RunningStats.from_values(values[:, :100]).merge(RunningStats.from_values(values[:, 100:]))
+    whole = RunningStats.from_values(values)
+    for attr in ('count', 'mean', 'm2', 'min', 'max'):
+        np.testing.assert_allclose(getattr(merged, attr), getattr(whole, attr))
+    np.testing.assert_allclose(merged.std, pd.DataFrame(values.T).std().to_numpy())
+
+
+def test_grouped_stats_match_stats_of_the_pooled_samples():
+    rng = np.random.default_rng(1)
+    values = rng.integers(0, 100, size=(6, 20)).astype(float)
+    codes = np.array([0, 1, 0, -1, 1, 0])
+    grouped = RunningStats.from_values(values).grouped(codes, 2)
+    for group in (0, 1):
+        pooled = values[codes == group].ravel()
+        assert grouped.count[group] == len(pooled)
+        assert grouped.mean[group] == pytest.approx(pooled.mean())
+        assert grouped.std[group] == pytest.approx(pooled.std(ddof=1))
+        assert grouped.max[group] == pooled.max()
+
+
+def test_sketch_is_exact_until_it_compacts():
+    values = np.arange(SKETCH_K // 2, dtype=float)
+    np.testing.assert_allclose(QuantileSketch().update(values).quantiles([0.25, 0.5, 1]),
+                               np.quantile(values, [0.25, 0.5, 1]))
+
+
+def test_sketch_rank_error_stays_small_and_memory_bounded():
+    rng = np.random.default_rng(2)
+    values = rng.permutation(100_000).astype(float)
+    first = QuantileSketch(seed=0)
+    second = QuantileSketch(seed=1)
+    for chunk in np.array_split(values[:50_000], 50):
+        first.update(chunk)
+    second.update(values[50_000:])
+    sketch = first.merge(second)
+    assert sketch.n == len(values)
+    assert sum(len(level) for level in sketch.levels) < 10 * SKETCH_K
+    estimates = sketch.quantiles([0.1, 0.5, 0.9])
+    ranks = estimates / len(values)
+    np.testing.assert_allclose(ranks, [0.1, 0.5, 0.9], atol=5 / SKETCH_K)
+
+
+@pytest.fixture
+def sales_copy(sample_dir, tmp_path):
+    path = str(tmp_path / 'sales_data.csv')
+    shutil.copy(os.path.join(sample_dir, 'sales_data.csv'), path)
+    return path
+
+
+def test_describe_matches_pandas(sales_copy):
+    pd.testing.assert_frame_equal(StatisticsService().describe(sales_copy), pd.read_csv(sales_copy).describe())
+
+
+def test_appended_rows_are_merged_without_a_full_reload(sales_copy):
+    service = StatisticsService()
+    stats = service.table(sales_copy)
+    wide = pd.read_csv(sales_copy)
+    extra = wide.head(3).assign(sku=['new-1', 'new-2', 'new-3'])
+    with open(sales_copy, 'a') as file:
+        # The sample file has no newline after its last row
+        file.write('\n')
+        extra.to_csv(file, header=False, index=False)
+    assert service.table(sales_copy) is stats
+    pd.testing.assert_frame_equal(service.describe(sales_copy), pd.read_csv(sales_copy).describe())
+    assert list(service.per_sku(sales_copy)['sku'][-3:]) == ['new-1', 'new-2', 'new-3']
+
+
+def test_a_new_month_column_is_merged_without_a_full_reload(sales_copy):
+    service = StatisticsService()
+    stats = service.table(sales_copy)
+    wide = pd.read_csv(sales_copy)
+    wide['11/2023'] = np.arange(len(wide))
+    wide.to_csv(sales_copy, index=False)
+    assert service.table(sales_copy) is stats
+    pd.testing.assert_frame_equal(service.describe(sales_copy), wide.describe())
+    per_sku = service.per_sku(sales_copy)
+    months = wide.drop(columns=['sku', 'name'])
+    np.testing.assert_allclose(per_sku['total'], months.sum(axis=1))
+    np.testing.assert_allclose(per_sku['std'], months.std(axis=1))
+
+
+def test_rewritten_file_is_reloaded(sales_copy):
+    service = StatisticsService()
+    stats = service.table(sales_copy)
+    pd.read_csv(sales_copy).iloc[::-1].to_csv(sales_copy, index=False)
+    assert service.table(sales_copy) is not stats
+
+
+def test_per_material_pools_the_skus_of_each_material(sample_dir):
+    files = [os.path.join(sample_dir, name) for name in ('sales_data.csv', 'product_data.csv', 'mat_data.csv')]
+    by_material = StatisticsService().per_material(*files)
+    sales = pd.read_csv(files[0])
+    products = pd.read_csv(files[1])
+    material_of = products.drop_duplicates('sku').set_index('sku')['mat_id']
+    long = sales.melt(id_vars=['sku', 'name'], value_name='quantity')
+    expected = long.groupby(long['sku'].map(material_of))['quantity'].agg(['count', 'mean', 'sum'])
+    got = by_material.set_index('raw_id').loc[expected.index]
+    np.testing.assert_allclose(got['count'], expected['count'])
+    np.testing.assert_allclose(got['mean'], expected['mean'])
+    np.testing.assert_allclose(got['total'], expected['sum'])
@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+import pytest
+from plotting import STOCK_CHART_MAX_BARS, STOCK_CHART_TOP_N, build_figure, classify_stock, quarter_colors, select_top_bottom
+
+
+def test_quarter_colors_follow_the_financial_year():
+    assert quarter_colors(range(1, 13)) == ['salmon'] * 3 + ['skyblue'] * 3 + ['lightgreen'] * 3 + ['sandybrown'] * 3
+
+
+def test_classify_stock_thresholds_are_exclusive():
+    assert classify_stock([51, 50, 21, 20, 0], high=50, low=20).tolist() == ['green', 'orange', 'orange', 'red', 'red']
+
+
+def test_select_top_bottom_keeps_the_extremes_and_averages_the_rest():
+    stock = pd.DataFrame({'name': [f'p{i}' for i in range(100)], 'stock': np.arange(100)})
+    shown = select_top_bottom(stock, n=3)
+    assert list(shown['stock'][:3]) == [99, 98, 97]
+    assert list(shown['stock'][-3:]) == [2, 1, 0]
+    others = shown[shown['others']]
+    assert others['name'].item() == 'Others (94 items, avg)'
+    assert others['stock'].item() == pytest.approx(np.arange(3, 97).mean())
+
+
+def test_small_inventories_are_returned_whole_and_sorted():
+    stock = pd.DataFrame({'name': ['a', 'b', 'c'], 'stock': [5, 9, 1]})
+    shown = select_top_bottom(stock, n=3)
+    assert list(shown['name']) == ['b', 'a', 'c'] and not shown['others'].any()
+
+
+@pytest.mark.parametrize('view, bars', [('auto', 2 * STOCK_CHART_TOP_N + 1), ('bars', STOCK_CHART_MAX_BARS + 10), ('histogram', None)])
+def test_large_stock_charts(view, bars):
+    n = STOCK_CHART_MAX_BARS + 10
+    product_stock = pd.DataFrame({'name': [f'p{i}' for i in range(n)], 'stock': np.arange(n)})
+    # The product stock chart only reads product_stock
+    frames = (None,) * 4 + (product_stock, None)
+    fig = build_figure('product_stock', *frames, stock_options={'view': view})
+    ax = fig.axes[0]
+    if bars is not None:
+        assert len(ax.get_xticklabels()) == bars
+    else:
+        assert len(ax.patches) >= 10
@@ -0,0 +1,67 @@
+import threading
+import time
+import pytest
+from task_runner import TaskExecutor
+
+
+class FakeRoot:
+    """Stands in for Tk: after() callbacks run when the test calls run_pending()."""
+
+    def __init__(self):
+        self.callbacks = []
+
+    def after(self, ms, callback):
+        self.callbacks.append(callback)
+
+    def run_pending(self, timeout=5):
+        deadline = time.monotonic() + timeout
+        while self.callbacks:
+            assert time.monotonic() < deadline, "tasks did not finish"
+            callback = self.callbacks.pop(0)
+            time.sleep(0.01)
+            callback()
+
+
+@pytest.fixture
+def runner():
+    root, statuses = FakeRoot(), []
+    executor = TaskExecutor(root, status_callback=lambda text, busy: statuses.append((text, busy)))
+    yield root, executor, statuses
+    executor.shutdown()
+
+
+def test_results_are_delivered_on_the_polling_thread(runner):
+    root, executor, statuses = runner
+    results = []
+    worker = []
+    def job(x):
+        worker.append(threading.current_thread())
+        return x * 2
+    executor.submit(job, 21, on_done=lambda result: results.append((result, threading.current_thread())),
+                    description="Doubling")
+    assert statuses[0] == ("Working: Doubling...", True)
+    root.run_pending()
+    assert results == [(42, threading.current_thread())]
+    assert worker[0] is not threading.current_thread()
+    assert statuses[-1] == ("Ready", False)
+
+
+def test_errors_go_to_on_error(runner):
+    root, executor, _ = runner
+    errors = []
+    def fail():
+        raise ValueError("bad data")
+    executor.submit(fail, on_done=lambda result: pytest.fail("no result expected"), on_error=errors.append)
+    root.run_pending()
+    assert [str(e) for e in errors] == ["bad data"]
+
+
+def test_a_newer_task_with_the_same_key_supersedes_the_older(runner):
+    root, executor, _ = runner
+    release = threading.Event()
+    results = []
+    executor.submit(lambda: release.wait(5) and 'old', on_done=results.append, key='month')
+    executor.submit(lambda: 'new', on_done=results.append, key='month')
+    release.set()
+    root.run_pending()
+    assert results == ['new']